@@ -0,0 +1,375 @@
+"""
+Análisis posterior de vuelos: resumen de los registros drone_data.csv / .flog sin cargarlos enteros.
+
+Cada vuelo (un registro y sus segmentos rotados drone_data.1.csv, drone_data.2.csv...) se lee en
+bloques de CHUNK_ROWS filas y se resume con NumPy (Haversine vectorizado y diferencias), llevando
+entre bloques solo la última muestra válida de cada magnitud, así que la memoria no depende del
+tamaño del registro. Varios vuelos se procesan en paralelo con un pool de procesos:
+
+    python analytics_subsystem.py drone_data.csv archivo/*.csv --json resumen.json --csv resumen.csv
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+CHUNK_ROWS = 250_000
+EARTH_RADIUS_M = 6371000
+# Saltos de tiempo mayores (p. ej. otra sesión anexada al mismo registro) no cuentan como tramo
+MAX_GAP_S = 5.0
+# Perfil de velocidad: histograma fijo de 0 a SPEED_MAX_MS en pasos de SPEED_BIN_MS
+SPEED_BIN_MS = 0.5
+SPEED_MAX_MS = 100.0
+# Curva de descarga: voltaje medio por intervalo de DISCHARGE_BUCKET_S segundos
+DISCHARGE_BUCKET_S = 60.0
+SUMMARY_COLUMNS = ('flight', 'files', 'start', 'duration_s', 'samples', 'gps_fixes', 'total_distance_m',
+                   'max_range_m', 'max_speed_ms', 'mean_speed_ms', 'p95_speed_ms', 'max_climb_ms',
+                   'max_descent_ms', 'total_ascent_m', 'total_descent_m', 'max_altitude_drift_m',
+                   'final_altitude_drift_m', 'altitude_drift_m_per_min', 'start_voltage', 'end_voltage',
+                   'discharge_v_per_min')
+_SEGMENT = re.compile(r'^(?P<base>.*?)(?:\.(?P<index>\d+))?(?P<ext>\.csv|\.flog)$')
+
+
+def haversine_array(lat1, lon1, lat2, lon2):
+    """Haversine vectorizado: distancias en metros entre arrays (o escalares) de coordenadas en grados."""
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def group_flights(paths):
+    """
+    Agrupa los archivos por vuelo: drone_data.1.csv, drone_data.2.csv y drone_data.csv son un solo
+    vuelo, en ese orden (los segmentos rotados son los más antiguos). Acepta patrones glob.
+    """
+    flights = {}
+    for pattern in paths:
+        matches = glob.glob(pattern) or [pattern]
+        for path in matches:
+            match = _SEGMENT.match(path)
+            if match is None:
+                print(f"Se ignora {path}: no es un registro .csv ni .flog")
+                continue
+            key = match['base'] + match['ext']
+            segments = flights.setdefault(key, set())
+            segments.add(path)
+            # Al pasar el registro activo se incluyen también sus segmentos rotados
+            if match['index'] is None:
+                segments.update(glob.glob(f"{glob.escape(match['base'])}.[0-9]*{match['ext']}"))
+
+    def order(path):
+        index = _SEGMENT.match(path)['index']
+        return float('inf') if index is None else int(index)
+
+    def same_flight(path, key):
+        match = _SEGMENT.match(path)
+        return match is not None and match['base'] + match['ext'] == key
+
+    return {key: sorted((p for p in segments if same_flight(p, key)), key=order)
+            for key, segments in sorted(flights.items())}
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """
+    Genera bloques (t, lat, lon, gps_alt, baro_alt, voltage) como arrays float64 (t en segundos,
+    NaN = no válido) leyendo como máximo chunk_rows filas a la vez.
+    """
+    if path.endswith('.flog'):
+        import flightlog_subsystem
+        reader = flightlog_subsystem.open_flightlog(path)
+        records = reader['records']
+        # Los instantes del CSV son hora local sin zona: los del .flog se llevan a la misma referencia
+        local_offset = 0.0
+        if reader['count']:
+            first_us = int(records['timestamp_us'][0])
+            local_offset = flightlog_subsystem.to_datetime(first_us).astimezone().utcoffset().total_seconds()
+        for start in range(0, reader['count'], chunk_rows):
+            block = records[start:start + chunk_rows]
+            yield (block['timestamp_us'] / 1e6 + local_offset, np.array(block['latitude']),
+                   np.array(block['longitude']), np.array(block['gps_altitude']),
+                   np.array(block['baro_altitude']), np.array(block['battery_voltage']))
+        flightlog_subsystem.close_flightlog(reader)
+        return
+
+    import pandas as pd
+    columns = ['Latitude', 'Longitude', 'GPS_Altitude', 'Baro_Altitude', 'Battery_Voltage']
+    for chunk in pd.read_csv(path, usecols=['Timestamp'] + columns, dtype={c: 'float64' for c in columns},
+                             chunksize=chunk_rows):
+        times = pd.to_datetime(chunk['Timestamp'], format="%Y-%m-%d %H:%M:%S.%f")
+        yield (times.to_numpy(dtype='datetime64[ns]').astype(np.int64) / 1e9,
+               *(chunk[c].to_numpy() for c in columns))
+
+
+def initialize_flight_summary():
+    """Acumuladores de un vuelo; entre bloques solo se conserva la última muestra válida."""
+    return {
+        'files': [],
+        't_first': None,
+        't_last': None,
+        'samples': 0,
+        'gps_fixes': 0,
+        'home': None,
+        'last_fix': None,
+        'total_distance_m': 0.0,
+        'max_range_m': 0.0,
+        'moving_time_s': 0.0,
+        'max_speed_ms': 0.0,
+        'speed_histogram': np.zeros(int(SPEED_MAX_MS / SPEED_BIN_MS) + 1, dtype=np.int64),
+        'last_baro': None,
+        'max_climb_ms': 0.0,
+        'max_descent_ms': 0.0,
+        'total_ascent_m': 0.0,
+        'total_descent_m': 0.0,
+        'drift_origin': None,
+        'drift_last': None,
+        'max_drift_m': 0.0,
+        # Sumas para la pendiente por mínimos cuadrados (n, Σt, Σy, Σt², Σty)
+        'drift_fit': np.zeros(5),
+        'voltage_fit': np.zeros(5),
+        'voltage_first': None,
+        'voltage_last': None,
+        'discharge': {}
+    }
+
+
+def update_flight_summary(summary, t, lat, lon, gps_alt, baro_alt, voltage):
+    """Añade un bloque de muestras al resumen (todo vectorizado)."""
+    if len(t) == 0:
+        return
+    if summary['t_first'] is None:
+        summary['t_first'] = float(t[0])
+    summary['t_last'] = float(t[-1])
+    summary['samples'] += len(t)
+
+    fix = ~np.isnan(lat) & ~np.isnan(lon)
+    _update_track(summary, t[fix], lat[fix], lon[fix])
+    baro_valid = ~np.isnan(baro_alt)
+    _update_climb(summary, t[baro_valid], baro_alt[baro_valid])
+    both = baro_valid & ~np.isnan(gps_alt)
+    _update_drift(summary, t[both], gps_alt[both] - baro_alt[both])
+    voltage_valid = ~np.isnan(voltage)
+    _update_battery(summary, t[voltage_valid], voltage[voltage_valid])
+
+
+def finish_flight_summary(summary, name):
+    """Resumen final del vuelo: métricas escalares y curva de descarga."""
+    histogram = summary['speed_histogram']
+    duration = (summary['t_last'] - summary['t_first']) if summary['t_first'] is not None else 0.0
+    start = None
+    if summary['t_first'] is not None:
+        start = str(np.datetime64(int(round(summary['t_first'] * 1e6)), 'us'))
+    discharge = sorted(summary['discharge'].items())
+    return {
+        'flight': name,
+        'files': len(summary['files']),
+        'start': start,
+        'duration_s': round(duration, 1),
+        'samples': summary['samples'],
+        'gps_fixes': summary['gps_fixes'],
+        'total_distance_m': round(summary['total_distance_m'], 1),
+        'max_range_m': round(summary['max_range_m'], 1),
+        'max_speed_ms': round(summary['max_speed_ms'], 2),
+        'mean_speed_ms': round(summary['total_distance_m'] / summary['moving_time_s'], 2)
+        if summary['moving_time_s'] else 0.0,
+        'p95_speed_ms': _histogram_percentile(histogram, 0.95, summary['max_speed_ms']),
+        'max_climb_ms': round(summary['max_climb_ms'], 2),
+        'max_descent_ms': round(summary['max_descent_ms'], 2),
+        'total_ascent_m': round(summary['total_ascent_m'], 1),
+        'total_descent_m': round(summary['total_descent_m'], 1),
+        'max_altitude_drift_m': round(summary['max_drift_m'], 2),
+        'final_altitude_drift_m': round(summary['drift_last'] - summary['drift_origin'], 2)
+        if summary['drift_origin'] is not None else None,
+        'altitude_drift_m_per_min': _fit_slope(summary['drift_fit'], 60.0),
+        'start_voltage': _round(summary['voltage_first'], 3),
+        'end_voltage': _round(summary['voltage_last'], 3),
+        'discharge_v_per_min': _fit_slope(summary['voltage_fit'], 60.0),
+        'speed_profile': {'bin_ms': SPEED_BIN_MS, 'counts': np.trim_zeros(histogram, 'b').tolist()},
+        'discharge_curve': [[bucket * DISCHARGE_BUCKET_S, round(total / count, 3)]
+                            for bucket, (total, count) in discharge]
+    }
+
+
+def analyze_flight(name, paths, chunk_rows=CHUNK_ROWS):
+    """Resume un vuelo formado por sus segmentos en orden cronológico (se ejecuta en un proceso del pool)."""
+    summary = initialize_flight_summary()
+    for path in paths:
+        summary['files'].append(path)
+        try:
+            for chunk in read_chunks(path, chunk_rows):
+                update_flight_summary(summary, *chunk)
+        except Exception as e:
+            print(f"Error al analizar {path}: {e}")
+    return finish_flight_summary(summary, name)
+
+
+def analyze_flights(paths, workers=None, chunk_rows=CHUNK_ROWS):
+    """Resume todos los vuelos; con más de uno y workers != 1 los reparte en un pool de procesos."""
+    flights = group_flights(paths)
+    if not flights:
+        return []
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(flights) == 1:
+        return [analyze_flight(name, files, chunk_rows) for name, files in flights.items()]
+    with ProcessPoolExecutor(max_workers=min(workers, len(flights))) as pool:
+        futures = [pool.submit(analyze_flight, name, files, chunk_rows) for name, files in flights.items()]
+        return [future.result() for future in futures]
+
+
+def write_summary_json(summaries, path):
+    """Guarda los resúmenes completos (con perfil de velocidad y curva de descarga) en JSON."""
+    with open(path, 'w', encoding='utf-8') as summary_file:
+        json.dump({'flights': summaries}, summary_file, indent=2)
+
+
+def write_summary_csv(summaries, path):
+    """Guarda una fila por vuelo con las métricas escalares."""
+    with open(path, 'w', newline='', encoding='utf-8') as summary_file:
+        writer = csv.DictWriter(summary_file, fieldnames=SUMMARY_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(summaries)
+
+
+def _update_track(summary, t, lat, lon):
+    """Distancia total, alcance máximo desde el punto de despegue y perfil de velocidad."""
+    if len(t) == 0:
+        return
+    summary['gps_fixes'] += len(t)
+    if summary['home'] is None:
+        summary['home'] = (float(lat[0]), float(lon[0]))
+    home_lat, home_lon = summary['home']
+    summary['max_range_m'] = max(summary['max_range_m'], float(haversine_array(home_lat, home_lon, lat, lon).max()))
+    if summary['last_fix'] is not None:
+        last_t, last_lat, last_lon = summary['last_fix']
+        t, lat, lon = np.r_[last_t, t], np.r_[last_lat, lat], np.r_[last_lon, lon]
+    summary['last_fix'] = (float(t[-1]), float(lat[-1]), float(lon[-1]))
+    if len(t) < 2:
+        return
+    distance = haversine_array(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    dt = np.diff(t)
+    step = (dt > 0) & (dt <= MAX_GAP_S)
+    distance, dt = distance[step], dt[step]
+    if len(dt) == 0:
+        return
+    speed = distance / dt
+    summary['total_distance_m'] += float(distance.sum())
+    summary['moving_time_s'] += float(dt.sum())
+    summary['max_speed_ms'] = max(summary['max_speed_ms'], float(speed.max()))
+    bins = np.minimum((speed / SPEED_BIN_MS).astype(np.int64), len(summary['speed_histogram']) - 1)
+    summary['speed_histogram'] += np.bincount(bins, minlength=len(summary['speed_histogram']))
+
+
+def _update_climb(summary, t, altitude):
+    """Velocidades verticales (barómetro) y ascenso/descenso acumulados."""
+    if len(t) == 0:
+        return
+    if summary['last_baro'] is not None:
+        t, altitude = np.r_[summary['last_baro'][0], t], np.r_[summary['last_baro'][1], altitude]
+    summary['last_baro'] = (float(t[-1]), float(altitude[-1]))
+    dt = np.diff(t)
+    step = (dt > 0) & (dt <= MAX_GAP_S)
+    climb = np.diff(altitude)[step]
+    if len(climb) == 0:
+        return
+    rate = climb / dt[step]
+    summary['max_climb_ms'] = max(summary['max_climb_ms'], float(rate.max()))
+    summary['max_descent_ms'] = max(summary['max_descent_ms'], float(-rate.min()))
+    summary['total_ascent_m'] += float(climb[climb > 0].sum())
+    summary['total_descent_m'] -= float(climb[climb < 0].sum())
+
+
+def _update_drift(summary, t, offset):
+    """Deriva de la altitud GPS frente a la barométrica respecto a la diferencia inicial."""
+    if len(t) == 0:
+        return
+    if summary['drift_origin'] is None:
+        summary['drift_origin'] = float(offset[0])
+    summary['drift_last'] = float(offset[-1])
+    drift = offset - summary['drift_origin']
+    summary['max_drift_m'] = max(summary['max_drift_m'], float(np.abs(drift).max()))
+    _accumulate_fit(summary['drift_fit'], t - summary['t_first'], drift)
+
+
+def _update_battery(summary, t, voltage):
+    """Voltaje inicial/final, pendiente de descarga y curva por intervalos de DISCHARGE_BUCKET_S."""
+    if len(t) == 0:
+        return
+    if summary['voltage_first'] is None:
+        summary['voltage_first'] = float(voltage[0])
+    summary['voltage_last'] = float(voltage[-1])
+    elapsed = t - summary['t_first']
+    _accumulate_fit(summary['voltage_fit'], elapsed, voltage)
+    buckets = (elapsed // DISCHARGE_BUCKET_S).astype(np.int64)
+    unique, inverse = np.unique(buckets, return_inverse=True)
+    totals = np.bincount(inverse, weights=voltage)
+    counts = np.bincount(inverse)
+    discharge = summary['discharge']
+    for bucket, total, count in zip(unique.tolist(), totals.tolist(), counts.tolist()):
+        previous_total, previous_count = discharge.get(bucket, (0.0, 0))
+        discharge[bucket] = (previous_total + total, previous_count + count)
+
+
+def _round(value, digits):
+    """round() que deja pasar None."""
+    return None if value is None else round(value, digits)
+
+
+def _accumulate_fit(sums, x, y):
+    """Acumula las sumas de una regresión lineal."""
+    sums += (len(x), x.sum(), y.sum(), (x * x).sum(), (x * y).sum())
+
+
+def _fit_slope(sums, scale=1.0):
+    """Pendiente por mínimos cuadrados a partir de las sumas acumuladas (None con menos de 2 puntos)."""
+    n, sx, sy, sxx, sxy = sums
+    denominator = n * sxx - sx * sx
+    if n < 2 or denominator <= 0:
+        return None
+    return round(float((n * sxy - sx * sy) / denominator * scale), 4)
+
+
+def _histogram_percentile(histogram, fraction, max_value):
+    """
+    Percentil del histograma de velocidades, interpolado linealmente dentro de su cubeta y acotado
+    por la velocidad máxima medida (la cubeta puede quedar por encima de ella).
+    """
+    total = histogram.sum()
+    if total == 0:
+        return 0.0
+    cumulative = np.cumsum(histogram)
+    target = fraction * total
+    index = int(np.searchsorted(cumulative, target))
+    below = cumulative[index - 1] if index else 0
+    value = (index + (target - below) / histogram[index]) * SPEED_BIN_MS
+    return round(min(float(value), max_value), 2)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Resumen posterior de vuelos a partir de los registros")
+    arg_parser.add_argument('logs', nargs='+', help="Registros drone_data*.csv / *.flog (se admiten patrones)")
+    arg_parser.add_argument('--json', default=None, help="Guarda el resumen completo en este archivo JSON")
+    arg_parser.add_argument('--csv', default=None, help="Guarda una fila por vuelo en este archivo CSV")
+    arg_parser.add_argument('--workers', type=int, default=None, help="Procesos en paralelo (por defecto, CPUs)")
+    arg_parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help="Filas leídas por bloque")
+    args = arg_parser.parse_args(argv)
+
+    summaries = analyze_flights(args.logs, workers=args.workers, chunk_rows=args.chunk_rows)
+    for summary in summaries:
+        print(f"{summary['flight']}: {summary['duration_s']:.0f} s, {summary['samples']} muestras, "
+              f"{summary['total_distance_m']:.0f} m recorridos, alcance {summary['max_range_m']:.0f} m, "
+              f"vel. máx {summary['max_speed_ms']:.1f} m/s, batería {summary['start_voltage']} -> "
+              f"{summary['end_voltage']} V")
+    if args.json:
+        write_summary_json(summaries, args.json)
+        print(f"Resumen guardado en {args.json}")
+    if args.csv:
+        write_summary_csv(summaries, args.csv)
+        print(f"Resumen guardado en {args.csv}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,11 @@
+from protocol_subsystem import VALID_BARO
+
 def process_barometer_data(data):
-    """Procesa datos del barómetro desde el puerto serial."""
+    """Procesa datos del barómetro desde el puerto serial o como vista de una TelemetrySample."""
+    if not isinstance(data, (list, tuple)):
+        if data.has(VALID_BARO):
+            return {'baro_altitude': data.baro_altitude, 'valid': True}
+        return {'baro_altitude': 0, 'valid': False}
     try:
         baro_alt = float(data[3]) if data[3] else 0
         valid = baro_alt != 0
@@ -1,5 +1,11 @@
+from protocol_subsystem import VALID_BATTERY
+
 def process_battery_data(data):
-    """Procesa datos de batería desde el puerto serial."""
+    """Procesa datos de batería desde el puerto serial o como vista de una TelemetrySample."""
+    if not isinstance(data, (list, tuple)):
+        if data.has(VALID_BATTERY):
+            return {'voltage': data.voltage, 'valid': True}
+        return {'voltage': 0, 'valid': False}
     try:
         voltage = float(data[4]) if data[4] else 0
         valid = voltage != 0
@@ -9,4 +15,10 @@ def process_battery_data(data):
 
 def format_battery_data(battery_data):
     """Formatea datos de batería para visualización."""
-    return f"Voltaje de Batería: {battery_data['voltage']:.1f} V" if battery_data['valid'] else "Voltaje de Batería: 0"
\ No newline at end of file
+    return f"Voltaje de Batería: {battery_data['voltage']:.1f} V" if battery_data['valid'] else "Voltaje de Batería: 0"
+
+def voltage_to_percent(voltage):
+    """Convierte el voltaje de batería (LiPo 11.1V) a porcentaje."""
+    min_voltage = 9.0
+    max_voltage = 12.6
+    return max(0, min(100, ((voltage - min_voltage) / (max_voltage - min_voltage)) * 100))
@@ -0,0 +1,927 @@
+"""
+Banco de pruebas de rendimiento de las rutas críticas de la estación de tierra.
+
+Mide rendimiento (op/s), latencia p50/p99 y memoria pico de cada caso y guarda los resultados
+en JSON para comparar ejecuciones entre commits:
+
+    python benchmark.py --out bench_results.json
+    python benchmark.py --only parse,haversine --compare bench_results.json
+"""
+import argparse
+import csv
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import barometer_subsystem
+import breadcrumb_subsystem
+import battery_subsystem
+import drivingaid_subsystem
+import flystandard_subsystem
+import gps_subsystem
+import groundstation_subsystem
+import ir_subsystem
+import log_subsystem
+import metrics_subsystem
+import navigation_subsystem
+import pipeline_subsystem
+import protocol_subsystem
+import rth_subsystem
+import scheduler_subsystem
+import simulation_subsystem
+import telemetry_subsystem
+import transport_subsystem
+
+SAMPLE_LINE = b'40.416805,-3.703800,600.3,12.26,11.60,1,0.74,-2.03,-0.07'
+SAMPLE_FLIGHT_DATA = {'altitude': 12.3, 'distance': 154.2, 'latitude': 40.416805, 'longitude': -3.7038,
+                      'battery_percent': 72, 'speed': 4.8}
+
+
+def percentile(sorted_values, fraction):
+    """Percentil por el método del rango más cercano sobre valores ya ordenados."""
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def run_case(name, operation, iterations, setup=None, teardown=None, memory_iterations=None):
+    """
+    Ejecuta operation(i) iterations veces midiendo cada llamada con perf_counter_ns.
+    La memoria pico se mide en una pasada aparte bajo tracemalloc para no distorsionar las latencias.
+    """
+    context = setup() if setup else None
+    try:
+        for i in range(min(10, iterations)):
+            operation(context, i)
+
+        gc.collect()
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        timings = [0] * iterations
+        clock = time.perf_counter_ns
+        start = clock()
+        for i in range(iterations):
+            t0 = clock()
+            operation(context, i)
+            timings[i] = clock() - t0
+        total_ns = clock() - start
+        if gc_was_enabled:
+            gc.enable()
+
+        tracemalloc.start()
+        for i in range(memory_iterations or min(iterations, 1000)):
+            operation(context, i)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        if teardown:
+            teardown(context)
+
+    timings.sort()
+    return {
+        'name': name,
+        'iterations': iterations,
+        'throughput_ops': iterations / (total_ns / 1e9) if total_ns else 0.0,
+        'p50_us': percentile(timings, 0.50) / 1000,
+        'p99_us': percentile(timings, 0.99) / 1000,
+        'max_us': timings[-1] / 1000,
+        'peak_memory_kb': peak / 1024
+    }
+
+
+def bench_parse(scale):
+    """Parseo de líneas: process_*_data sobre la lista dividida frente al parser de una pasada."""
+    line_str = SAMPLE_LINE.decode()
+
+    def legacy(_, i):
+        data = line_str.split(',')
+        gps_subsystem.process_gps_data(data)
+        barometer_subsystem.process_barometer_data(data)
+        battery_subsystem.process_battery_data(data)
+        ir_subsystem.process_ir_data(data)
+        {'pitch': float(data[6]), 'roll': float(data[7]), 'yaw': float(data[8]), 'valid': True}
+
+    def single_pass(_, i):
+        telemetry_subsystem.parse_line(SAMPLE_LINE)
+
+    frame = protocol_subsystem.encode_telemetry(1, 0, 40.416805, -3.7038, 600.3, 12.26, 11.6, 1, 0.74, -2.03, -0.07, 0x1f)
+    frames = frame * 64
+
+    def binary(decoder, i):
+        for message in protocol_subsystem.feed_decoder(decoder, frames):
+            telemetry_subsystem.parse_frame(message[4], message[2], message[3])
+
+    return [
+        run_case('parse.process_data_legacy', legacy, 20000 * scale),
+        run_case('parse.single_pass_line', single_pass, 20000 * scale),
+        run_case('parse.binary_frames_x64', binary, 500 * scale,
+                 setup=lambda: protocol_subsystem.initialize_decoder('binary'))
+    ]
+
+
+def controller_context():
+    """Estados de los controladores y una muestra de telemetría para ejecutar ticks de control."""
+    return {
+        'sample': telemetry_subsystem.parse_line(SAMPLE_LINE),
+        'flystandard': dict(flystandard_subsystem.initialize_flystandard(), flystandard_active=True,
+                            target_altitude=15.0),
+        'drivingaid': drivingaid_subsystem.initialize_drivingaid(),
+        'rth': rth_subsystem.initialize_rth()
+    }
+
+
+def controller_tick(context, i=0):
+    """Un tick de control completo sobre el contexto."""
+    views = telemetry_subsystem.telemetry_views(context['sample'])
+    flystandard_subsystem.process_flystandard(context['flystandard'], views['baro_data'], False, 0.02)
+    drivingaid_subsystem.process_drivingaid(context['drivingaid'], views['mpu_data'], 0.02, False)
+    rth_subsystem.process_rth(context['rth'], views['gps_data'], views['baro_data'], views['battery_data'])
+
+
+def bench_controller(scale):
+    """Tick de control completo: vistas de la muestra, FlyStandard, DrivingAid y RTH."""
+    return [run_case('control.tick', controller_tick, 20000 * scale, setup=controller_context)]
+
+
+def bench_station(scale):
+    """GroundStation.step() a máxima velocidad: decodificación, parseo, sumideros, EWD, control y comando."""
+    line = SAMPLE_LINE + b'\n'
+    frame = protocol_subsystem.encode_telemetry(1, 0, 40.416805, -3.7038, 600.3, 12.26, 11.6, 1, 0.74, -2.03, -0.07, 0x1f)
+    directory = tempfile.mkdtemp(prefix='bench_station_')
+    stations = []
+
+    def station(protocol_mode='ascii', log=False):
+        def setup():
+            sinks = []
+            if log:
+                sinks.append(groundstation_subsystem.LogSink(os.path.join(directory, 'drone_data.csv'),
+                                                             max_queue=1_000_000))
+            stations.append(groundstation_subsystem.GroundStation(protocol_mode=protocol_mode, sinks=sinks))
+            return stations[-1]
+        return setup
+
+    try:
+        return [
+            run_case('station.step_line', lambda context, i: context.step(line), 20000 * scale, setup=station()),
+            run_case('station.step_frame', lambda context, i: context.step(frame), 20000 * scale,
+                     setup=station('binary')),
+            run_case('station.step_line_log', lambda context, i: context.step(line), 20000 * scale,
+                     setup=station(log=True))
+        ]
+    finally:
+        for context in stations:
+            context.stop()
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+
+def measure_reacquire(events, jammed_channels=2, timeout=30.0):
+    """
+    Tiempo hasta recuperar el enlace con el transporte simulado: en cada evento se interfiere el
+    canal del dron (que salta a otro libre al azar) y se mide hasta la primera telemetría nueva.
+    Como mucho jammed_channels canales quedan interferidos a la vez (se libera el más antiguo).
+    """
+    transport = transport_subsystem.open_transport('sim', timeout=0.1)
+    model = transport.radio.model
+    station = groundstation_subsystem.GroundStation(transport=transport)
+    frequencies = station.ewd_state['frequencies']
+    jam_order = []
+    times = []
+    station.start()
+    try:
+        deadline = time.monotonic() + 5.0
+        while station.first_packet_ns is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        for _ in range(events):
+            if len(jam_order) >= jammed_channels:
+                model['jammed'].discard(jam_order.pop(0))
+            jam_order.append(model['frequency'])
+            jam_ns = time.monotonic_ns()
+            simulation_subsystem.jam_frequency(model, model['frequency'], frequencies)
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                sample, _ = pipeline_subsystem.read_latest(station.telemetry_slot)
+                if sample is not None and sample.arrival_ns > jam_ns:
+                    times.append(sample.arrival_ns - jam_ns)
+                    break
+                time.sleep(0.01)
+            else:
+                times.append(int(timeout * 1e9))
+            # Un poco de vuelo estable antes de la siguiente interferencia
+            time.sleep(0.5)
+        hops = station.metrics['counters'].get('ewd_frequency_hops', 0)
+    finally:
+        station.stop()
+    return times, hops
+
+
+def bench_ewd(scale, events=6):
+    """Recuperación del enlace tras interferencias con el dron simulado (latencias = tiempo hasta recuperar)."""
+    times, hops = measure_reacquire(events * scale)
+    ordered = sorted(times)
+    return [{
+        'name': 'ewd.reacquire',
+        'iterations': len(times),
+        'throughput_ops': len(times) / (sum(times) / 1e9) if times else 0.0,
+        'p50_us': percentile(ordered, 0.50) / 1000,
+        'p99_us': percentile(ordered, 0.99) / 1000,
+        'max_us': ordered[-1] / 1000 if ordered else 0.0,
+        'peak_memory_kb': 0.0,
+        'reacquire_s': [t / 1e9 for t in times],
+        'hops': hops
+    }]
+
+
+def bench_haversine(scale):
+    """Distancia Haversine escalar entre fijos GPS cercanos."""
+    def op(_, i):
+        gps_subsystem.haversine_distance(40.4168 + i * 1e-7, -3.7038, 40.4168, -3.7038 + i * 1e-7)
+
+    return [run_case('geo.haversine', op, 50000 * scale)]
+
+
+def synthetic_zones(count, seed=0):
+    """count zonas prohibidas octogonales repartidas en ~10 km alrededor de casa y una zona permitida."""
+    import math
+    import random
+    rnd = random.Random(seed)
+    zones = []
+    for number in range(count):
+        lat = 40.4168 + rnd.uniform(-0.05, 0.05)
+        lon = -3.7038 + rnd.uniform(-0.06, 0.06)
+        radius = rnd.uniform(0.0005, 0.003)
+        ring = [(lat + radius * math.sin(k * math.pi / 4), lon + 1.3 * radius * math.cos(k * math.pi / 4))
+                for k in range(8)]
+        zones.append({'name': f"zona{number}", 'kind': 'no_fly', 'rings': [ring]})
+    zones.append({'name': 'area', 'kind': 'keep_in',
+                  'rings': [[(40.36, -3.77), (40.36, -3.63), (40.47, -3.63), (40.47, -3.77)]]})
+    return zones
+
+
+def bench_navigation(scale, zones=300):
+    """Navegación por muestra GPS: dos Haversine (antes) frente al plano local, sin y con geocercas."""
+    def haversine_pair(_, i):
+        lat = 40.4168 + i * 1e-7
+        gps_subsystem.haversine_distance(lat, -3.7038, 40.4168, -3.7038)
+        gps_subsystem.haversine_distance(lat, -3.7038, lat - 1e-7, -3.7038)
+
+    results = [run_case('nav.haversine_pair', haversine_pair, 50000 * scale)]
+    for name, zone_list in (('nav.update', None), (f'nav.update_geofence_{zones}', synthetic_zones(zones))):
+        navigation = navigation_subsystem.initialize_navigation(zone_list)
+        navigation_subsystem.update_navigation(navigation, 40.4168, -3.7038, 0.0)
+
+        def update(_, i):
+            # Recorre la zona en diagonal para pasar por celdas con y sin zonas
+            navigation_subsystem.update_navigation(navigation, 40.4168 + (i % 50000) * 1e-6,
+                                                   -3.7038 + (i % 50000) * 1e-6, i * 0.1)
+
+        results.append(run_case(name, update, 50000 * scale))
+
+    # Referencia: la misma comprobación recorriendo todas las zonas sin índice
+    fence = navigation['geofence']
+
+    def linear(_, i):
+        east, north = (i % 50000) * 0.085, (i % 50000) * 0.111
+        for _, _, box, edges in fence['compiled']:
+            if box[0] <= east <= box[2] and box[1] <= north <= box[3]:
+                navigation_subsystem._point_in_edges(edges, east, north)
+
+    results.append(run_case(f'nav.geofence_linear_{zones}', linear, 5000 * scale))
+    return results
+
+
+def bench_breadcrumbs(scale, rate_hz=50, fixes=200000):
+    """Anexado al rastro de migas a alta frecuencia GPS: barrido en zigzag y paseo aleatorio con compactación."""
+    import math
+    import random
+    rnd = random.Random(0)
+    step = 5.0 / rate_hz  # 5 m/s
+    paths = {}
+    east = north = 0.0
+    heading = 0.0
+    survey = []
+    for i in range(fixes):
+        if i % (rate_hz * 60) == 0:
+            heading += math.pi / 2 if (i // (rate_hz * 60)) % 2 else -math.pi / 2
+        east += step * math.cos(heading) + rnd.gauss(0, 0.05)
+        north += step * math.sin(heading) + rnd.gauss(0, 0.05)
+        survey.append((east, north))
+    paths['breadcrumb.append_survey'] = survey
+    east = north = heading = 0.0
+    wander = []
+    for _ in range(fixes):
+        heading += rnd.gauss(0, 0.05)
+        east += step * math.cos(heading)
+        north += step * math.sin(heading)
+        wander.append((east, north))
+    paths['breadcrumb.append_wander'] = wander
+
+    results = []
+    for name, path in paths.items():
+        trail = breadcrumb_subsystem.initialize_breadcrumbs(max_points=256)
+
+        def append(_, i):
+            point = path[i % fixes]
+            breadcrumb_subsystem.append_point(trail, point[0], point[1])
+
+        result = run_case(name, append, fixes * scale)
+        result.update(breadcrumb_subsystem.breadcrumb_stats(trail))
+        results.append(result)
+    return results
+
+
+def bench_log(scale):
+    """Encolado de filas en el escritor de registros (CSV y binario) y coste total hasta vaciarlo a disco."""
+    now = datetime.datetime(2025, 1, 1)
+    row = {"Timestamp": now, "Latitude": 40.4168, "Longitude": -3.7038, "GPS_Altitude": 600.3,
+           "Baro_Altitude": 12.3, "Battery_Voltage": 11.6, "IR_Status": "OFF"}
+
+    results = []
+    for log_format, name, file_name in (('csv', 'log.append', 'drone_data.csv'),
+                                        ('binary', 'log.append_binary', 'drone_data.flog')):
+        directory = tempfile.mkdtemp(prefix='bench_log_')
+        state = log_subsystem.initialize_log(os.path.join(directory, file_name), max_queue=1_000_000,
+                                             log_format=log_format)
+
+        def append(_, i):
+            log_subsystem.log_sample(state, row)
+
+        try:
+            result = run_case(name, append, 20000 * scale)
+            start = time.perf_counter()
+            log_subsystem.close_log(state, timeout=60)
+            result['drain_s'] = time.perf_counter() - start
+            result['written'] = state['written']
+            result['dropped'] = state['dropped']
+            result['file_bytes'] = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+        finally:
+            log_subsystem.close_log(state)
+            for file in os.listdir(directory):
+                os.remove(os.path.join(directory, file))
+            os.rmdir(directory)
+        results.append(result)
+    return results
+
+
+def bench_flightlog(scale, length=200000):
+    """Análisis posterior de un vuelo: búsqueda por instante y lectura de una columna, .flog frente a CSV."""
+    import numpy as np
+    import flightlog_subsystem
+    length *= scale
+    records = np.zeros(length, dtype=flightlog_subsystem.RECORD_DTYPE)
+    records['timestamp_us'] = 1_745_000_000_000_000 + np.arange(length) * 100_000
+    records['latitude'] = 40.4168 + np.arange(length) * 1e-7
+    records['longitude'] = -3.7038
+    records['gps_altitude'] = 600.3
+    records['baro_altitude'] = np.linspace(0.0, 120.0, length)
+    records['battery_voltage'] = 11.6
+
+    directory = tempfile.mkdtemp(prefix='bench_flightlog_')
+    flog_path = os.path.join(directory, 'drone_data.flog')
+    csv_path = os.path.join(directory, 'drone_data.csv')
+    try:
+        writer = flightlog_subsystem.open_writer(flog_path)
+        flightlog_subsystem.write_records(writer, records)
+        flightlog_subsystem.close_writer(writer)
+        flightlog_subsystem.flightlog_to_csv(flog_path, csv_path)
+        reader = flightlog_subsystem.open_flightlog(flog_path)
+        targets = records['timestamp_us'][np.random.default_rng(0).integers(0, length, 1000)]
+
+        def seek(_, i):
+            flightlog_subsystem.seek_time(reader, int(targets[i % len(targets)]))
+
+        def flog_column(_, i):
+            log = flightlog_subsystem.open_flightlog(flog_path)
+            float(np.nanmax(log['records']['baro_altitude']))
+
+        def csv_column(_, i):
+            with open(csv_path, newline='', encoding='utf-8') as csv_file:
+                max(float(r['Baro_Altitude']) for r in csv.DictReader(csv_file) if r['Baro_Altitude'])
+
+        results = [
+            run_case('flightlog.seek', seek, 20000 * scale),
+            run_case('flightlog.load_column', flog_column, 20, memory_iterations=2),
+            run_case('flightlog.csv_load_column', csv_column, 3, memory_iterations=1)
+        ]
+        for result in results:
+            result['records'] = length
+        results[1]['file_bytes'] = os.path.getsize(flog_path)
+        results[2]['file_bytes'] = os.path.getsize(csv_path)
+        flightlog_subsystem.close_flightlog(reader)
+    finally:
+        for file in os.listdir(directory):
+            os.remove(os.path.join(directory, file))
+        os.rmdir(directory)
+    return results
+
+
+def bench_analytics(scale, length=200000):
+    """Resumen posterior de un vuelo: lectura por bloques y NumPy frente a pandas completo y Haversine por fila."""
+    import numpy as np
+    import analytics_subsystem
+    import flightlog_subsystem
+    length *= scale
+    samples = np.arange(length)
+    records = np.zeros(length, dtype=flightlog_subsystem.RECORD_DTYPE)
+    records['timestamp_us'] = 1_745_000_000_000_000 + samples * 100_000
+    records['latitude'] = 40.4168 + 0.001 * np.sin(samples * 1e-3)
+    records['longitude'] = -3.7038 + 0.001 * np.cos(samples * 1e-3)
+    records['gps_altitude'] = 600.0 + samples * 0.01
+    records['baro_altitude'] = samples * 0.01
+    records['battery_voltage'] = 12.6 - samples * 1e-5
+
+    directory = tempfile.mkdtemp(prefix='bench_analytics_')
+    flog_path = os.path.join(directory, 'drone_data.flog')
+    csv_path = os.path.join(directory, 'drone_data.csv')
+    try:
+        writer = flightlog_subsystem.open_writer(flog_path)
+        flightlog_subsystem.write_records(writer, records)
+        flightlog_subsystem.close_writer(writer)
+        flightlog_subsystem.flightlog_to_csv(flog_path, csv_path)
+
+        def legacy(_, i):
+            import pandas as pd
+            frame = pd.read_csv(csv_path)
+            total = 0.0
+            previous = None
+            for lat, lon in zip(frame['Latitude'], frame['Longitude']):
+                if previous is not None:
+                    total += gps_subsystem.haversine_distance(previous[0], previous[1], lat, lon)
+                previous = (lat, lon)
+
+        def chunked(_, i):
+            analytics_subsystem.analyze_flight('bench', [csv_path])
+
+        def flightlog(_, i):
+            analytics_subsystem.analyze_flight('bench', [flog_path])
+
+        results = [
+            run_case('analytics.legacy_pandas_scalar', legacy, 1, memory_iterations=1),
+            run_case('analytics.csv_chunked', chunked, 3, memory_iterations=1),
+            run_case('analytics.flightlog', flightlog, 3, memory_iterations=1)
+        ]
+        for result in results:
+            result['rows'] = length
+            result['rows_per_s'] = length * result['throughput_ops']
+    finally:
+        for file in os.listdir(directory):
+            os.remove(os.path.join(directory, file))
+        os.rmdir(directory)
+    return results
+
+
+class SyntheticCapture:
+    """Captura falsa con la interfaz mínima de cv2.VideoCapture que devuelve fotogramas de ruido."""
+
+    def __init__(self, width=1280, height=720, count=8):
+        import numpy as np
+        rng = np.random.default_rng(0)
+        self.frames = [rng.integers(0, 255, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+        self.index = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        frame = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        return True, frame.copy()
+
+    def release(self):
+        pass
+
+
+def bench_video(scale):
+    """Superposición de telemetría sobre fotogramas sintéticos (y el ciclo completo si hay Tk)."""
+    try:
+        import video_subsystem
+    except ImportError as e:
+        print(f"Video omitido: {e}")
+        return []
+    if not video_subsystem.CV2_AVAILABLE:
+        print("Video omitido: cv2 no disponible")
+        return []
+
+    sample = telemetry_subsystem.parse_line(SAMPLE_LINE)
+    telemetry = telemetry_subsystem.telemetry_views(sample)
+    results = []
+
+    def overlay(capture, i):
+        _, frame = capture.read()
+        video_subsystem.draw_overlay(frame, SAMPLE_FLIGHT_DATA, telemetry, i % 5)
+
+    results.append(run_case('video.overlay_720p', overlay, 300 * scale, setup=SyntheticCapture,
+                            memory_iterations=20))
+
+    display = video_subsystem.initialize_display(None, None)
+    for name, width, height in (('720p', 1280, 720), ('1080p_to_720p', 1920, 1080)):
+        def compose(capture, i):
+            _, frame = capture.read()
+            video_subsystem.compose_frame(display, frame, SAMPLE_FLIGHT_DATA, telemetry, i % 5)
+
+        results.append(run_case(f'video.compose_{name}', compose, 200 * scale,
+                                setup=lambda w=width, h=height: SyntheticCapture(w, h), memory_iterations=20))
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"Ciclo de video completo omitido (sin pantalla): {e}")
+        return results
+    display = video_subsystem.initialize_display(root, tk.Label(root))
+
+    def full_frame(capture, i):
+        video_subsystem.compose_frame(display, video_subsystem.read_frame(capture), SAMPLE_FLIGHT_DATA,
+                                      telemetry, i % 5)
+        video_subsystem.present_frame(display)
+        root.update_idletasks()
+
+    try:
+        results.append(run_case('video.update_frame_720p', full_frame, 100 * scale, setup=SyntheticCapture,
+                                memory_iterations=20))
+    finally:
+        root.destroy()
+    return results
+
+
+def measure_control_jitter(name, seconds):
+    """Ejecuta el bucle de control a 50 Hz durante seconds y resume el retraso de cada tick."""
+    scheduler = scheduler_subsystem.initialize_scheduler(rate_hz=50)
+    context = controller_context()
+    lateness = []
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        scheduler_subsystem.wait_next_tick(scheduler)
+        lateness.append(scheduler['last_lateness_ns'])
+        controller_tick(context)
+    lateness.sort()
+    return {
+        'name': name,
+        'iterations': len(lateness),
+        'throughput_ops': len(lateness) / seconds,
+        'p50_us': percentile(lateness, 0.50) / 1000,
+        'p99_us': percentile(lateness, 0.99) / 1000,
+        'max_us': lateness[-1] / 1000,
+        'peak_memory_kb': 0.0
+    }
+
+
+def bench_jitter(scale, seconds=3.0):
+    """
+    Retraso de los ticks de control a 50 Hz sin video, con la composición de video a 30 fps en
+    un hilo del mismo proceso y con el proceso de video separado (latencias = retraso del tick).
+    """
+    try:
+        import video_subsystem
+        import videoprocess_subsystem
+    except ImportError as e:
+        print(f"Jitter omitido: {e}")
+        return []
+    if not video_subsystem.CV2_AVAILABLE:
+        print("Jitter omitido: cv2 no disponible")
+        return []
+    seconds *= scale
+    sample = telemetry_subsystem.parse_line(SAMPLE_LINE)
+    telemetry = telemetry_subsystem.telemetry_views(sample)
+    results = [measure_control_jitter('jitter.control_no_video', seconds)]
+
+    stop_event = threading.Event()
+    display = video_subsystem.initialize_display(None, None)
+
+    def video_thread():
+        capture = videoprocess_subsystem.SyntheticCapture()
+        while not stop_event.is_set():
+            _, frame = capture.read()
+            video_subsystem.compose_frame(display, frame, SAMPLE_FLIGHT_DATA, telemetry, 3)
+
+    thread = threading.Thread(target=video_thread, daemon=True)
+    thread.start()
+    try:
+        results.append(measure_control_jitter('jitter.control_video_thread', seconds))
+    finally:
+        stop_event.set()
+        thread.join()
+
+    process = videoprocess_subsystem.start_video_process('synthetic')
+    if process is None:
+        return results
+    try:
+        # Esperar a que el proceso publique fotogramas antes de medir
+        deadline = time.monotonic() + 10.0
+        while process['header'][videoprocess_subsystem.H_PUBLISHED] == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        results.append(measure_control_jitter('jitter.control_video_process', seconds))
+    finally:
+        videoprocess_subsystem.stop_video_process(process)
+    return results
+
+
+def measure_serial_drain(name, read_messages, count):
+    """Envía count líneas de telemetría por un pty y mide cuánto tarda read_messages(ser) en recibirlas todas."""
+    import serial
+    import tty
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    ser = serial.Serial(os.ttyname(slave), 57600, timeout=0.5)
+    payload = (SAMPLE_LINE + b'\n') * count
+
+    def write():
+        for start in range(0, len(payload), 4096):
+            os.write(master, payload[start:start + 4096])
+
+    writer = threading.Thread(target=write, daemon=True)
+    timings = []
+    try:
+        start = time.perf_counter()
+        writer.start()
+        received = 0
+        reads = 0
+        while received < count:
+            t0 = time.perf_counter_ns()
+            got = read_messages(ser)
+            timings.append(time.perf_counter_ns() - t0)
+            if got is None:
+                break
+            received += got
+            reads += 1
+        elapsed = time.perf_counter() - start
+        writer.join()
+    finally:
+        ser.close()
+        os.close(master)
+        os.close(slave)
+    timings.sort()
+    return {
+        'name': name,
+        'iterations': received,
+        'throughput_ops': received / elapsed if elapsed else 0.0,
+        'p50_us': percentile(timings, 0.50) / 1000,
+        'p99_us': percentile(timings, 0.99) / 1000,
+        'peak_memory_kb': 0.0,
+        'reads': reads
+    }
+
+
+def bench_serial(scale, lines=20000, silent_ports=8):
+    """
+    Recepción por un pty: readline() por línea frente al lector por bloques con separación
+    incremental; y autodescubrimiento del dron entre varios puertos mudos.
+    """
+    if not hasattr(os, 'openpty'):
+        print("Serial omitido: requiere pseudo-terminales (POSIX)")
+        return []
+    import tty
+    count = lines * scale
+
+    def legacy(ser):
+        raw = ser.readline()
+        if not raw:
+            return None
+        telemetry_subsystem.parse_line(raw.strip())
+        return 1
+
+    def chunked_reader():
+        reader = None
+        decoder = protocol_subsystem.initialize_decoder('ascii')
+
+        def read(ser):
+            nonlocal reader
+            if reader is None:
+                reader = transport_subsystem.initialize_reader(ser)
+            chunk, _ = transport_subsystem.read_chunk(reader, timeout=0.5)
+            if not chunk:
+                return None
+            messages = protocol_subsystem.feed_decoder(decoder, chunk, [])
+            for message in messages:
+                telemetry_subsystem.parse_line(message[1])
+            return len(messages)
+
+        return read
+
+    results = [measure_serial_drain('serial.readline', legacy, count),
+               measure_serial_drain('serial.chunked', chunked_reader(), count)]
+
+    ptys = []
+    for _ in range(silent_ports):
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        ptys.append((master, slave))
+    link = transport_subsystem.PtyDroneLink(simulation_subsystem.initialize_drone_model())
+    ports = [os.ttyname(slave) for _, slave in ptys] + [link.port]
+    try:
+        start = time.perf_counter()
+        ser = transport_subsystem.discover_serial(ports)
+        elapsed = time.perf_counter() - start
+        ser.close()
+    finally:
+        for master, slave in ptys:
+            os.close(master)
+            os.close(slave)
+    results.append({
+        'name': 'serial.discover',
+        'iterations': 1,
+        'throughput_ops': 1 / elapsed,
+        'p50_us': elapsed * 1e6,
+        'p99_us': elapsed * 1e6,
+        'peak_memory_kb': 0.0,
+        'ports': len(ports),
+        'sequential_estimate_s': len(ports) * transport_subsystem.PROBE_TIMEOUT_S
+    })
+    return results
+
+
+def bench_fleet(scale, sizes=(1, 4, 16), seconds=3.0):
+    """
+    Modo multidron: N drones simulados atendidos por un bucle asyncio durante seconds.
+    Latencias = llegada a parseo del peor enlace; se añaden el retraso del tick de control
+    común y el p99 de cada enlace.
+    """
+    import asyncio
+    import multidrone_subsystem
+    results = []
+    for size in sizes:
+        fleet = multidrone_subsystem.initialize_fleet([f'sim*{size}'], log=False)
+        try:
+            asyncio.run(multidrone_subsystem.run_fleet(fleet, duration=seconds * scale, dashboard_interval=0))
+            snapshots = [metrics_subsystem.snapshot(link['station'].metrics) for link in fleet['links']]
+            fleet_latency = metrics_subsystem.snapshot(fleet['metrics'])['latency']
+        finally:
+            multidrone_subsystem.close_fleet(fleet)
+        packets = sum(snap['counters'].get('packets', 0) for snap in snapshots)
+        rx = [snap['latency'].get('rx_to_parse', {}) for snap in snapshots]
+        results.append({
+            'name': f'fleet.links_{size}',
+            'iterations': packets,
+            'throughput_ops': packets / (seconds * scale),
+            'p50_us': max(latency.get('p50_ms', 0.0) for latency in rx) * 1000,
+            'p99_us': max(latency.get('p99_ms', 0.0) for latency in rx) * 1000,
+            'peak_memory_kb': 0.0,
+            'per_link_packets_per_s': [snap['counters'].get('packets', 0) / (seconds * scale) for snap in snapshots],
+            'per_link_rx_p99_ms': [latency.get('p99_ms', 0.0) for latency in rx],
+            'control_lateness_p99_ms': fleet_latency.get('control_lateness', {}).get('p99_ms', 0.0),
+            'control_sweep_p99_ms': fleet_latency.get('control_sweep', {}).get('p99_ms', 0.0)
+        })
+    return results
+
+
+def synthetic_series(length):
+    """Series de gráficos sintéticas de un vuelo en círculo con la longitud indicada."""
+    model = simulation_subsystem.initialize_drone_model()
+    base = datetime.datetime(2025, 1, 1)
+    series = {'times': [], 'latitudes': [], 'longitudes': [], 'gps_altitudes': [], 'baro_altitudes': [],
+              'voltages': []}
+    for i in range(length):
+        t = i * 0.1
+        lat, lon, altitude = simulation_subsystem.drone_position(model, t)
+        series['times'].append(base + datetime.timedelta(seconds=t))
+        series['latitudes'].append(lat)
+        series['longitudes'].append(lon)
+        series['gps_altitudes'].append(altitude + 600.0)
+        series['baro_altitudes'].append(altitude)
+        series['voltages'].append(12.6 - 0.0002 * i)
+    return series
+
+
+def bench_plot(scale, lengths=(100, 1000, 10000)):
+    """Generación de la figura de Plotly y escritura del HTML para distintas longitudes de historial."""
+    try:
+        import plot_subsystem
+    except ImportError as e:
+        print(f"Gráficos omitidos: {e}")
+        return []
+    results = []
+    directory = tempfile.mkdtemp(prefix='bench_plot_')
+    path = os.path.join(directory, 'telemetry_plot.html')
+    try:
+        for length in lengths:
+            series = synthetic_series(length)
+
+            def build(_, i):
+                plot_subsystem.build_telemetry_figure(series, SAMPLE_FLIGHT_DATA, 4)
+
+            def write(_, i):
+                plot_subsystem.write_telemetry_plot(series, SAMPLE_FLIGHT_DATA, 4, path)
+
+            results.append(run_case(f'plot.build_figure_{length}', build, 5 * scale, memory_iterations=2))
+            results.append(run_case(f'plot.write_html_{length}', write, 3 * scale, memory_iterations=1))
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(directory)
+    return results
+
+
+def bench_timeseries(scale, lengths=(10000, 100000)):
+    """Inserción en el búfer circular de gráficos y reducción del historial completo a 1000 puntos."""
+    import timeseries_subsystem
+    row = (1.7e9, 40.4168, -3.7038, 612.3, 12.3, 12.1, 0.7, -2.0, -0.1)
+
+    def append(state, i):
+        timeseries_subsystem.append_row(state, row)
+
+    results = [run_case('timeseries.append', append, 50000 * scale,
+                        setup=lambda: timeseries_subsystem.initialize_timeseries(100000))]
+    columns = ('latitude', 'longitude', 'gps_altitude', 'baro_altitude', 'voltage')
+    for length in lengths:
+        series = synthetic_series(length)
+        state = timeseries_subsystem.initialize_timeseries(length)
+        for i in range(length):
+            timeseries_subsystem.append_row(state, (
+                i * 0.1, series['latitudes'][i], series['longitudes'][i], series['gps_altitudes'][i],
+                series['baro_altitudes'][i], series['voltages'][i], 0.0, 0.0, 0.0))
+
+        def downsample(_, i):
+            window = timeseries_subsystem.latest_window(state)
+            timeseries_subsystem.downsample(window, columns, 1000)
+
+        results.append(run_case(f'timeseries.downsample_{length}', downsample, 20 * scale, memory_iterations=2))
+    return results
+
+
+BENCHMARKS = {
+    'parse': bench_parse,
+    'control': bench_controller,
+    'station': bench_station,
+    'haversine': bench_haversine,
+    'navigation': bench_navigation,
+    'breadcrumbs': bench_breadcrumbs,
+    'log': bench_log,
+    'flightlog': bench_flightlog,
+    'analytics': bench_analytics,
+    'video': bench_video,
+    'plot': bench_plot,
+    'timeseries': bench_timeseries,
+    'jitter': bench_jitter,
+    'fleet': bench_fleet,
+    'serial': bench_serial,
+    'ewd': bench_ewd
+}
+
+
+def git_commit():
+    """Commit actual del repositorio, si está disponible."""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results, baseline=None):
+    """Imprime la tabla de resultados y, si hay referencia, la relación de rendimiento."""
+    previous = {r['name']: r for r in baseline['results']} if baseline else {}
+    print(f"{'caso':32} {'op/s':>12} {'p50 us':>10} {'p99 us':>10} {'pico KB':>10}")
+    for r in results:
+        line = (f"{r['name']:32} {r['throughput_ops']:12.1f} {r['p50_us']:10.2f} {r['p99_us']:10.2f} "
+                f"{r['peak_memory_kb']:10.1f}")
+        old = previous.get(r['name'])
+        if old and old['throughput_ops']:
+            line += f"  x{r['throughput_ops'] / old['throughput_ops']:.2f}"
+        print(line)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Banco de pruebas de la estación de tierra")
+    arg_parser.add_argument('--only', default=None, help=f"Casos separados por comas: {','.join(BENCHMARKS)}")
+    arg_parser.add_argument('--scale', type=int, default=1, help="Multiplicador del número de iteraciones")
+    arg_parser.add_argument('--out', default='bench_results.json', help="Archivo JSON de resultados")
+    arg_parser.add_argument('--compare', default=None, help="JSON de una ejecución anterior para comparar")
+    args = arg_parser.parse_args()
+
+    selected = args.only.split(',') if args.only else list(BENCHMARKS)
+    results = []
+    for name in selected:
+        print(f"== {name}")
+        results.extend(BENCHMARKS[name](args.scale))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'scale': args.scale,
+        'results': results
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados guardados en {args.out}")
+
+
+if __name__ == '__main__':
+    main()
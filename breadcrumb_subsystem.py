@@ -0,0 +1,184 @@
+"""
+Rastro de migas de pan del vuelo con memoria acotada, para que el RTH pueda desandar el camino.
+
+Los puntos llegan en el plano local de navigation_subsystem (este, norte en metros) y se
+simplifican en línea con un cono de apertura: desde el último punto guardado (ancla) se mantiene
+el intervalo de direcciones en el que una recta pasa a menos de la holgura lateral de todos los
+puntos recibidos. Mientras el nuevo punto cae dentro del cono no se guarda nada; cuando sale
+(giro) o retrocede hacia el ancla más que la holgura de retroceso, el punto anterior pasa a ser
+el nuevo ancla. Un punto alcanzado más lejos que el vértice guardado queda como mucho a la
+holgura de retroceso por delante de él, así que con ambas holguras (CONE_LATERAL y CONE_RETREAT,
+con suma de cuadrados igual a 1/4) ningún punto se aleja más de tolerance_m / 2 de su segmento,
+también en las horquillas. Cada punto cuesta O(1).
+
+La memoria está acotada a max_points puntos guardados. Al llenarse, los vértices que aún no se
+habían compactado pasan una sola vez por Douglas-Peucker con la otra mitad de la tolerancia, así
+que ningún punto del rastro se aleja más de tolerance_m del camino volado. Si aun así no cabe en
+la mitad del presupuesto se descartan los puntos más antiguos (los más cercanos a casa, adonde
+el RTH vuelve en línea recta al terminar el rastro).
+
+El lector (etapa de parseo) anexa y el control o la GUI leen desde otros hilos: todo acceso pasa
+por el lock del rastro.
+"""
+import math
+from threading import Lock
+
+# Desviación máxima del rastro respecto al camino volado (metros)
+BREADCRUMB_TOLERANCE_M = 2.0
+# Puntos guardados como máximo (memoria fija)
+BREADCRUMB_MAX_POINTS = 1024
+# Reparto de la mitad en línea de la tolerancia entre el error lateral y el retroceso tolerado
+# dentro de un segmento (fracciones de tolerance_m): sqrt(LATERAL² + RETREAT²) = 1/2
+CONE_LATERAL = math.sqrt(3) / 4
+CONE_RETREAT = 0.25
+
+
+def initialize_breadcrumbs(tolerance_m=BREADCRUMB_TOLERANCE_M, max_points=BREADCRUMB_MAX_POINTS):
+    """Inicializa un rastro vacío con la tolerancia y el presupuesto de puntos indicados."""
+    return {
+        'lock': Lock(),
+        'points': [],
+        'tolerance_m': tolerance_m,
+        'max_points': max(4, max_points),
+        # Puntos iniciales ya compactados (no vuelven a simplificarse) y puntos antiguos descartados
+        'compacted': 0,
+        'dropped': 0,
+        'last': None,
+        # Cono de direcciones desde el ancla: dirección base, márgenes relativos (radianes) y
+        # distancia máxima alcanzada (para detectar la vuelta sobre el propio camino)
+        'cone_base': None,
+        'cone_low': 0.0,
+        'cone_high': 0.0,
+        'cone_reach': 0.0,
+        'appended': 0,
+        'compactions': 0
+    }
+
+
+def append_point(trail, east, north):
+    """Añade un punto del camino volado; guarda un vértice solo si el camino deja el cono."""
+    with trail['lock']:
+        trail['appended'] += 1
+        points = trail['points']
+        if not points:
+            points.append((east, north))
+            trail['last'] = (east, north)
+            return
+        if not _inside_cone(trail, east, north):
+            # El camino gira o vuelve hacia el ancla: el punto anterior es el nuevo vértice
+            _commit_last(trail)
+            _inside_cone(trail, east, north)
+        trail['last'] = (east, north)
+
+
+def retrace_path(trail):
+    """Copia del rastro en orden inverso (del último punto volado hacia el primero) para el RTH."""
+    with trail['lock']:
+        path = list(trail['points'])
+        last = trail['last']
+    if last is not None and (not path or path[-1] != last):
+        path.append(last)
+    path.reverse()
+    return path
+
+
+def breadcrumb_stats(trail):
+    """Contadores del rastro para las métricas."""
+    with trail['lock']:
+        return {
+            'appended': trail['appended'],
+            'points': len(trail['points']),
+            'max_points': trail['max_points'],
+            'tolerance_m': trail['tolerance_m'],
+            'compactions': trail['compactions'],
+            'dropped': trail['dropped']
+        }
+
+
+def simplify(points, tolerance):
+    """Douglas-Peucker iterativo: índices de los puntos que se conservan (siempre los extremos)."""
+    count = len(points)
+    if count < 3:
+        return list(range(count))
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        x1, y1 = points[first]
+        x2, y2 = points[last]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        farthest, worst = None, tolerance
+        for index in range(first + 1, last):
+            px, py = points[index]
+            if length > 0:
+                deviation = abs(dx * (py - y1) - dy * (px - x1)) / length
+            else:
+                deviation = math.hypot(px - x1, py - y1)
+            if deviation > worst:
+                farthest, worst = index, deviation
+        if farthest is not None:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+    return [index for index in range(count) if keep[index]]
+
+
+def _inside_cone(trail, east, north):
+    """
+    Estrecha el cono del ancla con el punto; False si el punto queda fuera (el cono no cambia).
+    Los puntos a menos de la holgura lateral del ancla no aportan dirección y siempre caben.
+    """
+    anchor_east, anchor_north = trail['points'][-1]
+    dx = east - anchor_east
+    dy = north - anchor_north
+    distance = math.hypot(dx, dy)
+    if trail['cone_reach'] - distance > trail['tolerance_m'] * CONE_RETREAT:
+        # Vuelve hacia el ancla (también si llega junto a él)
+        return False
+    lateral = trail['tolerance_m'] * CONE_LATERAL
+    if distance <= lateral:
+        return True
+    direction = math.atan2(dy, dx)
+    half = math.asin(lateral / distance)
+    base = trail['cone_base']
+    if base is None:
+        trail['cone_base'] = direction
+        trail['cone_low'] = -half
+        trail['cone_high'] = half
+    else:
+        relative = (direction - base + math.pi) % (2 * math.pi) - math.pi
+        if not trail['cone_low'] <= relative <= trail['cone_high']:
+            return False
+        trail['cone_low'] = max(trail['cone_low'], relative - half)
+        trail['cone_high'] = min(trail['cone_high'], relative + half)
+    trail['cone_reach'] = max(trail['cone_reach'], distance)
+    return True
+
+
+def _commit_last(trail):
+    """Guarda el último punto como vértice (nuevo ancla) y compacta el rastro si se llenó."""
+    trail['points'].append(trail['last'])
+    trail['cone_base'] = None
+    trail['cone_reach'] = 0.0
+    if len(trail['points']) >= trail['max_points']:
+        _compact(trail)
+
+
+def _compact(trail):
+    """
+    Douglas-Peucker con la mitad de la tolerancia sobre los vértices aún no compactados; si el
+    rastro sigue ocupando más de la mitad del presupuesto se descartan los puntos más antiguos.
+    """
+    points = trail['points']
+    start = max(0, trail['compacted'] - 1)
+    tail = points[start:]
+    points = points[:start] + [tail[index] for index in simplify(tail, trail['tolerance_m'] / 2)]
+    keep = trail['max_points'] // 2
+    if len(points) > keep:
+        trail['dropped'] += len(points) - keep
+        points = points[-keep:]
+    trail['compacted'] = len(points)
+    trail['points'] = points
+    trail['compactions'] += 1
@@ -11,11 +11,16 @@ def initialize_drivingaid():
         'last_error_pitch': 0.0,
         'last_error_roll': 0.0,
         'last_error_yaw': 0.0,
-        'drivingaid_active': True
+        'drivingaid_active': True,
+        'last_commands': {'pitch': 0, 'roll': 0, 'yaw': 0}
     }
 
-def process_drivingaid(drivingaid_state, mpu_data, dt, button_b):
-    """Procesa datos del MPU-6050 para estabilizar el dron."""
+def process_drivingaid(drivingaid_state, mpu_data, dt, button_b, new_sample=True):
+    """
+    Procesa datos del MPU-6050 para estabilizar el dron.
+    Con new_sample=False (tick de control sin muestra nueva) se mantiene la última salida sin
+    volver a integrar ni derivar el mismo error.
+    """
     try:
         # Validar button_b
         button_b = button_b if button_b is not None else False
@@ -31,6 +36,9 @@ def process_drivingaid(drivingaid_state, mpu_data, dt, button_b):
         if not mpu_data.get('valid', False):
             return {'pitch': 0, 'roll': 0, 'yaw': 0}, drivingaid_state
 
+        if not new_sample:
+            return dict(drivingaid_state['last_commands']), drivingaid_state
+
         pitch = mpu_data['pitch']
         roll = mpu_data['roll']
         yaw = mpu_data['yaw']
@@ -60,11 +68,12 @@ def process_drivingaid(drivingaid_state, mpu_data, dt, button_b):
         drivingaid_state['last_error_yaw'] = error_yaw
         drivingaid_state['last_time'] = time.time()
 
-        return {
+        drivingaid_state['last_commands'] = {
             'pitch': int(pitch_adjust),
             'roll': int(roll_adjust),
             'yaw': int(yaw_adjust)
-        }, drivingaid_state
+        }
+        return dict(drivingaid_state['last_commands']), drivingaid_state
     except Exception as e:
         print(f"Error en DrivingAid: {e}")
         return {'pitch': 0, 'roll': 0, 'yaw': 0}, drivingaid_state
\ No newline at end of file
@@ -1,41 +1,193 @@
 import time
 
-def initialize_electronicwardefense():
-    """Inicializa el subsistema ElectronicWarDefense para reconexión de frecuencia."""
+# Fases del motor de saltos
+LINKED = 'linked'          # enlace activo
+AWAITING_OK = 'awaiting'   # ATF= enviado, esperando OK/ERROR del módem
+DWELL = 'dwell'            # canal aplicado, escuchando si el dron está en él
+# Inicio de los informes de RSSI del RFD900x
+RSSI_REPORT_PREFIX = b'L/R RSSI:'
+
+
+def initialize_electronicwardefense(frequencies=(915, 918, 921, 924, 927), signal_timeout=2.0, at_timeout=0.3,
+                                    dwell_time=0.35, cache_ttl=120.0):
+    """
+    Inicializa el subsistema ElectronicWarDefense para reconexión de frecuencia.
+    Ningún paso bloquea: ATF= se envía y la respuesta del módem se confirma en pasadas
+    posteriores (modem_response). Cada canal guarda una puntuación de éxitos recientes y su
+    último RSSI, de modo que la búsqueda prueba primero los canales más probables.
+    """
     print("ElectronicWarDefense ON")
+    now = time.time()
     return {
-        'frequencies': [915, 918, 921, 924, 927],
+        'frequencies': list(frequencies),
         'current_frequency': 0,
-        'last_signal_time': time.time(),
-        'signal_timeout': 2.0,
-        'scan_interval': 1.0,
+        'last_signal_time': now,
+        'signal_timeout': signal_timeout,
+        'at_timeout': at_timeout,
+        'dwell_time': dwell_time,
+        'cache_ttl': cache_ttl,
+        'phase': LINKED,
         'scanning': False,
-        'last_scan_time': time.time()
+        'candidates': [],
+        'phase_deadline': None,
+        'lost_time': None,
+        # Caché por canal: puntuación (éxitos con decaimiento), último éxito, fallos y RSSI
+        'channels': {frequency: {'score': 0.0, 'last_success': None, 'failures': 0, 'rssi': None}
+                     for frequency in frequencies},
+        'hops': 0,
+        'at_confirmed': 0,
+        'at_errors': 0,
+        'at_timeouts': 0,
+        'reacquisitions': 0,
+        'last_reacquire_s': None
     }
 
+
 def process_electronicwardefense(state, signal_received, set_frequency_callback):
-    """Procesa la lógica de reconexión en frecuencias alternativas."""
+    """
+    Procesa la lógica de reconexión en frecuencias alternativas (una pasada, sin esperas).
+    set_frequency_callback solo debe escribir ATF=; la confirmación llega por modem_response.
+    """
     try:
         current_time = time.time()
         if signal_received:
             state['last_signal_time'] = current_time
-            state['scanning'] = False
+            if state['phase'] != LINKED:
+                _reacquired(state, current_time)
             return state
 
-        if current_time - state['last_signal_time'] > state['signal_timeout']:
-            if not state['scanning']:
+        phase = state['phase']
+        if phase == LINKED:
+            if current_time - state['last_signal_time'] > state['signal_timeout']:
                 state['scanning'] = True
+                state['lost_time'] = state['last_signal_time']
+                _record_failure(state, _frequency(state))
+                state['candidates'] = rank_channels(state, current_time)
                 print("Signal lost, scanning frequencies")
-                state['last_scan_time'] = current_time
-
-            if current_time - state['last_scan_time'] > state['scan_interval']:
-                state['current_frequency'] = (state['current_frequency'] + 1) % len(state['frequencies'])
-                new_freq = state['frequencies'][state['current_frequency']]
-                set_frequency_callback(new_freq)
-                print(f"Reconnected on frequency {new_freq} MHz")
-                state['last_scan_time'] = current_time
-
+                _hop(state, current_time, set_frequency_callback)
+        elif phase == AWAITING_OK:
+            if current_time >= state['phase_deadline']:
+                # Sin respuesta del módem: se asume aplicado y se escucha igualmente
+                state['at_timeouts'] += 1
+                _start_dwell(state, current_time)
+        elif phase == DWELL:
+            if current_time >= state['phase_deadline']:
+                _record_failure(state, _frequency(state))
+                _hop(state, current_time, set_frequency_callback)
         return state
     except Exception as e:
         print(f"Error en ElectronicWarDefense: {e}")
-        return state
\ No newline at end of file
+        return state
+
+
+def modem_response(state, ok):
+    """Registra la respuesta OK/ERROR del módem a un ATF= pendiente."""
+    if state['phase'] != AWAITING_OK:
+        return
+    current_time = time.time()
+    if ok:
+        state['at_confirmed'] += 1
+        _start_dwell(state, current_time)
+    else:
+        # El módem rechazó el canal: se da por fallido y el siguiente salto llega al vencer el plazo
+        state['at_errors'] += 1
+        _record_failure(state, _frequency(state))
+        state['phase'] = DWELL
+        state['phase_deadline'] = current_time
+
+
+def parse_rssi_report(line):
+    """RSSI local de un informe del RFD900x (b'L/R RSSI: 206/197  L/R noise: ...'); None si no lo es."""
+    if not line.startswith(RSSI_REPORT_PREFIX):
+        return None
+    try:
+        return int(line[len(RSSI_REPORT_PREFIX):].split(b'/', 1)[0])
+    except ValueError:
+        return None
+
+
+def record_rssi(state, frequency, rssi):
+    """Guarda el último RSSI medido en un canal (p. ej. informes RSSI del RFD900x)."""
+    channel = state['channels'].get(frequency)
+    if channel is not None:
+        channel['rssi'] = rssi
+
+
+def rank_channels(state, current_time=None):
+    """
+    Ordena los canales candidatos: primero los de más éxitos recientes (entradas de la caché
+    más antiguas que cache_ttl se ignoran), luego por RSSI y menos fallos. El canal actual,
+    que acaba de fallar, va al final.
+    """
+    if current_time is None:
+        current_time = time.time()
+    current = _frequency(state)
+
+    def key(frequency):
+        channel = state['channels'][frequency]
+        fresh = channel['last_success'] is not None and current_time - channel['last_success'] <= state['cache_ttl']
+        rssi = channel['rssi'] if channel['rssi'] is not None else float('-inf')
+        return (frequency == current, -(channel['score'] if fresh else 0.0), -rssi, channel['failures'],
+                state['frequencies'].index(frequency))
+
+    return sorted(state['frequencies'], key=key)
+
+
+def ewd_stats(state):
+    """Contadores del motor de saltos para las métricas."""
+    return {
+        'frequency': _frequency(state),
+        'phase': state['phase'],
+        'hops': state['hops'],
+        'at_confirmed': state['at_confirmed'],
+        'at_errors': state['at_errors'],
+        'at_timeouts': state['at_timeouts'],
+        'reacquisitions': state['reacquisitions'],
+        'last_reacquire_s': state['last_reacquire_s']
+    }
+
+
+def _frequency(state):
+    """Frecuencia seleccionada actualmente."""
+    return state['frequencies'][state['current_frequency']]
+
+
+def _hop(state, current_time, set_frequency_callback):
+    """Envía ATF= al siguiente candidato (rehace la lista cuando se agota) sin esperar respuesta."""
+    if not state['candidates']:
+        state['candidates'] = rank_channels(state, current_time)
+    new_freq = state['candidates'].pop(0)
+    state['current_frequency'] = state['frequencies'].index(new_freq)
+    state['phase'] = AWAITING_OK
+    state['phase_deadline'] = current_time + state['at_timeout']
+    state['hops'] += 1
+    set_frequency_callback(new_freq)
+
+
+def _start_dwell(state, current_time):
+    """El canal ya está aplicado: escuchar dwell_time antes de pasar al siguiente."""
+    state['phase'] = DWELL
+    state['phase_deadline'] = current_time + state['dwell_time']
+
+
+def _reacquired(state, current_time):
+    """Telemetría recibida durante la búsqueda: el canal actual es bueno."""
+    frequency = _frequency(state)
+    channel = state['channels'][frequency]
+    channel['score'] = channel['score'] * 0.5 + 1.0
+    channel['last_success'] = current_time
+    channel['failures'] = 0
+    state['phase'] = LINKED
+    state['scanning'] = False
+    state['candidates'] = []
+    state['reacquisitions'] += 1
+    if state['lost_time'] is not None:
+        state['last_reacquire_s'] = current_time - state['lost_time']
+    print(f"Reconnected on frequency {frequency} MHz")
+
+
+def _record_failure(state, frequency):
+    """Un canal sin enlace pierde puntuación para la próxima búsqueda."""
+    channel = state['channels'][frequency]
+    channel['score'] *= 0.5
+    channel['failures'] += 1
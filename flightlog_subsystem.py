@@ -0,0 +1,255 @@
+"""
+Registro de vuelo binario columnar (.flog): alternativa a drone_data.csv para el análisis posterior.
+
+Formato (little-endian):
+  cabecera  MAGIC (8 bytes) + versión (u2) + tamaño de registro (u2) + reservado (u4)
+  registros RECORD_DTYPE de ancho fijo, solo anexados durante el vuelo
+  pie       índice temporal (timestamp_us de cada INDEX_STRIDE registros, i8) + INDEX_MAGIC (8 bytes)
+            + número de registros (u8) + paso del índice (u4) + entradas del índice (u4)
+
+Los instantes son microsegundos de época (UTC), así que no retroceden con el cambio de horario;
+la hora local solo aparece al convertir a CSV o al mostrarlos.
+
+Los registros se leen con numpy.memmap sin copias y se buscan por instante en O(log n): primero
+en el índice del pie y después dentro de un solo bloque. Un archivo sin pie (vuelo interrumpido)
+sigue siendo legible: el índice se reconstruye leyendo solo un registro de cada bloque.
+"""
+import csv
+import datetime
+import os
+import struct
+
+import numpy as np
+
+import log_subsystem
+
+EXTENSION = '.flog'
+MAGIC = b'IASFLOG1'
+INDEX_MAGIC = b'IASFIDX1'
+VERSION = 1
+INDEX_STRIDE = 4096
+# Mismas columnas que drone_data.csv; NaN = dato no válido (campo vacío en el CSV)
+RECORD_DTYPE = np.dtype([
+    ('timestamp_us', '<i8'),
+    ('latitude', '<f8'),
+    ('longitude', '<f8'),
+    ('gps_altitude', '<f8'),
+    ('baro_altitude', '<f8'),
+    ('battery_voltage', '<f8'),
+    ('ir_status', 'u1')
+])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+HEADER = struct.Struct('<8sHHI')
+TRAILER = struct.Struct('<8sQII')
+_RECORD = struct.Struct('<qdddddB')
+# Correspondencia entre las columnas del CSV y los campos de punto flotante del registro
+FLOAT_COLUMNS = (('Latitude', 'latitude'), ('Longitude', 'longitude'), ('GPS_Altitude', 'gps_altitude'),
+                 ('Baro_Altitude', 'baro_altitude'), ('Battery_Voltage', 'battery_voltage'))
+CONVERT_CHUNK = 65536
+
+
+def open_writer(path, index_stride=INDEX_STRIDE):
+    """
+    Abre un registro binario para anexar. Si ya existe se continúa tras su último registro
+    completo (se descarta el pie, que se reescribe al cerrar).
+    """
+    state = {'path': path, 'file': None, 'count': 0, 'index': [], 'index_stride': index_stride}
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        reader = open_flightlog(path)
+        state['count'] = reader['count']
+        state['index_stride'] = reader['index_stride']
+        state['index'] = [int(t) for t in reader['index']]
+        close_flightlog(reader)
+        log_file = open(path, 'r+b')
+        log_file.truncate(HEADER.size + state['count'] * RECORD_SIZE)
+        log_file.seek(0, os.SEEK_END)
+    else:
+        log_file = open(path, 'wb')
+        log_file.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, 0))
+    state['file'] = log_file
+    return state
+
+
+def write_row(state, row):
+    """Anexa una fila del registro (diccionario con LOG_COLUMNS) y devuelve los bytes escritos."""
+    values = [_timestamp_us(row.get("Timestamp"))]
+    for csv_column, _ in FLOAT_COLUMNS:
+        value = row.get(csv_column)
+        values.append(float('nan') if value is None or value == "" else float(value))
+    values.append(1 if row.get("IR_Status") == "ON" else 0)
+    if state['count'] % state['index_stride'] == 0:
+        state['index'].append(values[0])
+    state['file'].write(_RECORD.pack(*values))
+    state['count'] += 1
+    return RECORD_SIZE
+
+
+def write_records(state, records):
+    """Anexa un bloque de registros (array con RECORD_DTYPE) con una sola escritura."""
+    stride = state['index_stride']
+    first = -state['count'] % stride
+    state['index'].extend(int(t) for t in records['timestamp_us'][first::stride])
+    state['file'].write(np.ascontiguousarray(records, dtype=RECORD_DTYPE).tobytes())
+    state['count'] += len(records)
+    return len(records) * RECORD_SIZE
+
+
+def close_writer(state):
+    """Escribe el índice temporal del pie, sincroniza a disco y cierra el archivo."""
+    log_file = state['file']
+    if log_file is None:
+        return
+    index = np.array(state['index'], dtype='<i8')
+    log_file.write(index.tobytes())
+    log_file.write(TRAILER.pack(INDEX_MAGIC, state['count'], state['index_stride'], len(index)))
+    log_file.flush()
+    os.fsync(log_file.fileno())
+    log_file.close()
+    state['file'] = None
+
+
+def open_flightlog(path):
+    """
+    Abre un registro binario para lectura sin copias: 'records' es un numpy.memmap de solo
+    lectura (records['latitude'] es una vista de la columna). 'indexed' indica si tenía pie.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as log_file:
+        magic, version, record_size, _ = HEADER.unpack(log_file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"{path} no es un registro de vuelo {EXTENSION} compatible")
+        trailer = None
+        if file_size >= HEADER.size + TRAILER.size:
+            log_file.seek(file_size - TRAILER.size)
+            trailer = TRAILER.unpack(log_file.read(TRAILER.size))
+    indexed = trailer is not None and trailer[0] == INDEX_MAGIC
+    if indexed:
+        _, count, index_stride, entries = trailer
+    else:
+        # Sin pie (vuelo interrumpido): solo cuentan los registros completos
+        count = (file_size - HEADER.size) // RECORD_SIZE
+        index_stride, entries = INDEX_STRIDE, None
+    if count:
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+    else:
+        records = np.zeros(0, dtype=RECORD_DTYPE)
+    if indexed:
+        index = np.fromfile(path, dtype='<i8', count=entries, offset=HEADER.size + count * RECORD_SIZE)
+    else:
+        index = np.array(records['timestamp_us'][::index_stride])
+    return {'path': path, 'records': records, 'count': count, 'index': index, 'index_stride': index_stride,
+            'indexed': indexed}
+
+
+def close_flightlog(reader):
+    """Suelta el mapeo del archivo (se libera cuando no quedan vistas de él)."""
+    reader['records'] = None
+
+
+def seek_time(reader, when, side='left'):
+    """
+    Posición del primer registro con instante >= when (> when con side='right'), en O(log n).
+    when puede ser datetime (sin zona = hora local), segundos de época (float) o microsegundos (int).
+    """
+    target = _timestamp_us(when)
+    index = reader['index']
+    stride = reader['index_stride']
+    block = max(0, int(np.searchsorted(index, target, side=side)) - 1)
+    start = block * stride
+    end = min(reader['count'], start + stride + 1)
+    return start + int(np.searchsorted(reader['records']['timestamp_us'][start:end], target, side=side))
+
+
+def time_slice(reader, start=None, end=None):
+    """Vista sin copia de los registros entre start (incluido) y end (excluido)."""
+    first = 0 if start is None else seek_time(reader, start)
+    last = reader['count'] if end is None else seek_time(reader, end)
+    return reader['records'][first:max(first, last)]
+
+
+def timestamps(records):
+    """Instantes de los registros en segundos de época (float64)."""
+    return records['timestamp_us'] / 1e6
+
+
+def to_datetime(timestamp_us):
+    """Convierte microsegundos de época a datetime UTC con zona (exacto al microsegundo)."""
+    seconds, micros = divmod(int(timestamp_us), 1_000_000)
+    return datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc) + datetime.timedelta(microseconds=micros)
+
+
+def record_row(record):
+    """Fila del registro (como la recibe log_sample) a partir de un registro binario."""
+    row = {"Timestamp": to_datetime(record['timestamp_us'])}
+    for csv_column, field in FLOAT_COLUMNS:
+        value = float(record[field])
+        row[csv_column] = None if value != value else value
+    row["IR_Status"] = "ON" if record['ir_status'] else "OFF"
+    return row
+
+
+def csv_to_flightlog(csv_path, flog_path, index_stride=INDEX_STRIDE):
+    """Convierte un drone_data.csv a formato binario por bloques; devuelve el número de registros."""
+    if os.path.exists(flog_path):
+        os.remove(flog_path)
+    state = open_writer(flog_path, index_stride)
+    chunk = np.zeros(CONVERT_CHUNK, dtype=RECORD_DTYPE)
+    filled = 0
+    try:
+        with open(csv_path, newline='', encoding='utf-8') as csv_file:
+            for row in csv.DictReader(csv_file):
+                record = chunk[filled]
+                record['timestamp_us'] = _timestamp_us(
+                    datetime.datetime.strptime(row["Timestamp"], "%Y-%m-%d %H:%M:%S.%f"))
+                for csv_column, field in FLOAT_COLUMNS:
+                    value = row[csv_column]
+                    record[field] = float(value) if value else np.nan
+                record['ir_status'] = 1 if row["IR_Status"] == "ON" else 0
+                filled += 1
+                if filled == CONVERT_CHUNK:
+                    write_records(state, chunk)
+                    filled = 0
+        write_records(state, chunk[:filled])
+    finally:
+        close_writer(state)
+    return state['count']
+
+
+def flightlog_to_csv(flog_path, csv_path):
+    """Convierte un registro binario al esquema de drone_data.csv; devuelve el número de filas."""
+    reader = open_flightlog(flog_path)
+    try:
+        with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(log_subsystem.LOG_COLUMNS)
+            for start in range(0, reader['count'], CONVERT_CHUNK):
+                for record in reader['records'][start:start + CONVERT_CHUNK]:
+                    writer.writerow(log_subsystem.format_log_row(record_row(record)))
+        return reader['count']
+    finally:
+        close_flightlog(reader)
+
+
+def _timestamp_us(when):
+    """
+    Microsegundos de época de un datetime, de segundos (float) o de microsegundos (int).
+    Un datetime sin zona se toma como hora local (la del CSV).
+    """
+    if hasattr(when, 'timestamp'):
+        return int(round(when.timestamp() * 1_000_000))
+    if isinstance(when, (int, np.integer)):
+        return int(when)
+    return int(round(float(when) * 1_000_000))
+
+
+if __name__ == '__main__':
+    import argparse
+    arg_parser = argparse.ArgumentParser(description="Convierte registros de vuelo entre CSV y binario (.flog)")
+    arg_parser.add_argument('source', help="drone_data.csv o registro .flog")
+    arg_parser.add_argument('destination', help="Archivo de salida (el formato se deduce de la extensión)")
+    args = arg_parser.parse_args()
+    if args.source.endswith(EXTENSION):
+        rows = flightlog_to_csv(args.source, args.destination)
+    else:
+        rows = csv_to_flightlog(args.source, args.destination)
+    print(f"{rows} registros convertidos a {args.destination}")
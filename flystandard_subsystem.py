@@ -9,11 +9,17 @@ def initialize_flystandard():
         'target_altitude': None,
         'last_time': None,
         'error_sum': 0.0,
-        'last_error': 0.0
+        'last_error': 0.0,
+        'last_throttle': 500
     }
 
-def process_flystandard(flystandard_state, baro_data, button_a):
-    """Procesa la lógica de FlyStandard para control de altura."""
+def process_flystandard(flystandard_state, baro_data, button_a, dt=None, new_sample=True):
+    """
+    Procesa la lógica de FlyStandard para control de altura.
+    Si se indica dt (tiempo entre muestras) se usa en lugar del reloj de pared. Con
+    new_sample=False (tick de control sin muestra nueva) se mantiene la última salida sin
+    volver a integrar ni derivar el mismo error.
+    """
     try:
         # Togglear estado con botón A
         if button_a:
@@ -31,9 +37,12 @@ def process_flystandard(flystandard_state, baro_data, button_a):
 
         # Procesar comandos si está activo
         commands = {'throttle': 500}
-        if flystandard_state['flystandard_active'] and baro_data['valid']:
+        if flystandard_state['flystandard_active'] and baro_data['valid'] and not new_sample:
+            commands['throttle'] = flystandard_state['last_throttle']
+        elif flystandard_state['flystandard_active'] and baro_data['valid']:
             current_time = time.time()
-            dt = current_time - flystandard_state['last_time'] if flystandard_state['last_time'] else 0.1
+            if dt is None:
+                dt = current_time - flystandard_state['last_time'] if flystandard_state['last_time'] else 0.1
             flystandard_state['last_time'] = current_time
 
             error = flystandard_state['target_altitude'] - baro_data['baro_altitude']
@@ -44,6 +53,7 @@ def process_flystandard(flystandard_state, baro_data, button_a):
             kp, ki, kd = 50.0, 0.1, 10.0
             throttle_adjust = kp * error + ki * flystandard_state['error_sum'] + kd * d_error
             commands['throttle'] = max(400, min(600, 500 + int(throttle_adjust)))
+            flystandard_state['last_throttle'] = commands['throttle']
 
         return commands, flystandard_state
     except Exception as e:
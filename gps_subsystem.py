@@ -1,5 +1,14 @@
+from math import radians, sin, cos, sqrt, atan2
+
+from protocol_subsystem import VALID_GPS
+
 def process_gps_data(data):
-    """Procesa datos GPS desde el puerto serial."""
+    """Procesa datos GPS desde el puerto serial o como vista de una TelemetrySample."""
+    if not isinstance(data, (list, tuple)):
+        if data.has(VALID_GPS):
+            return {'latitude': data.latitude, 'longitude': data.longitude,
+                    'gps_altitude': data.gps_altitude, 'valid': True}
+        return {'latitude': 0, 'longitude': 0, 'gps_altitude': 0, 'valid': False}
     try:
         lat = float(data[0]) if data[0] else 0
         lon = float(data[1]) if data[1] else 0
@@ -24,4 +33,14 @@ def format_gps_data(gps_data):
         lat_text = "Latitud: 0"
         lon_text = "Longitud: 0"
         gps_alt_text = "Altitud GPS: 0"
-    return lat_text, lon_text, gps_alt_text
\ No newline at end of file
+    return lat_text, lon_text, gps_alt_text
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """Calcula la distancia en metros entre dos puntos GPS usando la fórmula de Haversine."""
+    R = 6371000
+    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    c = 2 * atan2(sqrt(a), sqrt(1-a))
+    return R * c
@@ -0,0 +1,536 @@
+"""
+Motor de la estación de tierra sin GUI: enlace, parser, controladores y sumideros de telemetría.
+
+GroundStation agrupa todo el estado que antes vivía en variables globales de main.py, de modo
+que se pueden crear varias estaciones en un mismo proceso, integrarlas en pruebas o bancos de
+rendimiento y medir cada etapa por separado. start()/stop() ejecutan las etapas en hilos del
+pipeline; step() ejecuta una pasada completa de forma síncrona, sin esperas.
+"""
+import datetime
+import time
+from threading import Lock
+
+import breadcrumb_subsystem
+import drivingaid_subsystem
+import electronicwardefense_subsystem
+import flystandard_subsystem
+import log_subsystem
+import metrics_subsystem
+import navigation_subsystem
+import pipeline_subsystem
+import protocol_subsystem
+import rth_subsystem
+import scheduler_subsystem
+import telemetry_subsystem
+import transport_subsystem
+import uplink_subsystem
+from battery_subsystem import voltage_to_percent
+
+# Frecuencia de muestreo del mando en su propio hilo (Hz)
+INPUT_RATE_HZ = 250
+# Grupos que deben ser válidos para actualizar los datos de vuelo
+FLIGHT_DATA_REQUIRED = protocol_subsystem.VALID_GPS | protocol_subsystem.VALID_BARO | protocol_subsystem.VALID_BATTERY
+EMPTY_SAMPLE = telemetry_subsystem.TelemetrySample()
+NEUTRAL_COMMANDS = {'pitch': 500, 'roll': 500, 'yaw': 500, 'throttle': 0}
+
+
+def calculate_signal_strength(last_signal_time):
+    """Calcula el nivel de señal (0-4 barras) según el tiempo desde la última recepción."""
+    elapsed = time.time() - last_signal_time
+    thresholds = [(0.5, 4), (1.0, 3), (1.5, 2), (2.0, 1)]
+    for threshold, bars in thresholds:
+        if elapsed < threshold:
+            return bars
+    return 0
+
+
+class LogSink:
+    """Sumidero que escribe cada muestra en drone_data.csv (escritor en segundo plano)."""
+
+    def __init__(self, path="drone_data.csv", **options):
+        self.state = log_subsystem.initialize_log(path, **options)
+
+    def handle_sample(self, sample, now):
+        gps_valid = sample.has(protocol_subsystem.VALID_GPS)
+        baro_valid = sample.has(protocol_subsystem.VALID_BARO)
+        battery_valid = sample.has(protocol_subsystem.VALID_BATTERY)
+        ir_on = sample.has(protocol_subsystem.VALID_IR) and sample.ir_status == 1
+        log_subsystem.log_sample(self.state, {
+            "Timestamp": now,
+            "Latitude": sample.latitude if gps_valid else None,
+            "Longitude": sample.longitude if gps_valid else None,
+            "GPS_Altitude": sample.gps_altitude if gps_valid else None,
+            "Baro_Altitude": sample.baro_altitude if baro_valid else None,
+            "Battery_Voltage": sample.voltage if battery_valid else None,
+            "IR_Status": "ON" if ir_on else "OFF"
+        })
+
+    def close(self):
+        log_subsystem.close_log(self.state)
+
+
+class TimeseriesSink:
+    """Sumidero que guarda el historial de los gráficos en un búfer circular numpy (NaN = no válido)."""
+
+    def __init__(self, capacity=200_000):
+        # numpy solo se importa si se usan los gráficos
+        import timeseries_subsystem
+        self.timeseries = timeseries_subsystem
+        self.series = timeseries_subsystem.initialize_timeseries(capacity)
+        # El búfer se sobrescribe en su sitio: los lectores copian bajo este lock
+        self.lock = Lock()
+
+    def handle_sample(self, sample, now):
+        gps_valid = sample.has(protocol_subsystem.VALID_GPS)
+        baro_valid = sample.has(protocol_subsystem.VALID_BARO)
+        battery_valid = sample.has(protocol_subsystem.VALID_BATTERY)
+        nan = float('nan')
+        with self.lock:
+            self.timeseries.append_row(self.series, (
+                now.timestamp(),
+                sample.latitude if gps_valid else nan,
+                sample.longitude if gps_valid else nan,
+                sample.gps_altitude if gps_valid else nan,
+                sample.baro_altitude if baro_valid else nan,
+                sample.voltage if battery_valid else nan,
+                sample.pitch, sample.roll, sample.yaw
+            ))
+
+    def close(self):
+        pass
+
+
+class LiveplotSink:
+    """Sumidero que publica cada punto en el servidor de gráficos en vivo."""
+
+    def __init__(self, state):
+        import liveplot_subsystem
+        self.liveplot = liveplot_subsystem
+        self.state = state
+
+    def handle_sample(self, sample, now):
+        gps_valid = sample.has(protocol_subsystem.VALID_GPS)
+        baro_valid = sample.has(protocol_subsystem.VALID_BARO)
+        battery_valid = sample.has(protocol_subsystem.VALID_BATTERY)
+        self.liveplot.publish_point(
+            self.state, now,
+            sample.latitude if gps_valid else None,
+            sample.longitude if gps_valid else None,
+            sample.gps_altitude if gps_valid else None,
+            sample.baro_altitude if baro_valid else None,
+            sample.voltage if battery_valid else None
+        )
+
+    def close(self):
+        pass
+
+
+class GroundStation:
+    """
+    Estación de tierra de un dron: posee el transporte, el decodificador, los estados de los
+    controladores y los sumideros. Los sumideros son objetos con handle_sample(sample, now) y
+    close(); read_input es una función opcional que devuelve (comandos, botón A, botón B) o
+    None si no hay mando.
+    """
+
+    def __init__(self, transport=None, protocol_mode='ascii', sinks=(), read_input=None, metrics=None,
+                 control_rate_hz=scheduler_subsystem.CONTROL_RATE_HZ, started_ns=None, name='drone', input_rate_hz=INPUT_RATE_HZ,
+                 geofence=None, breadcrumb_tolerance_m=breadcrumb_subsystem.BREADCRUMB_TOLERANCE_M):
+        self.name = name
+        self.transport = transport
+        self.protocol_mode = protocol_mode
+        self.sinks = list(sinks)
+        self.read_input = read_input
+        self.input_rate_hz = input_rate_hz
+        self.metrics = metrics if metrics is not None else metrics_subsystem.initialize_metrics()
+        self.started_ns = started_ns if started_ns is not None else time.monotonic_ns()
+        self.first_packet_ns = None
+
+        # Estados de los subsistemas
+        self.rth_state = rth_subsystem.initialize_rth()
+        self.flystandard_state = flystandard_subsystem.initialize_flystandard()
+        self.drivingaid_state = drivingaid_subsystem.initialize_drivingaid()
+        self.ewd_state = electronicwardefense_subsystem.initialize_electronicwardefense()
+
+        # Estado de vuelo: navegación en el plano local alrededor del primer fijo y geocercas opcionales
+        self.navigation = navigation_subsystem.initialize_navigation(geofence)
+        # Camino volado simplificado (memoria acotada) que el RTH desanda
+        self.breadcrumbs = breadcrumb_subsystem.initialize_breadcrumbs(breadcrumb_tolerance_m)
+        self.flight_data = {
+            'altitude': 0,
+            'distance': 0,
+            'latitude': 0,
+            'longitude': 0,
+            'battery_percent': 0,
+            'speed': 0
+        }
+
+        # Pipeline de etapas independientes
+        self.pipeline = pipeline_subsystem.initialize_pipeline()
+        self.rx_queue = pipeline_subsystem.create_queue(maxsize=100)
+        self.telemetry_slot = pipeline_subsystem.create_slot()
+        self.command_slot = pipeline_subsystem.create_slot()
+        self.control_scheduler = scheduler_subsystem.initialize_scheduler(rate_hz=control_rate_hz)
+        self.last_command_seq = 0
+        # Llegada de la última muestra que pasó por los PID: solo se integra una vez por muestra
+        self.controlled_arrival_ns = None
+        # Mando: el hilo de entrada publica el último estado y cuándo cambió por última vez
+        self.input_slot = pipeline_subsystem.create_slot()
+        self.last_input = None
+        self.input_ns = None
+        self.sent_input_ns = None
+        self.sent_decision_ns = None
+        self.pending_command = None
+
+        # Lectura por bloques del enlace; con el tiempo de un byte (8N1) se estima la llegada de
+        # cada mensaje de un bloque a partir de los bytes que llegaron detrás de él
+        self.reader = transport_subsystem.initialize_reader(transport) if transport is not None else None
+        baudrate = getattr(transport, 'baudrate', None)
+        self.byte_ns = 10e9 / baudrate if baudrate else 0.0
+        self.last_rx_ns = None
+
+        # Decodificador del enlace y secuencia de tramas de subida
+        self.decoder = protocol_subsystem.initialize_decoder(protocol_mode)
+        self.uplink = uplink_subsystem.initialize_uplink(baudrate or 57600)
+        self.uplink_seq = 0
+        # Escriben en el enlace la etapa TX (comandos) y la de parseo (ATF= de EWD): cada
+        # escritura completa se hace bajo este lock para que no se entremezclen
+        self.write_lock = Lock()
+        self.running = False
+
+    def add_sink(self, sink):
+        """Añade un sumidero de telemetría (registro, gráficos, GUI...)."""
+        self.sinks.append(sink)
+        return sink
+
+    def start(self):
+        """Inicia las etapas RX, parser, control y TX en hilos y registra sus métricas."""
+        if self.running:
+            return
+        self.running = True
+        self.register_gauges()
+        if self.read_input is not None:
+            pipeline_subsystem.start_stage(self.pipeline, "input", self.input_stage, rate_hz=self.input_rate_hz)
+        pipeline_subsystem.start_stage(self.pipeline, "serial_rx", self.serial_reader_stage)
+        pipeline_subsystem.start_stage(self.pipeline, "parser", self.parser_stage)
+        pipeline_subsystem.start_stage(self.pipeline, "control", self.controller_stage)
+        pipeline_subsystem.start_stage(self.pipeline, "command_tx", self.command_writer_stage)
+
+    def stop(self):
+        """Detiene las etapas y cierra los sumideros y el transporte."""
+        pipeline_subsystem.stop_pipeline(self.pipeline)
+        self.running = False
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                print(f"Error al cerrar sumidero: {e}")
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+            self.reader = None
+
+    def step(self, data=None, dt=None):
+        """
+        Una pasada síncrona completa sin esperas: decodifica data (o lo que haya en el transporte),
+        procesa cada mensaje, ejecuta EWD y un tick de control y ofrece el comando a la subida
+        (sale si cambió dentro del caudal permitido o si vence el latido, como en la etapa TX).
+        Devuelve el número de muestras de telemetría procesadas.
+        """
+        arrival_ns = None
+        if data is None and self.reader is not None:
+            data, arrival_ns = transport_subsystem.read_chunk(self.reader, timeout=0)
+        received = self.receive_bytes(data, arrival_ns) if data else 0
+        self.process_ewd(received > 0)
+        commands, sample_arrival_ns, decision_ns = self.control(self.control_scheduler['period_s'] if dt is None else dt)
+        self.offer_command(commands, sample_arrival_ns, decision_ns, self.input_ns)
+        return received
+
+    # Etapas del pipeline
+
+    def serial_reader_stage(self):
+        """
+        Etapa RX: vacía de una vez los bytes pendientes del enlace (espera como máximo 0.1 s si no
+        hay ninguno), separa líneas y tramas y encola cada mensaje con su instante de llegada.
+        """
+        if self.reader is None:
+            self.pipeline['stop_event'].wait(0.5)
+            return
+        chunk, arrival_ns = transport_subsystem.read_chunk(self.reader, timeout=0.1)
+        if not chunk:
+            return
+        # Hora UTC con zona: no retrocede con el cambio de horario; se pasa a local solo al mostrarla
+        now = datetime.datetime.now(datetime.timezone.utc)
+        metrics_subsystem.increment(self.metrics, 'rx_bytes', len(chunk))
+        trailing = []
+        messages = protocol_subsystem.feed_decoder(self.decoder, chunk, trailing)
+        previous_ns, self.last_rx_ns = self.last_rx_ns, arrival_ns
+        for message, after in zip(messages, trailing):
+            # El último byte del mensaje llegó after bytes antes que el final del bloque, y
+            # nunca antes de la lectura anterior
+            offset_ns = int(after * self.byte_ns)
+            if previous_ns is not None:
+                offset_ns = min(offset_ns, arrival_ns - previous_ns)
+            message_now = now - datetime.timedelta(microseconds=offset_ns // 1000) if offset_ns > 0 else now
+            pipeline_subsystem.put_drop_oldest(self.rx_queue, (message_now, arrival_ns - offset_ns, message))
+
+    def parser_stage(self):
+        """Etapa de parseo: decodifica telemetría, actualiza el estado de vuelo y alimenta los sumideros."""
+        item = pipeline_subsystem.get_item(self.rx_queue, timeout=0.1)
+        sample = None
+        if item is not None:
+            sample = self.handle_message(*item)
+        self.process_ewd(sample is not None)
+
+    def input_stage(self):
+        """Etapa de entrada: muestrea el mando a input_rate_hz y publica su estado solo cuando cambia."""
+        user_input = self.read_input()
+        if user_input != self.last_input:
+            self.last_input = user_input
+            pipeline_subsystem.publish(self.input_slot, (user_input, time.monotonic_ns()))
+
+    def controller_stage(self):
+        """Etapa de control: en cada tick del planificador aplica los controladores a la última telemetría."""
+        dt = scheduler_subsystem.wait_next_tick(self.control_scheduler, self.pipeline['stop_event'])
+        if dt is None:
+            return
+        commands, arrival_ns, decision_ns = self.control(dt)
+        pipeline_subsystem.publish(self.command_slot, (commands, arrival_ns, decision_ns, self.input_ns))
+
+    def command_writer_stage(self):
+        """
+        Etapa TX: ofrece a la subida el último comando publicado; sale si cambió (dentro del caudal
+        permitido) o si vence el latido. Espera lo justo para reintentar un cambio retenido.
+        """
+        timeout = 0.1
+        if self.pending_command is not None:
+            timeout = min(timeout, uplink_subsystem.wait_time(self.uplink, self.pending_command[0],
+                                                              time.monotonic_ns()))
+        latest = pipeline_subsystem.wait_newer(self.command_slot, self.last_command_seq, timeout=timeout)
+        if latest is not None:
+            self.pending_command, self.last_command_seq = latest
+        if self.pending_command is not None:
+            self.offer_command(*self.pending_command)
+
+    # Pasos individuales (compartidos por las etapas, step y el modo multidron)
+
+    def receive_bytes(self, data, arrival_ns=None):
+        """Decodifica un bloque de bytes recibido y procesa cada mensaje. Devuelve las muestras de telemetría."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        if arrival_ns is None:
+            arrival_ns = time.monotonic_ns()
+        metrics_subsystem.increment(self.metrics, 'rx_bytes', len(data))
+        received = 0
+        for message in protocol_subsystem.feed_decoder(self.decoder, data):
+            if self.handle_message(now, arrival_ns, message) is not None:
+                received += 1
+        return received
+
+    def handle_message(self, now, arrival_ns, message):
+        """Convierte un mensaje del decodificador en muestra, actualiza el estado y la publica. Devuelve la muestra o None."""
+        sample = None
+        if message[0] == 'line' and message[1] in protocol_subsystem.MODEM_REPLIES:
+            # Respuesta del módem a un ATF= del motor de saltos
+            electronicwardefense_subsystem.modem_response(self.ewd_state, message[1] == b'OK')
+        elif message[0] == 'line' and message[1].startswith(electronicwardefense_subsystem.RSSI_REPORT_PREFIX):
+            # Informe de RSSI de la radio: se anota en el canal actual para ordenar los saltos
+            rssi = electronicwardefense_subsystem.parse_rssi_report(message[1])
+            if rssi is not None:
+                electronicwardefense_subsystem.record_rssi(
+                    self.ewd_state, self.ewd_state['frequencies'][self.ewd_state['current_frequency']], rssi)
+        elif message[0] == 'line' and message[1]:
+            sample = telemetry_subsystem.parse_line(message[1])
+        elif message[0] == 'frame' and message[1] == protocol_subsystem.FRAME_TELEMETRY:
+            sample = telemetry_subsystem.parse_frame(message[4], message[2], message[3])
+        if sample is None:
+            return None
+        sample.arrival_ns = arrival_ns
+        metrics_subsystem.record_latency(self.metrics, 'rx_to_parse', time.monotonic_ns() - arrival_ns)
+        metrics_subsystem.increment(self.metrics, 'packets')
+        if sample.valid == 0:
+            metrics_subsystem.increment(self.metrics, 'parse_errors')
+        self.update_flight_data(sample, now)
+        pipeline_subsystem.publish(self.telemetry_slot, sample)
+        for sink in self.sinks:
+            sink.handle_sample(sample, now)
+        if self.first_packet_ns is None:
+            self.first_packet_ns = arrival_ns
+            print(f"Primer paquete de {self.name} {(arrival_ns - self.started_ns) / 1e6:.1f} ms tras el arranque")
+        return sample
+
+    def update_flight_data(self, sample, now):
+        """Actualiza altura, distancia, batería, velocidad y geocercas a partir de una muestra válida."""
+        if not sample.has(FLIGHT_DATA_REQUIRED):
+            return
+        flight_data = self.flight_data
+        flight_data['altitude'] = sample.baro_altitude
+        flight_data['latitude'] = sample.latitude
+        flight_data['longitude'] = sample.longitude
+        flight_data['battery_percent'] = voltage_to_percent(sample.voltage)
+
+        navigation = self.navigation
+        breach = navigation['geofence_breach']
+        navigation_subsystem.update_navigation(navigation, sample.latitude, sample.longitude, now.timestamp())
+        flight_data['distance'] = navigation['distance']
+        flight_data['speed'] = navigation['speed']
+        if not self.rth_state['rth_active']:
+            breadcrumb_subsystem.append_point(self.breadcrumbs, navigation['east'], navigation['north'])
+        if navigation['geofence_breach'] and not breach:
+            metrics_subsystem.increment(self.metrics, 'geofence_breaches')
+            zones = ', '.join(navigation['no_fly']) or 'fuera de la zona permitida'
+            print(f"Geocerca violada por {self.name}: {zones}")
+
+    def process_ewd(self, signal_received):
+        """Procesa ElectronicWarDefense con la recepción de esta pasada (nunca bloquea)."""
+        reacquisitions = self.ewd_state['reacquisitions']
+        self.ewd_state = electronicwardefense_subsystem.process_electronicwardefense(
+            self.ewd_state, signal_received, self.set_frequency
+        )
+        if self.ewd_state['reacquisitions'] != reacquisitions and self.ewd_state['last_reacquire_s'] is not None:
+            metrics_subsystem.record_latency(self.metrics, 'ewd_reacquire', int(self.ewd_state['last_reacquire_s'] * 1e9))
+
+    def control(self, dt):
+        """
+        Aplica mando, FlyStandard, DrivingAid y RTH a la última telemetría. Devuelve (comandos, llegada, decisión).
+        Los PID solo avanzan cuando hay una muestra nueva, con el tiempo entre muestras como paso
+        (dt, el periodo del tick, se usa para la primera); en los demás ticks mantienen su salida.
+        """
+        tick_ns = time.monotonic_ns()
+        sample, _ = pipeline_subsystem.read_latest(self.telemetry_slot)
+        telemetry = telemetry_subsystem.telemetry_views(sample if sample is not None else EMPTY_SAMPLE)
+        baro_data = telemetry['baro_data']
+        arrival_ns = sample.arrival_ns if sample is not None else None
+        new_sample = arrival_ns is not None and arrival_ns != self.controlled_arrival_ns
+        if new_sample:
+            if self.controlled_arrival_ns is not None and arrival_ns > self.controlled_arrival_ns:
+                dt = (arrival_ns - self.controlled_arrival_ns) / 1e9
+            self.controlled_arrival_ns = arrival_ns
+
+        # Procesar comandos
+        commands = dict(NEUTRAL_COMMANDS)
+        button_b = False
+        user_input = self.read_user_input()
+        if user_input is not None:
+            commands, button_a, button_b = user_input
+            commands = dict(commands)
+
+            # Procesar FlyStandard
+            flystandard_commands, self.flystandard_state = flystandard_subsystem.process_flystandard(
+                self.flystandard_state, baro_data, button_a, dt, new_sample
+            )
+            if self.flystandard_state['flystandard_active']:
+                commands['throttle'] = flystandard_commands['throttle']
+
+        # Procesar DrivingAid
+        drivingaid_commands, self.drivingaid_state = drivingaid_subsystem.process_drivingaid(
+            self.drivingaid_state, telemetry['mpu_data'], dt, button_b, new_sample
+        )
+        if self.drivingaid_state['drivingaid_active']:
+            commands['pitch'] = max(400, min(600, commands['pitch'] + drivingaid_commands['pitch']))
+            commands['roll'] = max(400, min(600, commands['roll'] + drivingaid_commands['roll']))
+            commands['yaw'] = max(400, min(600, commands['yaw'] + drivingaid_commands['yaw']))
+
+        # Procesar RTH
+        rth_commands, self.rth_state = rth_subsystem.process_rth(
+            self.rth_state, telemetry['gps_data'], baro_data, telemetry['battery_data'], self.navigation,
+            self.breadcrumbs
+        )
+        if self.rth_state['rth_active']:
+            commands = rth_commands
+
+        decision_ns = time.monotonic_ns()
+        metrics_subsystem.record_latency(self.metrics, 'control_tick', decision_ns - tick_ns)
+        if arrival_ns is not None:
+            metrics_subsystem.record_latency(self.metrics, 'rx_to_decision', decision_ns - arrival_ns)
+        return commands, arrival_ns, decision_ns
+
+    def read_user_input(self):
+        """Estado del mando: el último publicado por la etapa de entrada o, sin ella, una lectura directa."""
+        if self.read_input is None:
+            return None
+        if 'input' in self.pipeline['stages']:
+            latest, _ = pipeline_subsystem.read_latest(self.input_slot)
+            if latest is None:
+                return None
+            user_input, self.input_ns = latest
+            return user_input
+        self.input_ns = time.monotonic_ns()
+        return self.read_input()
+
+    def offer_command(self, commands, arrival_ns, decision_ns, input_ns=None):
+        """Envía el comando solo si cambió (y hay caudal) o si vence el latido. Devuelve si salió."""
+        reason = uplink_subsystem.send_reason(self.uplink, commands, time.monotonic_ns())
+        if reason is None:
+            return False
+        self.send_command(commands, arrival_ns, decision_ns, input_ns, reason)
+        return True
+
+    def send_command(self, commands, arrival_ns, decision_ns, input_ns=None, reason=None):
+        """Envía un comando al dron (binario o ASCII según lo negociado) en una sola escritura y mide su latencia."""
+        if self.transport is None:
+            return
+        binary = protocol_subsystem.uplink_binary(self.protocol_mode, self.decoder)
+        if binary:
+            self.uplink_seq += 1
+        frame = uplink_subsystem.encode_command(self.uplink, commands, binary, self.uplink_seq,
+                                                int(time.monotonic() * 1000))
+        with self.write_lock:
+            self.transport.write(frame)
+        write_ns = time.monotonic_ns()
+        uplink_subsystem.record_sent(self.uplink, commands, len(frame), write_ns, reason)
+        metrics_subsystem.increment(self.metrics, 'commands_sent')
+        if decision_ns != self.sent_decision_ns:
+            # Primer envío de esta decisión: los latidos que la repiten no son latencia nueva
+            self.sent_decision_ns = decision_ns
+            metrics_subsystem.record_latency(self.metrics, 'decision_to_cmd_write', write_ns - decision_ns)
+            if arrival_ns is not None:
+                metrics_subsystem.record_latency(self.metrics, 'radio_to_cmd', write_ns - arrival_ns)
+        if input_ns is not None and input_ns != self.sent_input_ns:
+            # Primer envío tras un cambio del mando
+            self.sent_input_ns = input_ns
+            metrics_subsystem.record_latency(self.metrics, 'stick_to_cmd', write_ns - input_ns)
+
+    def set_frequency(self, frequency):
+        """Envía ATF= al RFD900x de la PC sin esperar; EWD confirma el OK en pasadas posteriores."""
+        if self.transport is None:
+            return
+        try:
+            with self.write_lock:
+                self.transport.write(f"ATF={frequency}\r\n".encode('utf-8'))
+            metrics_subsystem.increment(self.metrics, 'ewd_frequency_hops')
+        except Exception as e:
+            print(f"Error al cambiar frecuencia: {e}")
+
+    # Consultas
+
+    def signal_strength(self):
+        """Nivel de señal actual (0-4 barras)."""
+        return calculate_signal_strength(self.ewd_state['last_signal_time'])
+
+    def latest_telemetry(self):
+        """Última muestra recibida (o None) y sus vistas por subsistema."""
+        sample, _ = pipeline_subsystem.read_latest(self.telemetry_slot)
+        return sample, telemetry_subsystem.telemetry_views(sample if sample is not None else EMPTY_SAMPLE)
+
+    def startup_to_first_packet_ms(self):
+        """Tiempo desde el arranque hasta el primer paquete (None si aún no llegó)."""
+        if self.first_packet_ns is None:
+            return None
+        return (self.first_packet_ns - self.started_ns) / 1e6
+
+    def register_gauges(self):
+        """Registra las métricas de la cola RX, el decodificador, el planificador, EWD, la subida y el rastro."""
+        metrics = self.metrics
+        metrics_subsystem.register_gauge(metrics, 'rx_queue_dropped', lambda: self.rx_queue['dropped'])
+        metrics_subsystem.register_gauge(metrics, 'decoder', lambda: {
+            key: self.decoder[key] for key in ('frames', 'lines', 'crc_errors', 'discarded_bytes', 'lost_frames')
+        })
+        metrics_subsystem.register_gauge(metrics, 'control_scheduler',
+                                         lambda: scheduler_subsystem.scheduler_stats(self.control_scheduler))
+        metrics_subsystem.register_gauge(metrics, 'current_frequency',
+                                         lambda: self.ewd_state['frequencies'][self.ewd_state['current_frequency']])
+        metrics_subsystem.register_gauge(metrics, 'ewd', lambda: electronicwardefense_subsystem.ewd_stats(self.ewd_state))
+        metrics_subsystem.register_gauge(metrics, 'uplink', lambda: uplink_subsystem.uplink_stats(self.uplink))
+        metrics_subsystem.register_gauge(metrics, 'breadcrumbs',
+                                         lambda: breadcrumb_subsystem.breadcrumb_stats(self.breadcrumbs))
+        metrics_subsystem.register_gauge(metrics, 'startup_to_first_packet_ms', self.startup_to_first_packet_ms)
@@ -0,0 +1,219 @@
+"""
+Tablero Tk de la estación: video con la telemetría superpuesta, grabación y telemetry_plot.html.
+
+Es un consumidor más de GroundStation: lee su última telemetría y sus datos de vuelo y añade
+sus propias etapas al pipeline de la estación. Solo se importa con GUI, así que tkinter,
+OpenCV/PIL, numpy y plotly no se cargan en el modo sin GUI.
+"""
+import datetime
+import time
+import tkinter as tk
+from tkinter import ttk
+
+import groundstation_subsystem
+import liveplot_subsystem
+import metrics_subsystem
+import pipeline_subsystem
+import plot_subsystem
+import recorder_subsystem
+import timeseries_subsystem
+import video_subsystem
+import videoprocess_subsystem
+
+# Sin video, la imagen de "sin señal" se redibuja a este ritmo; con video se muestra cada
+# fotograma nuevo en cuanto llega (al ritmo nativo de la capturadora, 30/60 fps)
+NO_SIGNAL_RATE_HZ = 5
+# Con --video-process, la GUI comprueba si hay fotograma nuevo cada VIDEO_POLL_MS
+VIDEO_POLL_MS = 15
+# Puntos máximos dibujados en telemetry_plot.html, sea cual sea la duración del vuelo
+PLOT_MAX_POINTS = 1000
+PLOT_COLUMNS = ('latitude', 'longitude', 'gps_altitude', 'baro_altitude', 'voltage')
+
+
+def initialize_gui(station, record_video=None, record_raw=False, video_process=False, liveplot_state=None):
+    """
+    Crea la ventana, el video (en un hilo o en un proceso aparte) y la grabación opcional.
+    Sin liveplot_state añade a la estación el sumidero del historial de telemetry_plot.html.
+    """
+    root = tk.Tk()
+    root.title("Tablero de Telemetría y Video del Dron")
+    root.geometry("1400x800")
+    print("GUI inicializada correctamente")  # Depuración
+
+    # Panel de video
+    video_frame = ttk.Frame(root)
+    video_frame.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
+    video_label = ttk.Label(video_frame)
+    video_label.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
+
+    gui = {
+        'station': station,
+        'root': root,
+        'video_label': video_label,
+        # Ruta de visualización con búferes preasignados y un único PhotoImage
+        'video_display': video_subsystem.initialize_display(root, video_label),
+        'frame_slot': pipeline_subsystem.create_slot(),
+        'last_frame_seq': 0,
+        'record_raw': record_raw,
+        'video_recorder': None,
+        'video_process': None,
+        'video_cap': None,
+        'liveplot_state': liveplot_state,
+        'plot_sink': None
+    }
+    if liveplot_state is None:
+        gui['plot_sink'] = station.add_sink(groundstation_subsystem.TimeseriesSink())
+
+    # Inicializar captura de video: en un proceso aparte (la GUI solo copia los fotogramas) o aquí
+    if video_process:
+        gui['video_process'] = videoprocess_subsystem.start_video_process(device='0')
+        if gui['video_process'] is not None and record_raw:
+            print("--record-raw no está disponible con --video-process: se graba con superposición")
+    if gui['video_process'] is None:
+        gui['video_cap'] = video_subsystem.initialize_video_stream(device_index=0)
+
+    # Grabación de video en segundo plano (opcional), al ritmo medido de la capturadora
+    if record_video:
+        if gui['video_process'] is not None:
+            fps = videoprocess_subsystem.measure_capture_fps(gui['video_process'])
+        elif gui['video_cap'] is not None:
+            fps = video_subsystem.measure_capture_fps(gui['video_cap'])
+        else:
+            fps = None
+        gui['video_recorder'] = recorder_subsystem.initialize_recorder(record_video, fps=fps)
+    return gui
+
+
+def start_gui(gui):
+    """Inicia las etapas de video (o el sondeo del proceso de video), los gráficos y sus métricas."""
+    station = gui['station']
+    metrics = station.metrics
+    if gui['video_process'] is not None:
+        gui['root'].after(VIDEO_POLL_MS, present_video_process, gui)
+        metrics_subsystem.register_gauge(metrics, 'video_process',
+                                         lambda: videoprocess_subsystem.video_process_stats(gui['video_process']))
+    else:
+        if gui['video_cap'] is not None:
+            pipeline_subsystem.start_stage(station.pipeline, "video_capture", lambda: video_capture_stage(gui))
+        pipeline_subsystem.start_stage(station.pipeline, "video", lambda: video_stage(gui))
+    if gui['video_recorder'] is not None:
+        metrics_subsystem.register_gauge(metrics, 'video_recorder',
+                                         lambda: recorder_subsystem.recorder_stats(gui['video_recorder']))
+
+    # Iniciar actualización de gráficos
+    gui['root'].after(1000, update_plot, gui)
+    print("Programada actualización de gráficos con root.after")  # Depuración
+
+
+def run_gui(gui):
+    """Ejecuta el bucle de Tk hasta que se cierre la ventana."""
+    # Forzar actualización inicial de la GUI
+    gui['root'].update()
+    gui['root'].mainloop()
+
+
+def close_gui(gui):
+    """Libera la capturadora, el proceso de video y la grabación (tras detener la estación)."""
+    if gui['video_cap'] is not None:
+        video_subsystem.release_video_stream(gui['video_cap'])
+    videoprocess_subsystem.stop_video_process(gui['video_process'])
+    recorder_subsystem.close_recorder(gui['video_recorder'])
+
+
+def video_capture_stage(gui):
+    """Etapa de captura: lee la capturadora a su ritmo y publica solo el fotograma más reciente."""
+    station = gui['station']
+    frame = video_subsystem.read_frame(gui['video_cap'])
+    if frame is None:
+        metrics_subsystem.increment(station.metrics, 'frames_capture_failed')
+        station.pipeline['stop_event'].wait(0.1)
+        return
+    capture_ns = time.monotonic_ns()
+    pipeline_subsystem.publish(gui['frame_slot'], (frame, capture_ns))
+    metrics_subsystem.increment(station.metrics, 'frames_captured')
+    if gui['video_recorder'] is not None and gui['record_raw']:
+        sample, _ = pipeline_subsystem.read_latest(station.telemetry_slot)
+        recorder_subsystem.record_frame(gui['video_recorder'], frame, capture_ns, sample)
+
+
+def video_stage(gui):
+    """Etapa de video: muestra el último fotograma con la telemetría superpuesta; los atrasados se descartan."""
+    station = gui['station']
+    metrics = station.metrics
+    frame, capture_ns = None, None
+    last_frame_seq = gui['last_frame_seq']
+    result = pipeline_subsystem.wait_newer(gui['frame_slot'], last_frame_seq, timeout=1.0 / NO_SIGNAL_RATE_HZ)
+    if result is not None:
+        (frame, capture_ns), seq = result
+        if seq > last_frame_seq + 1:
+            metrics_subsystem.increment(metrics, 'frames_dropped', seq - last_frame_seq - 1)
+        gui['last_frame_seq'] = seq
+    start_ns = time.monotonic_ns()
+    sample, telemetry = station.latest_telemetry()
+    if video_subsystem.show_frame(gui['video_display'], frame, station.flight_data, telemetry,
+                                  station.signal_strength()):
+        display_ns = time.monotonic_ns()
+        if frame is not None:
+            metrics_subsystem.increment(metrics, 'frames_displayed')
+            metrics_subsystem.record_latency(metrics, 'capture_to_display', display_ns - capture_ns)
+            if gui['video_recorder'] is not None and not gui['record_raw']:
+                # El búfer compuesto se reutiliza en el siguiente fotograma: se graba una copia
+                recorder_subsystem.record_frame(gui['video_recorder'], gui['video_display']['rgba'], capture_ns,
+                                                sample, copy=True)
+        metrics_subsystem.record_latency(metrics, 'frame_render', display_ns - start_ns)
+        if sample is not None and sample.arrival_ns is not None:
+            metrics_subsystem.record_latency(metrics, 'rx_to_frame_display', display_ns - sample.arrival_ns)
+    elif frame is not None:
+        # Tk aún no tomó el fotograma anterior (o falló la composición): este no se muestra
+        metrics_subsystem.increment(metrics, 'frames_dropped')
+
+
+def present_video_process(gui):
+    """Modo de proceso de video: envía la superposición y muestra el último fotograma compartido (hilo de Tk)."""
+    station = gui['station']
+    video_process = gui['video_process']
+    try:
+        sample, telemetry = station.latest_telemetry()
+        videoprocess_subsystem.send_overlay(video_process, station.flight_data, telemetry, station.signal_strength())
+        capture_ns = videoprocess_subsystem.present_latest(video_process, gui['video_label'])
+        if capture_ns is not None:
+            metrics_subsystem.increment(station.metrics, 'frames_displayed')
+            metrics_subsystem.record_latency(station.metrics, 'capture_to_display', time.monotonic_ns() - capture_ns)
+            if gui['video_recorder'] is not None:
+                frame = video_process['frames'][video_process['front']]
+                recorder_subsystem.record_frame(gui['video_recorder'], frame, capture_ns, sample, copy=True)
+    except Exception as e:
+        print(f"Error al mostrar video del proceso: {e}")
+    gui['root'].after(VIDEO_POLL_MS, present_video_process, gui)
+
+
+def update_plot(gui):
+    """Actualiza los gráficos en telemetry_plot.html con datos de telemetría y vuelo."""
+    station = gui['station']
+    try:
+        if gui['liveplot_state'] is not None:
+            # En modo en vivo solo se publican los datos de vuelo; los puntos llegan como deltas
+            liveplot_subsystem.publish_flight_info(gui['liveplot_state'], station.flight_data,
+                                                   station.signal_strength())
+            gui['root'].after(1000, update_plot, gui)
+            return
+        # Todo el vuelo reducido a PLOT_MAX_POINTS conservando mínimos y máximos; la copia se
+        # hace bajo el lock porque el búfer circular se sobrescribe en su sitio
+        plot_sink = gui['plot_sink']
+        with plot_sink.lock:
+            window = timeseries_subsystem.latest_window(plot_sink.series)
+            window = timeseries_subsystem.downsample(window, PLOT_COLUMNS, PLOT_MAX_POINTS).copy()
+        series = {
+            'times': [datetime.datetime.fromtimestamp(t) for t in timeseries_subsystem.column(window, 'timestamp')],
+            'latitudes': timeseries_subsystem.column(window, 'latitude'),
+            'longitudes': timeseries_subsystem.column(window, 'longitude'),
+            'gps_altitudes': timeseries_subsystem.column(window, 'gps_altitude'),
+            'baro_altitudes': timeseries_subsystem.column(window, 'baro_altitude'),
+            'voltages': timeseries_subsystem.column(window, 'voltage')
+        }
+        plot_subsystem.write_telemetry_plot(series, station.flight_data, station.signal_strength(),
+                                            "telemetry_plot.html")
+        print("Gráficos actualizados en telemetry_plot.html")  # Depuración
+    except Exception as e:
+        print(f"Error al actualizar gráficos: {e}")
+    gui['root'].after(1000, update_plot, gui)
@@ -1,5 +1,11 @@
+from protocol_subsystem import VALID_IR
+
 def process_ir_data(data):
-    """Procesa datos de LEDs IR desde el puerto serial."""
+    """Procesa datos de LEDs IR desde el puerto serial o como vista de una TelemetrySample."""
+    if not isinstance(data, (list, tuple)):
+        if data.has(VALID_IR):
+            return {'ir_status': data.ir_status, 'valid': True}
+        return {'ir_status': 0, 'valid': False}
     try:
         ir_status = int(data[5]) if data[5] else 0
         valid = True
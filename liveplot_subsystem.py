@@ -0,0 +1,234 @@
+import collections
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Condition, Thread
+
+# Series enviadas al navegador, en el orden de las trazas de la página
+SERIES = ('t', 'lat', 'lon', 'gps_alt', 'baro_alt', 'voltage')
+
+LIVE_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Telemetría del Dron en Tiempo Real</title>
+<script src="/plotly.js"></script>
+<style>body { margin: 0; background: #111; }</style>
+</head>
+<body>
+<div id="plot" style="width: 100vw; height: 100vh;"></div>
+<script>
+const MAX_POINTS = __MAX_POINTS__;
+const layout = {
+  template: 'plotly_dark', paper_bgcolor: '#111', plot_bgcolor: '#111', font: {color: '#ddd'},
+  title: 'Telemetría del Dron en Tiempo Real', showlegend: true,
+  grid: {rows: 3, columns: 1, pattern: 'independent'},
+  geo: {projection: {type: 'mercator'}, showcountries: true, showland: true, fitbounds: 'locations',
+        domain: {y: [0.7, 1.0]}},
+  yaxis: {domain: [0.37, 0.63], title: 'Altitud (m)'},
+  yaxis2: {domain: [0.0, 0.3], title: 'Voltaje (V)'},
+  xaxis2: {anchor: 'y2'},
+  annotations: []
+};
+const traces = [
+  {type: 'scattergeo', mode: 'markers+lines', lat: [], lon: [], name: 'Ruta',
+   marker: {size: 6, color: 'red'}, line: {width: 2, color: 'blue'}},
+  {type: 'scatter', x: [], y: [], name: 'Altitud GPS', line: {color: 'blue'}},
+  {type: 'scatter', x: [], y: [], name: 'Altitud Baro', line: {color: 'green'}},
+  {type: 'scatter', x: [], y: [], name: 'Voltaje', line: {color: 'orange'}, xaxis: 'x2', yaxis: 'y2'}
+];
+function extend(delta) {
+  if (!delta.t.length) return;
+  Plotly.extendTraces('plot', {
+    lat: [delta.lat, [], [], []], lon: [delta.lon, [], [], []],
+    x: [[], delta.t, delta.t, delta.t], y: [[], delta.gps_alt, delta.baro_alt, delta.voltage]
+  }, [0, 1, 2, 3], MAX_POINTS);
+}
+function showInfo(info) {
+  if (!info) return;
+  const annotations = Object.entries(info).map(([key, value], i) => ({
+    x: 0.01, y: 0.99 - i * 0.04, xref: 'paper', yref: 'paper', text: key + ': ' + value,
+    showarrow: false, font: {size: 12, color: 'white'}, bgcolor: 'rgba(0, 0, 0, 0.5)',
+    xanchor: 'left', yanchor: 'top'
+  }));
+  Plotly.relayout('plot', {annotations: annotations});
+}
+fetch('/snapshot').then(r => r.json()).then(snapshot => {
+  Plotly.newPlot('plot', traces, layout, {responsive: true});
+  extend(snapshot.points);
+  showInfo(snapshot.info);
+  const events = new EventSource('/events?after=' + snapshot.seq);
+  events.onmessage = (e) => { const delta = JSON.parse(e.data); extend(delta.points); showInfo(delta.info); };
+});
+</script>
+</body>
+</html>
+"""
+
+
+def initialize_liveplot(max_points=3600, history_deltas=100):
+    """Inicializa el estado del servidor de gráficos en vivo (puntos pendientes, historial y deltas)."""
+    return {
+        'condition': Condition(),
+        'pending': {name: [] for name in SERIES},
+        'history': {name: collections.deque(maxlen=max_points) for name in SERIES},
+        'deltas': collections.deque(maxlen=history_deltas),
+        'info': {},
+        'info_changed': False,
+        'seq': 0,
+        'max_points': max_points,
+        'clients': 0,
+        'server': None,
+        'plotlyjs': None
+    }
+
+
+def publish_point(state, timestamp, latitude, longitude, gps_altitude, baro_altitude, voltage):
+    """Añade un punto pendiente; coste mínimo para la etapa que lo publica."""
+    with state['condition']:
+        pending = state['pending']
+        if hasattr(timestamp, 'isoformat'):
+            # Los gráficos muestran hora local sin zona
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone().replace(tzinfo=None)
+            timestamp = timestamp.isoformat(sep=' ')
+        pending['t'].append(timestamp)
+        pending['lat'].append(latitude)
+        pending['lon'].append(longitude)
+        pending['gps_alt'].append(gps_altitude)
+        pending['baro_alt'].append(baro_altitude)
+        pending['voltage'].append(voltage)
+
+
+def publish_info(state, info):
+    """Actualiza los datos de vuelo mostrados como anotaciones."""
+    with state['condition']:
+        if info != state['info']:
+            state['info'] = dict(info)
+            state['info_changed'] = True
+
+
+def publish_flight_info(state, flight_data, signal_strength):
+    """Publica los datos de vuelo (altura, distancia, batería, velocidad y señal) como anotaciones."""
+    publish_info(state, {
+        'Altitude': f"{flight_data.get('altitude', 0):.1f} m",
+        'Distance': f"{flight_data.get('distance', 0):.1f} m",
+        'Battery': f"{flight_data.get('battery_percent', 0):.0f}%",
+        'Speed': f"{flight_data.get('speed', 0):.1f} m/s",
+        'Signal': f"{signal_strength} bars"
+    })
+
+
+def flush_deltas(state):
+    """
+    Convierte los puntos pendientes en un único delta codificado una sola vez y despierta a los
+    clientes; todos los navegadores comparten los mismos bytes.
+    """
+    with state['condition']:
+        pending = state['pending']
+        if not pending['t'] and not state['info_changed']:
+            return False
+        state['info_changed'] = False
+        for name in SERIES:
+            state['history'][name].extend(pending[name])
+        delta = {'points': pending, 'info': state['info']}
+        state['pending'] = {name: [] for name in SERIES}
+        state['seq'] += 1
+        payload = f"id: {state['seq']}\ndata: {json.dumps(delta)}\n\n".encode('utf-8')
+        state['deltas'].append((state['seq'], payload))
+        state['condition'].notify_all()
+        return True
+
+
+def start_liveplot_server(state, stop_event, host='127.0.0.1', port=8050, interval=0.5):
+    """Inicia el servidor HTTP de la página en vivo y el hilo que agrupa los puntos en deltas."""
+
+    class LivePlotHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path == '/':
+                page = LIVE_PAGE.replace('__MAX_POINTS__', str(state['max_points'])).encode('utf-8')
+                self._send(200, 'text/html; charset=utf-8', page)
+            elif path == '/plotly.js':
+                self._send(200, 'application/javascript', _plotlyjs(state), cache=True)
+            elif path == '/snapshot':
+                with state['condition']:
+                    body = json.dumps({
+                        'seq': state['seq'],
+                        'points': {name: list(values) for name, values in state['history'].items()},
+                        'info': state['info']
+                    }).encode('utf-8')
+                self._send(200, 'application/json', body)
+            elif path == '/events':
+                self._stream_events()
+            else:
+                self.send_error(404)
+
+        def _send(self, status, content_type, body, cache=False):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            if cache:
+                self.send_header('Cache-Control', 'max-age=86400')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _stream_events(self):
+            try:
+                last_seq = int(self.path.split('after=')[1]) if 'after=' in self.path else state['seq']
+            except ValueError:
+                last_seq = state['seq']
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.close_connection = True
+            with state['condition']:
+                state['clients'] += 1
+            try:
+                while not stop_event.is_set():
+                    with state['condition']:
+                        if state['seq'] == last_seq:
+                            state['condition'].wait(5.0)
+                        payloads = [(seq, payload) for seq, payload in state['deltas'] if seq > last_seq]
+                    if not payloads:
+                        # Comentario SSE como latido para detectar clientes desconectados
+                        self.wfile.write(b': keep-alive\n\n')
+                    for seq, payload in payloads:
+                        self.wfile.write(payload)
+                        last_seq = seq
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                with state['condition']:
+                    state['clients'] -= 1
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), LivePlotHandler)
+    server.daemon_threads = True
+    state['server'] = server
+    Thread(target=server.serve_forever, name='liveplot_http', daemon=True).start()
+
+    def broadcaster():
+        while not stop_event.wait(interval):
+            flush_deltas(state)
+        with state['condition']:
+            state['condition'].notify_all()
+        server.shutdown()
+
+    Thread(target=broadcaster, name='liveplot_broadcast', daemon=True).start()
+    print(f"Gráficos en vivo en http://{host}:{server.server_address[1]}/")
+    return server
+
+
+def _plotlyjs(state):
+    """Devuelve plotly.js incluido en el paquete plotly (se carga una sola vez)."""
+    if state['plotlyjs'] is None:
+        from plotly.offline import get_plotlyjs
+        state['plotlyjs'] = get_plotlyjs().encode('utf-8')
+    return state['plotlyjs']
@@ -0,0 +1,187 @@
+import csv
+import os
+import queue
+import time
+from threading import Thread
+
+LOG_COLUMNS = ["Timestamp", "Latitude", "Longitude", "GPS_Altitude",
+               "Baro_Altitude", "Battery_Voltage", "IR_Status"]
+# 'csv': drone_data.csv; 'binary': registro columnar .flog (flightlog_subsystem)
+LOG_FORMATS = ('csv', 'binary')
+
+
+def initialize_log(path="drone_data.csv", max_queue=1000, flush_interval=1.0, fsync_interval=5.0,
+                   max_bytes=50 * 1024 * 1024, max_seconds=None, log_format='csv'):
+    """Inicializa el escritor de registros en segundo plano (solo anexado, con rotación)."""
+    state = {
+        'path': path,
+        'format': log_format,
+        'flightlog': None,
+        'queue': queue.Queue(maxsize=max_queue),
+        'flush_interval': flush_interval,
+        'fsync_interval': fsync_interval,
+        'max_bytes': max_bytes,
+        'max_seconds': max_seconds,
+        'file': None,
+        'writer': None,
+        'opened_time': None,
+        'file_bytes': 0,
+        'rotation_index': 0,
+        'written': 0,
+        'dropped': 0,
+        'running': True,
+        'thread': None
+    }
+    _open_log_file(state)
+    state['thread'] = Thread(target=_log_writer_loop, args=(state,), daemon=True)
+    state['thread'].start()
+    print(f"Registro de telemetría en {path}")
+    return state
+
+
+def log_sample(state, row):
+    """Encola una fila de telemetría sin bloquear; descarta la fila si la cola está llena."""
+    if state is None or not state['running']:
+        return False
+    try:
+        state['queue'].put_nowait(row)
+        return True
+    except queue.Full:
+        state['dropped'] += 1
+        return False
+
+
+def close_log(state, timeout=5.0):
+    """Vacía la cola pendiente, sincroniza a disco y cierra el archivo de registro."""
+    if state is None or not state['running']:
+        return
+    state['running'] = False
+    state['queue'].put(None)
+    if state['thread'] is not None:
+        state['thread'].join(timeout)
+
+
+def format_log_row(row):
+    """Convierte una fila de telemetría en valores CSV con el mismo esquema que drone_data.csv."""
+    values = []
+    for column in LOG_COLUMNS:
+        value = row.get(column)
+        if value is None:
+            values.append("")
+        elif column == "Timestamp" and hasattr(value, 'strftime'):
+            # El CSV guarda hora local sin zona (los instantes con zona se convierten aquí)
+            if value.tzinfo is not None:
+                value = value.astimezone()
+            values.append(value.strftime("%Y-%m-%d %H:%M:%S.%f"))
+        else:
+            values.append(value)
+    return values
+
+
+def _open_log_file(state):
+    """Abre el archivo activo en modo anexado y escribe la cabecera si está vacío."""
+    if state['format'] == 'binary':
+        # numpy solo se importa si se pide el registro binario
+        import flightlog_subsystem
+        state['flightlog'] = flightlog_subsystem
+        state['writer'] = flightlog_subsystem.open_writer(state['path'])
+        state['file'] = state['writer']['file']
+        state['opened_time'] = time.monotonic()
+        state['file_bytes'] = state['file'].tell()
+        return
+    log_file = open(state['path'], 'a', newline='', encoding='utf-8')
+    state['file'] = log_file
+    state['writer'] = csv.writer(log_file)
+    state['opened_time'] = time.monotonic()
+    state['file_bytes'] = log_file.tell()
+    if state['file_bytes'] == 0:
+        state['file_bytes'] += state['writer'].writerow(LOG_COLUMNS)
+
+
+def _rotate_log_file(state):
+    """Cierra el archivo activo, lo renombra como segmento numerado y abre uno nuevo."""
+    _close_log_file(state)
+    base, ext = os.path.splitext(state['path'])
+    while True:
+        state['rotation_index'] += 1
+        rotated_path = f"{base}.{state['rotation_index']}{ext}"
+        if not os.path.exists(rotated_path):
+            break
+    os.replace(state['path'], rotated_path)
+    print(f"Registro rotado a {rotated_path}")
+    _open_log_file(state)
+
+
+def _write_row(state, row):
+    """Escribe una fila en el formato del registro y devuelve el tamaño escrito."""
+    if state['flightlog'] is not None:
+        return state['flightlog'].write_row(state['writer'], row)
+    return state['writer'].writerow(format_log_row(row))
+
+
+def _close_log_file(state):
+    """Vacía, sincroniza y cierra el archivo activo (el binario escribe además su índice)."""
+    if state['flightlog'] is not None:
+        state['flightlog'].close_writer(state['writer'])
+        return
+    log_file = state['file']
+    log_file.flush()
+    os.fsync(log_file.fileno())
+    log_file.close()
+
+
+def _needs_rotation(state):
+    """Indica si el archivo activo superó el tamaño o la antigüedad configurados."""
+    if state['max_bytes'] and state['file_bytes'] >= state['max_bytes']:
+        return True
+    if state['max_seconds'] and time.monotonic() - state['opened_time'] >= state['max_seconds']:
+        return True
+    return False
+
+
+def _log_writer_loop(state):
+    """Hilo escritor: anexa filas, vacía periódicamente y rota el archivo según límites."""
+    last_flush = time.monotonic()
+    last_fsync = last_flush
+    pending = False
+    while True:
+        try:
+            row = state['queue'].get(timeout=state['flush_interval'])
+        except queue.Empty:
+            row = False
+
+        try:
+            if row is None:
+                break
+            if row is not False:
+                state['file_bytes'] += _write_row(state, row)
+                state['written'] += 1
+                pending = True
+                if _needs_rotation(state):
+                    _rotate_log_file(state)
+                    pending = False
+
+            now = time.monotonic()
+            if pending and now - last_flush >= state['flush_interval']:
+                state['file'].flush()
+                last_flush = now
+                pending = False
+                if now - last_fsync >= state['fsync_interval']:
+                    os.fsync(state['file'].fileno())
+                    last_fsync = now
+        except Exception as e:
+            print(f"Error al escribir registro: {e}")
+
+    # Escribir filas restantes y cerrar
+    try:
+        while True:
+            row = state['queue'].get_nowait()
+            if row is not None:
+                _write_row(state, row)
+                state['written'] += 1
+    except queue.Empty:
+        pass
+    try:
+        _close_log_file(state)
+    except Exception as e:
+        print(f"Error al cerrar registro: {e}")
@@ -1,391 +1,229 @@
-import serial
-import tkinter as tk
-from tkinter import ttk
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import pandas as pd
-import datetime
-import pygame
-import gps_subsystem
-import barometer_subsystem
-import battery_subsystem
-import ir_subsystem
-import video_subsystem
-import rth_subsystem
-import flystandard_subsystem
-import drivingaid_subsystem
-import electronicwardefense_subsystem
-from threading import Thread
 import time
-from math import radians, sin, cos, sqrt, atan2
+# Instante de arranque: se mide el tiempo hasta el primer paquete de telemetría
+STARTUP_NS = time.monotonic_ns()
+import argparse
+import signal
+import breadcrumb_subsystem
+import groundstation_subsystem
+import log_subsystem
+import metrics_subsystem
+import navigation_subsystem
+import protocol_subsystem
+import scheduler_subsystem
+import transport_subsystem
+
+
+def parse_args(argv=None):
+    """Argumentos de línea de comandos de la estación."""
+    arg_parser = argparse.ArgumentParser(description="Estación de tierra de telemetría y control del dron")
+    arg_parser.add_argument('--transport', default='serial:auto',
+                            help="serial:PUERTO@BAUDIOS (auto: busca el puerto y/o los baudios), sim[:binary], "
+                                 "pty[:binary] o replay:ARCHIVO[@Nx|@max]")
+    arg_parser.add_argument('--record', default=None, help="Guarda los bytes recibidos en un archivo de captura")
+    arg_parser.add_argument('--protocol', default='ascii', choices=protocol_subsystem.PROTOCOL_MODES,
+                            help="Formato del enlace")
+    arg_parser.add_argument('--log-format', default='csv', choices=log_subsystem.LOG_FORMATS,
+                            help="Registro de vuelo: drone_data.csv o binario columnar drone_data.flog")
+    arg_parser.add_argument('--metrics-port', type=int, default=0,
+                            help="Puerto HTTP local para /metrics (0 = desactivado)")
+    arg_parser.add_argument('--metrics-file', default=None,
+                            help="Archivo JSON con instantáneas periódicas de métricas")
+    arg_parser.add_argument('--live-plot-port', type=int, default=0,
+                            help="Sirve los gráficos en vivo en este puerto en lugar de reescribir telemetry_plot.html")
+    arg_parser.add_argument('--record-video', default=None,
+                            help="Graba el video con la telemetría superpuesta en este archivo (.mp4)")
+    arg_parser.add_argument('--record-raw', action='store_true',
+                            help="Con --record-video, graba los fotogramas capturados sin superposición")
+    arg_parser.add_argument('--video-process', action='store_true',
+                            help="Captura y compone el video en un proceso aparte (memoria compartida)")
+    arg_parser.add_argument('--headless', action='store_true',
+                            help="Sin GUI, video ni gráficos: solo enlace, parseo, controladores y registro")
+    arg_parser.add_argument('--joystick', action=argparse.BooleanOptionalAction, default=None,
+                            help="Lee el joystick (por defecto sí con GUI y no con --headless)")
+    arg_parser.add_argument('--joystick-rate', type=int, default=groundstation_subsystem.INPUT_RATE_HZ,
+                            help="Frecuencia de muestreo del joystick en su propio hilo (Hz)")
+    arg_parser.add_argument('--control-rate', type=int, default=scheduler_subsystem.CONTROL_RATE_HZ,
+                            help="Frecuencia del bucle de control: FlyStandard, DrivingAid y RTH (Hz)")
+    arg_parser.add_argument('--exit-after-first-packet', action='store_true',
+                            help="Con --headless, termina al recibir el primer paquete (mide el arranque)")
+    arg_parser.add_argument('--geofence', default=None, metavar='GEOJSON',
+                            help="Zonas 'no_fly'/'keep_in' (GeoJSON); salir de ellas activa el RTH")
+    arg_parser.add_argument('--breadcrumb-tolerance', type=float, default=breadcrumb_subsystem.BREADCRUMB_TOLERANCE_M,
+                            help="Desviación máxima (m) del rastro que el RTH desanda respecto al camino volado")
+    arg_parser.add_argument('--fleet', nargs='+', default=None, metavar='TRANSPORTE',
+                            help="Modo multidron (asyncio, sin GUI): un enlace por transporte; 'sim*16' repite 16 veces")
+    arg_parser.add_argument('--dashboard-interval', type=float, default=5.0,
+                            help="Con --fleet, segundos entre impresiones del tablero combinado (0 = nunca)")
+    return arg_parser.parse_args(argv)
+
+
+def open_link(spec, record=None):
+    """Abre el transporte del enlace (y su grabación si se pidió); None si falla."""
+    try:
+        ser = transport_subsystem.open_transport(spec, timeout=0.5)
+        if record:
+            ser = transport_subsystem.RecordingTransport(ser, record)
+            print(f"Grabando enlace en {record}")
+        return ser
+    except Exception as e:
+        print(f"Error al abrir puerto serial: {e}")
+        print("Ejecutando sin conexión serial (use --transport sim para el dron simulado)")
+        return None
 
-# Configuración inicial
-ser = None
-try:
-    ser = serial.Serial('COM4', 57600, timeout=3)
-except Exception as e:
-    print(f"Error al abrir puerto serial: {e}")
-    print("Ejecutando en modo simulado sin conexión serial")
 
-pygame.init()
-pygame.joystick.init()
-joystick = None
-try:
-    if pygame.joystick.get_count() > 0:
+def initialize_joystick():
+    """Inicializa pygame y devuelve la función de lectura del mando (None si no hay mando)."""
+    # pygame solo se importa si se pide el joystick
+    import pygame
+    pygame.init()
+    pygame.joystick.init()
+    try:
+        if pygame.joystick.get_count() == 0:
+            print("Joystick Xbox 360 No Detectado")
+            return None
         joystick = pygame.joystick.Joystick(0)
         joystick.init()
         print("Joystick Xbox 360 Detectado")
-    else:
+    except Exception as e:
+        print(f"Error al inicializar Joystick Xbox 360: {e}")
         print("Joystick Xbox 360 No Detectado")
-except Exception as e:
-    print(f"Error al inicializar Joystick Xbox 360: {e}")
-    print("Joystick Xbox 360 No Detectado")
-
-# Inicializar subsistemas
-rth_state = rth_subsystem.initialize_rth()
-flystandard_state = flystandard_subsystem.initialize_flystandard()
-drivingaid_state = drivingaid_subsystem.initialize_drivingaid()
-ewd_state = electronicwardefense_subsystem.initialize_electronicwardefense()
-
-# Estado inicial
-initial_position = None
-last_position = None
-last_time = time.time()
-flight_data = {
-    'altitude': 0,
-    'distance': 0,
-    'latitude': 0,
-    'longitude': 0,
-    'battery_percent': 0,
-    'speed': 0
-}
-
-# Almacenamiento de datos
-data_log = pd.DataFrame(columns=["Timestamp", "Latitude", "Longitude", "GPS_Altitude",
-                                 "Baro_Altitude", "Battery_Voltage", "IR_Status"])
-plot_data = {
-    'times': [],
-    'latitudes': [],
-    'longitudes': [],
-    'gps_altitudes': [],
-    'baro_altitudes': [],
-    'voltages': []
-}
-log_buffer = []
-
-# Inicializar figura de Plotly
-fig = make_subplots(
-    rows=3, cols=1,
-    subplot_titles=("Mapa de Ubicación", "Altitud", "Voltaje de Batería"),
-    specs=[[{"type": "scattergeo"}], [{"type": "scatter"}], [{"type": "scatter"}]]
-)
-
-def haversine_distance(lat1, lon1, lat2, lon2):
-    """Calcula la distancia en metros entre dos puntos GPS usando la fórmula de Haversine."""
-    R = 6371000
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1-a))
-    return R * c
-
-def voltage_to_percent(voltage):
-    """Convierte el voltaje de batería (LiPo 11.1V) a porcentaje."""
-    min_voltage = 9.0
-    max_voltage = 12.6
-    return max(0, min(100, ((voltage - min_voltage) / (max_voltage - min_voltage)) * 100))
-
-def calculate_signal_strength(last_signal_time):
-    """Calcula el nivel de señal (0-4 barras) según el tiempo desde la última recepción."""
-    elapsed = time.time() - last_signal_time
-    thresholds = [(0.5, 4), (1.0, 3), (1.5, 2), (2.0, 1)]
-    for threshold, bars in thresholds:
-        if elapsed < threshold:
-            return bars
-    return 0
-
-def set_frequency_pc(frequency):
-    """Cambia la frecuencia del RFD900x en la PC."""
-    if ser is None:
-        return
+        return None
+
+    def read_joystick():
+        """Lee ejes y botones: devuelve (comandos, botón A, botón B)."""
+        pygame.event.pump()
+        pitch = joystick.get_axis(1)
+        roll = joystick.get_axis(0)
+        yaw = joystick.get_axis(3)
+        throttle = joystick.get_axis(2)
+        commands = {
+            'pitch': int((pitch + 1) * 500),
+            'roll': int((roll + 1) * 500),
+            'yaw': int((yaw + 1) * 500),
+            'throttle': int((throttle + 1) * 500)
+        }
+        return commands, joystick.get_button(0), joystick.get_button(1)
+
+    return read_joystick
+
+
+def run_headless(station, liveplot_state=None, exit_after_first_packet=False):
+    """Modo sin GUI: espera hasta Ctrl+C o SIGTERM (o el primer paquete) publicando los datos de vuelo en vivo."""
+    stop_event = station.pipeline['stop_event']
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    print("Estación sin GUI en marcha (Ctrl+C para salir)")
+    interval = 0.01 if exit_after_first_packet else 1.0
     try:
-        ser.write(f"ATF={frequency}\r\n".encode('utf-8'))
-        time.sleep(0.1)
-    except Exception as e:
-        print(f"Error al cambiar frecuencia: {e}")
-
-# Ventana principal
-root = tk.Tk()
-root.title("Tablero de Telemetría y Video del Dron")
-root.geometry("1400x800")
-print("GUI inicializada correctamente")  # Depuración
-
-# Panel de video
-video_frame = ttk.Frame(root)
-video_frame.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
-video_label = ttk.Label(video_frame)
-video_label.grid(row=0, column=0, padx=5, pady=5, sticky="nsew")
-
-# Inicializar captura de video
-video_cap = video_subsystem.initialize_video_stream(device_index=0)
-
-# Última marca de tiempo para cálculo PID
-last_time_pid = time.time()
-
-def read_serial_and_control():
-    """Procesa datos seriales, genera comandos y actualiza la GUI."""
-    global rth_state, flystandard_state, drivingaid_state, ewd_state, last_time_pid
-    global initial_position, last_position, last_time, flight_data, data_log, log_buffer
-    update_count = 0  # Contador para depuración
-
-    while True:
-        try:
-            signal_received = False
-            gps_data = {'latitude': 0, 'longitude': 0, 'gps_altitude': 0, 'valid': False}
-            baro_data = {'baro_altitude': 0, 'valid': False}
-            battery_data = {'voltage': 0, 'valid': False}
-            ir_data = {'ir_status': 0, 'valid': False}
-            mpu_data = {'pitch': 0, 'roll': 0, 'yaw': 0, 'valid': False}
-            now = datetime.datetime.now()
-
-            if ser is not None:
-                line = ser.readline().decode('utf-8').strip()
-                if line:
-                    signal_received = True
-                    data = line.split(',')
-                    if len(data) == 9:
-                        gps_data = gps_subsystem.process_gps_data(data)
-                        baro_data = barometer_subsystem.process_barometer_data(data)
-                        battery_data = battery_subsystem.process_battery_data(data)
-                        ir_data = ir_subsystem.process_ir_data(data)
-                        try:
-                            mpu_data = {
-                                'pitch': float(data[6]),
-                                'roll': float(data[7]),
-                                'yaw': float(data[8]),
-                                'valid': True
-                            }
-                        except (ValueError, IndexError):
-                            mpu_data = {'pitch': 0, 'roll': 0, 'yaw': 0, 'valid': False}
-
-                        if gps_data['valid'] and baro_data['valid'] and battery_data['valid']:
-                            flight_data['altitude'] = baro_data['baro_altitude']
-                            flight_data['latitude'] = gps_data['latitude']
-                            flight_data['longitude'] = gps_data['longitude']
-                            flight_data['battery_percent'] = voltage_to_percent(battery_data['voltage'])
-
-                            if initial_position is None:
-                                initial_position = (gps_data['latitude'], gps_data['longitude'])
-
-                            flight_data['distance'] = haversine_distance(
-                                gps_data['latitude'], gps_data['longitude'],
-                                initial_position[0], initial_position[1]
-                            )
-
-                            if last_position is not None:
-                                distance = haversine_distance(
-                                    gps_data['latitude'], gps_data['longitude'],
-                                    last_position[0], last_position[1]
-                                )
-                                time_diff = (now - last_time).total_seconds()
-                                if time_diff > 0:
-                                    flight_data['speed'] = distance / time_diff
-                            last_position = (gps_data['latitude'], gps_data['longitude'])
-                            last_time = now
-
-            # Registrar datos
-            log_buffer.append({
-                "Timestamp": now,
-                "Latitude": gps_data['latitude'] if gps_data['valid'] else None,
-                "Longitude": gps_data['longitude'] if gps_data['valid'] else None,
-                "GPS_Altitude": gps_data['gps_altitude'] if gps_data['valid'] else None,
-                "Baro_Altitude": baro_data['baro_altitude'] if baro_data['valid'] else None,
-                "Battery_Voltage": battery_data['voltage'] if battery_data['valid'] else None,
-                "IR_Status": "ON" if ir_data['valid'] and ir_data['ir_status'] == 1 else "OFF"
-            })
-
-            # Actualizar datos para gráficos
-            plot_data['times'].append(now)
-            plot_data['latitudes'].append(gps_data['latitude'])
-            plot_data['longitudes'].append(gps_data['longitude'])
-            plot_data['gps_altitudes'].append(gps_data['gps_altitude'] if gps_data['valid'] else None)
-            plot_data['baro_altitudes'].append(baro_data['baro_altitude'] if baro_data['valid'] else None)
-            plot_data['voltages'].append(battery_data['voltage'])
-
-            # Limitar a 100 puntos
-            if len(plot_data['times']) > 100:
-                for key in plot_data:
-                    plot_data[key].pop(0)
-
-            # Concatenar buffer cada 10 entradas
-            if len(log_buffer) >= 10:
-                global data_log
-                data_log = pd.concat([data_log, pd.DataFrame(log_buffer)], ignore_index=True)
-                log_buffer.clear()
-                data_log.to_csv("drone_data.csv", index=False)
-
-            # Procesar ElectronicWarDefense
-            ewd_state = electronicwardefense_subsystem.process_electronicwardefense(
-                ewd_state, signal_received, set_frequency_pc
-            )
-
-            # Procesar comandos
-            commands = {'pitch': 500, 'roll': 500, 'yaw': 500, 'throttle': 0}
-            button_a = False
-            button_b = False
-            if joystick is not None:
-                pygame.event.pump()
-                pitch = joystick.get_axis(1)
-                roll = joystick.get_axis(0)
-                yaw = joystick.get_axis(3)
-                throttle = joystick.get_axis(2)
-                button_a = joystick.get_button(0)
-                button_b = joystick.get_button(1)
-                commands = {
-                    'pitch': int((pitch + 1) * 500),
-                    'roll': int((roll + 1) * 500),
-                    'yaw': int((yaw + 1) * 500),
-                    'throttle': int((throttle + 1) * 500)
-                }
-
-                # Procesar FlyStandard
-                flystandard_commands, flystandard_state = flystandard_subsystem.process_flystandard(
-                    flystandard_state, baro_data, button_a
-                )
-                if flystandard_state['flystandard_active']:
-                    commands['throttle'] = flystandard_commands['throttle']
-
-            # Procesar DrivingAid
-            current_time = time.time()
-            dt = current_time - last_time_pid if last_time_pid is not None else 0.1
-            last_time_pid = current_time
-            drivingaid_commands, drivingaid_state = drivingaid_subsystem.process_drivingaid(
-                drivingaid_state, mpu_data, dt, button_b
-            )
-            if drivingaid_state['drivingaid_active']:
-                commands['pitch'] = max(400, min(600, commands['pitch'] + drivingaid_commands['pitch']))
-                commands['roll'] = max(400, min(600, commands['roll'] + drivingaid_commands['roll']))
-                commands['yaw'] = max(400, min(600, commands['yaw'] + drivingaid_commands['yaw']))
-
-            # Procesar RTH
-            rth_commands, rth_state = rth_subsystem.process_rth(rth_state, gps_data, baro_data, battery_data)
-            if rth_state['rth_active']:
-                commands = rth_commands
-
-            # Enviar comandos al dron
-            if ser is not None:
-                command = f"CMD,{commands['pitch']},{commands['roll']},{commands['yaw']},{commands['throttle']}"
-                ser.write(command.encode('utf-8'))
-                ser.write(b'\n')
-
-            # Actualizar video con datos
-            telemetry_data = {
-                'gps_data': gps_data,
-                'baro_data': baro_data,
-                'battery_data': battery_data,
-                'ir_data': ir_data
-            }
-            signal_strength = calculate_signal_strength(ewd_state['last_signal_time'])
-            if video_subsystem.update_video_frame(video_cap, video_label, flight_data, telemetry_data, signal_strength):
-                update_count += 1
-                if update_count % 100 == 0:
-                    print(f"Actualización de video #{update_count} exitosa")
-
-        except Exception as e:
-            print(f"Error en lectura serial o control: {e}")
-        time.sleep(0.1)
-
-def update_plot():
-    """Actualiza los gráficos en telemetry_plot.html con datos de telemetría y vuelo."""
-    global fig, flight_data
+        while not stop_event.wait(interval):
+            if exit_after_first_packet and station.first_packet_ns is not None:
+                break
+            if liveplot_state is not None:
+                import liveplot_subsystem
+                liveplot_subsystem.publish_flight_info(liveplot_state, station.flight_data, station.signal_strength())
+    except KeyboardInterrupt:
+        print("Deteniendo estación")
+
+
+def load_zones(path):
+    """Zonas de geocerca del GeoJSON indicado; None si no se indicó o no se pudo leer."""
+    if not path:
+        return None
     try:
-        fig = make_subplots(
-            rows=3, cols=1,
-            subplot_titles=("Mapa de Ubicación", "Altitud", "Voltaje de Batería"),
-            specs=[[{"type": "scattergeo"}], [{"type": "scatter"}], [{"type": "scatter"}]]
-        )
-
-        # Mapa
-        fig.add_trace(
-            go.Scattergeo(
-                lat=plot_data['latitudes'],
-                lon=plot_data['longitudes'],
-                mode="markers+lines",
-                marker=dict(size=8, color="red"),
-                line=dict(width=2, color="blue")
-            ),
-            row=1, col=1
-        )
-        fig.update_geos(projection_type="mercator", showcountries=True, showland=True)
-
-        # Altitud
-        fig.add_trace(
-            go.Scatter(x=plot_data['times'], y=plot_data['gps_altitudes'], name="Altitud GPS", line=dict(color="blue")),
-            row=2, col=1
-        )
-        fig.add_trace(
-            go.Scatter(x=plot_data['times'], y=plot_data['baro_altitudes'], name="Altitud Baro", line=dict(color="green")),
-            row=2, col=1
-        )
-
-        # Voltaje
-        fig.add_trace(
-            go.Scatter(x=plot_data['times'], y=plot_data['voltages'], name="Voltaje", line=dict(color="orange")),
-            row=3, col=1
-        )
-
-        # Añadir datos de vuelo como anotaciones
-        annotations = []
-        if plot_data['times']:
-            latest_data = {
-                'Altitude': f"{plot_data['baro_altitudes'][-1]:.1f} m" if plot_data['baro_altitudes'] and plot_data['baro_altitudes'][-1] is not None else "0.0 m",
-                'Distance': f"{flight_data.get('distance', 0):.1f} m",
-                'GPS': f"{plot_data['latitudes'][-1]:.6f}, {plot_data['longitudes'][-1]:.6f}" if plot_data['latitudes'] and plot_data['latitudes'][-1] is not None else "0.000000, 0.000000",
-                'Battery': f"{flight_data.get('battery_percent', 0):.0f}%",
-                'Speed': f"{flight_data.get('speed', 0):.1f} m/s",
-                'Signal': f"{calculate_signal_strength(ewd_state['last_signal_time'])} bars"
-            }
-            y_pos = 0.95
-            for key, value in latest_data.items():
-                annotations.append(
-                    dict(
-                        x=0.05, y=y_pos, xref="paper", yref="paper",
-                        text=f"{key}: {value}",
-                        showarrow=False, font=dict(size=12, color="white"),
-                        bgcolor="rgba(0, 0, 0, 0.5)", xanchor="left", yanchor="top"
-                    )
-                )
-                y_pos -= 0.05
-
-        fig.update_layout(
-            height=800, showlegend=True,
-            title_text="Telemetría del Dron en Tiempo Real",
-            template="plotly_dark", annotations=annotations
-        )
-        fig.write_html("telemetry_plot.html")
-        print("Gráficos actualizados en telemetry_plot.html")  # Depuración
+        zones = navigation_subsystem.load_geofence(path)
+        print(f"{len(zones)} zonas de geocerca cargadas de {path}")
+        return zones
     except Exception as e:
-        print(f"Error al actualizar gráficos: {e}")
-    root.after(1000, update_plot)
-
-# Iniciar hilo para lectura serial y control
-serial_thread = Thread(target=read_serial_and_control, daemon=True)
-serial_thread.start()
-
-# Iniciar actualización de gráficos
-root.after(1000, update_plot)
-print("Programada actualización de gráficos con root.after")  # Depuración
-
-# Forzar actualización inicial de la GUI
-root.update()
-
-# Ejecutar GUI y limpieza
-try:
-    root.mainloop()
-finally:
-    if video_cap is not None:
-        video_subsystem.release_video_stream(video_cap)
-    if ser is not None:
-        ser.close()
-    pygame.quit()
\ No newline at end of file
+        print(f"Error al cargar las geocercas: {e}")
+
+
+def run_fleet(args):
+    """Modo multidron: todos los enlaces en un bucle asyncio con tablero y métricas combinados."""
+    import asyncio
+    import multidrone_subsystem
+    fleet = multidrone_subsystem.initialize_fleet(args.fleet, protocol_mode=args.protocol, log_format=args.log_format,
+                                                  control_rate_hz=args.control_rate, geofence=load_zones(args.geofence),
+                                                  breadcrumb_tolerance_m=args.breadcrumb_tolerance)
+    if args.metrics_port:
+        metrics_subsystem.start_metrics_server(fleet['metrics'], port=args.metrics_port)
+    try:
+        asyncio.run(multidrone_subsystem.run_fleet(fleet, dashboard_interval=args.dashboard_interval))
+    except KeyboardInterrupt:
+        print("Deteniendo flota")
+    finally:
+        multidrone_subsystem.close_fleet(fleet)
+        if args.metrics_file:
+            metrics_subsystem.write_snapshot(fleet['metrics'], args.metrics_file)
+
+
+def main(argv=None):
+    """Arranca la estación: enlace, motor, sumideros, tablero opcional y limpieza."""
+    args = parse_args(argv)
+    if args.fleet:
+        run_fleet(args)
+        return
+    # Los módulos pesados (tkinter, pygame, OpenCV/PIL, numpy, plotly) solo se importan si su
+    # función está activa, para que el modo sin GUI arranque y reciba telemetría cuanto antes
+    use_gui = not args.headless
+    use_joystick = use_gui if args.joystick is None else args.joystick
+    if not use_gui and (args.record_video or args.video_process):
+        print("El video no está disponible con --headless: se ignoran --record-video y --video-process")
+
+    # Formato del enlace: 'ascii' (líneas CSV), 'binary' (tramas con CRC) o 'auto' (detecta
+    # tramas binarias en la bajada y pasa a enviar comandos binarios al verlas)
+    station = groundstation_subsystem.GroundStation(
+        transport=open_link(args.transport, args.record),
+        protocol_mode=args.protocol,
+        read_input=initialize_joystick() if use_joystick else None,
+        input_rate_hz=args.joystick_rate,
+        control_rate_hz=args.control_rate,
+        started_ns=STARTUP_NS,
+        geofence=load_zones(args.geofence),
+        breadcrumb_tolerance_m=args.breadcrumb_tolerance
+    )
+
+    # Sumideros de telemetría: registro y gráficos en vivo (el historial lo añade la GUI)
+    log_path = "drone_data.flog" if args.log_format == 'binary' else "drone_data.csv"
+    log_sink = station.add_sink(groundstation_subsystem.LogSink(log_path, log_format=args.log_format))
+    metrics_subsystem.register_gauge(station.metrics, 'log_dropped', lambda: log_sink.state['dropped'])
+    liveplot_state = None
+    if args.live_plot_port:
+        import liveplot_subsystem
+        liveplot_state = liveplot_subsystem.initialize_liveplot()
+        liveplot_subsystem.start_liveplot_server(liveplot_state, station.pipeline['stop_event'],
+                                                 port=args.live_plot_port)
+        station.add_sink(groundstation_subsystem.LiveplotSink(liveplot_state))
+
+    gui = None
+    if use_gui:
+        import gui_subsystem
+        gui = gui_subsystem.initialize_gui(station, record_video=args.record_video, record_raw=args.record_raw,
+                                           video_process=args.video_process, liveplot_state=liveplot_state)
+
+    # Iniciar etapas del pipeline
+    station.start()
+    if gui is not None:
+        gui_subsystem.start_gui(gui)
+
+    # Publicar métricas
+    if args.metrics_port:
+        metrics_subsystem.start_metrics_server(station.metrics, port=args.metrics_port)
+    if args.metrics_file:
+        metrics_subsystem.start_snapshot_writer(station.metrics, args.metrics_file, station.pipeline['stop_event'])
+
+    # Ejecutar GUI (o esperar sin ella) y limpieza
+    try:
+        if gui is not None:
+            gui_subsystem.run_gui(gui)
+        else:
+            run_headless(station, liveplot_state, args.exit_after_first_packet)
+    finally:
+        station.stop()
+        if gui is not None:
+            gui_subsystem.close_gui(gui)
+        if use_joystick:
+            import pygame
+            pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
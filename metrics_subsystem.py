@@ -0,0 +1,179 @@
+import json
+import os
+import time
+from threading import Lock, Thread
+
+# Histogramas log-lineales al estilo HDR: 16 sub-cubetas por potencia de dos (~6% de precisión)
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HISTOGRAM_BUCKETS = 64 * SUB_BUCKETS
+
+
+def initialize_metrics():
+    """Inicializa el registro de métricas: histogramas de latencia, contadores y medidores."""
+    return {
+        'lock': Lock(),
+        'start_ns': time.monotonic_ns(),
+        'histograms': {},
+        'counters': {},
+        'gauges': {},
+        'last_rates': {'time_ns': time.monotonic_ns(), 'counters': {}}
+    }
+
+
+def _bucket_index(value):
+    """Índice de cubeta para un valor entero no negativo (nanosegundos)."""
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+
+def _bucket_upper(index):
+    """Valor superior representado por una cubeta."""
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    sub = index % SUB_BUCKETS + SUB_BUCKETS
+    return ((sub + 1) << shift) - 1
+
+
+def record_latency(metrics, name, value_ns):
+    """Registra una latencia en nanosegundos en el histograma de la etapa indicada."""
+    if value_ns < 0:
+        value_ns = 0
+    index = min(_bucket_index(value_ns), HISTOGRAM_BUCKETS - 1)
+    with metrics['lock']:
+        histogram = metrics['histograms'].get(name)
+        if histogram is None:
+            histogram = {'buckets': [0] * HISTOGRAM_BUCKETS, 'count': 0, 'sum': 0, 'min': value_ns, 'max': value_ns}
+            metrics['histograms'][name] = histogram
+        histogram['buckets'][index] += 1
+        histogram['count'] += 1
+        histogram['sum'] += value_ns
+        if value_ns < histogram['min']:
+            histogram['min'] = value_ns
+        if value_ns > histogram['max']:
+            histogram['max'] = value_ns
+
+
+def increment(metrics, name, amount=1):
+    """Incrementa un contador."""
+    with metrics['lock']:
+        metrics['counters'][name] = metrics['counters'].get(name, 0) + amount
+
+
+def register_gauge(metrics, name, callback):
+    """Registra un medidor cuyo valor se obtiene llamando a callback() al tomar la instantánea."""
+    metrics['gauges'][name] = callback
+
+
+def histogram_percentile(histogram, fraction):
+    """Percentil aproximado (en ns) de un histograma."""
+    if histogram['count'] == 0:
+        return 0
+    target = fraction * histogram['count']
+    seen = 0
+    for index, count in enumerate(histogram['buckets']):
+        seen += count
+        if count and seen >= target:
+            return min(_bucket_upper(index), histogram['max'])
+    return histogram['max']
+
+
+def snapshot(metrics):
+    """Devuelve un diccionario serializable con todas las métricas (latencias en ms)."""
+    with metrics['lock']:
+        now_ns = time.monotonic_ns()
+        histograms = {name: dict(h, buckets=list(h['buckets'])) for name, h in metrics['histograms'].items()}
+        counters = dict(metrics['counters'])
+        # Tasas por segundo desde la instantánea anterior (ventana mínima de 1 s, compartida
+        # entre el servidor HTTP y el archivo de instantáneas): se leen y se renuevan bajo el
+        # mismo lock que la copia de los contadores
+        last = metrics['last_rates']
+        elapsed = (now_ns - last['time_ns']) / 1e9
+        if elapsed >= 1.0:
+            rates = {name: (value - last['counters'].get(name, 0)) / elapsed for name, value in counters.items()}
+            metrics['last_rates'] = {'time_ns': now_ns, 'counters': counters, 'rates': rates}
+        else:
+            rates = last.get('rates', {})
+
+    latencies = {}
+    for name, histogram in histograms.items():
+        count = histogram['count']
+        latencies[name] = {
+            'count': count,
+            'min_ms': histogram['min'] / 1e6,
+            'mean_ms': histogram['sum'] / count / 1e6 if count else 0.0,
+            'p50_ms': histogram_percentile(histogram, 0.50) / 1e6,
+            'p90_ms': histogram_percentile(histogram, 0.90) / 1e6,
+            'p99_ms': histogram_percentile(histogram, 0.99) / 1e6,
+            'p999_ms': histogram_percentile(histogram, 0.999) / 1e6,
+            'max_ms': histogram['max'] / 1e6
+        }
+
+    gauges = {}
+    for name, callback in list(metrics['gauges'].items()):
+        try:
+            gauges[name] = callback()
+        except Exception as e:
+            gauges[name] = f"error: {e}"
+
+    return {
+        'uptime_s': (now_ns - metrics['start_ns']) / 1e9,
+        'latency': latencies,
+        'counters': counters,
+        'rates_per_s': rates,
+        'gauges': gauges
+    }
+
+
+def start_metrics_server(metrics, host='127.0.0.1', port=8765):
+    """Sirve las métricas en JSON en http://host:port/metrics desde un hilo propio."""
+    # http.server solo se importa si se pide el servidor (arranque más rápido)
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') not in ('', '/metrics'):
+                self.send_error(404)
+                return
+            body = json.dumps(snapshot(metrics), indent=2).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, name='metrics_http', daemon=True).start()
+    print(f"Métricas disponibles en http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def start_snapshot_writer(metrics, path, stop_event, interval=5.0):
+    """Escribe periódicamente la instantánea de métricas en un archivo JSON (reemplazo atómico)."""
+
+    def run():
+        while not stop_event.wait(interval):
+            write_snapshot(metrics, path)
+        write_snapshot(metrics, path)
+
+    thread = Thread(target=run, name='metrics_snapshot', daemon=True)
+    thread.start()
+    return thread
+
+
+def write_snapshot(metrics, path):
+    """Escribe una instantánea de métricas en path."""
+    try:
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot(metrics), f, indent=2)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Error al escribir métricas: {e}")
@@ -0,0 +1,270 @@
+"""
+Modo multidron: N enlaces de radio atendidos por un solo bucle asyncio en un único proceso.
+
+Cada enlace es una GroundStation con su propio decodificador, estados de los controladores
+(FlyStandard, DrivingAid, RTH, EWD) y registro. La recepción no usa un hilo por enlace: los
+puertos reales se vigilan con loop.add_reader y los transportes simulados avisan al bucle al
+recibir bytes. Un único temporizador ejecuta el tick de control de todos los enlaces.
+"""
+import asyncio
+import os
+import signal
+import time
+
+import breadcrumb_subsystem
+import groundstation_subsystem
+import metrics_subsystem
+import scheduler_subsystem
+import transport_subsystem
+
+# Sin bytes durante este tiempo se ejecuta igualmente EWD para detectar la pérdida de señal
+EWD_CHECK_S = 0.1
+# Transportes sin descriptor ni aviso de datos se sondean a este intervalo
+POLL_INTERVAL_S = 0.005
+DASHBOARD_COLUMNS = ('link', 'packets', 'rate_hz', 'signal', 'freq', 'alt_m', 'dist_m', 'batt_%', 'rx_p99_ms',
+                     'age_p99_ms', 'rth')
+
+
+def expand_link_specs(specs):
+    """Expande 'sim*16' en 16 especificaciones 'sim'; el resto se deja tal cual."""
+    expanded = []
+    for spec in specs:
+        base, _, count = spec.rpartition('*')
+        if base and count.isdigit():
+            expanded.extend([base] * int(count))
+        else:
+            expanded.append(spec)
+    return expanded
+
+
+def initialize_fleet(specs, protocol_mode='ascii', log_dir='.', control_rate_hz=scheduler_subsystem.CONTROL_RATE_HZ,
+                     log=True, log_format='csv', geofence=None,
+                     breadcrumb_tolerance_m=breadcrumb_subsystem.BREADCRUMB_TOLERANCE_M):
+    """
+    Abre un transporte y crea una GroundStation por cada especificación (drone1, drone2...),
+    cada una con su registro drone_data_<nombre>.csv (o .flog), sus propias métricas y las
+    mismas zonas de geocerca (cada enlace las proyecta alrededor de su propio punto de partida).
+    """
+    extension = '.flog' if log_format == 'binary' else '.csv'
+    fleet = {
+        'links': [],
+        'metrics': metrics_subsystem.initialize_metrics(),
+        'scheduler': scheduler_subsystem.initialize_scheduler(rate_hz=control_rate_hz),
+        'loop': None
+    }
+    for index, spec in enumerate(expand_link_specs(specs), start=1):
+        name = f"drone{index}"
+        try:
+            transport = transport_subsystem.open_transport(spec, timeout=0)
+        except Exception as e:
+            print(f"Error al abrir el enlace {name} ({spec}): {e}")
+            transport = None
+        sinks = [groundstation_subsystem.LogSink(os.path.join(log_dir, f"drone_data_{name}{extension}"),
+                                                 log_format=log_format)] if log else []
+        station = groundstation_subsystem.GroundStation(transport=transport, protocol_mode=protocol_mode, sinks=sinks,
+                                                        control_rate_hz=control_rate_hz, name=name, geofence=geofence,
+                                                        breadcrumb_tolerance_m=breadcrumb_tolerance_m)
+        station.register_gauges()
+        fleet['links'].append({
+            'name': name,
+            'spec': spec,
+            'station': station,
+            'event': None,
+            'ready_ns': None,
+            'reader_fd': None,
+            'poll': False,
+            'rx_errors': 0
+        })
+
+    metrics = fleet['metrics']
+    metrics_subsystem.register_gauge(metrics, 'links', lambda: {
+        link['name']: metrics_subsystem.snapshot(link['station'].metrics) for link in fleet['links']
+    })
+    metrics_subsystem.register_gauge(metrics, 'control_scheduler',
+                                     lambda: scheduler_subsystem.scheduler_stats(fleet['scheduler']))
+    print(f"Flota de {len(fleet['links'])} enlaces ({protocol_mode})")
+    return fleet
+
+
+async def run_fleet(fleet, duration=None, dashboard_interval=5.0):
+    """
+    Atiende todos los enlaces hasta Ctrl+C/SIGTERM o durante duration segundos.
+    Con dashboard_interval imprime periódicamente el tablero combinado.
+    """
+    loop = asyncio.get_running_loop()
+    fleet['loop'] = loop
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass
+
+    for link in fleet['links']:
+        _watch_link(loop, link)
+    tasks = [asyncio.create_task(_receive_loop(link, stop)) for link in fleet['links']]
+    tasks.append(asyncio.create_task(_control_loop(fleet, stop)))
+    if dashboard_interval:
+        tasks.append(asyncio.create_task(_dashboard_loop(fleet, stop, dashboard_interval)))
+
+    try:
+        if duration is None:
+            await stop.wait()
+        else:
+            try:
+                await asyncio.wait_for(stop.wait(), duration)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        stop.set()
+        for link in fleet['links']:
+            link['event'].set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for link in fleet['links']:
+            _unwatch_link(loop, link)
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.remove_signal_handler(sig)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass
+
+
+def close_fleet(fleet):
+    """Cierra los registros y transportes de todos los enlaces."""
+    for link in fleet['links']:
+        link['station'].stop()
+
+
+def fleet_rows(fleet):
+    """Una fila por enlace con su estado y latencias (para el tablero y los informes)."""
+    rows = []
+    for link in fleet['links']:
+        station = link['station']
+        snapshot = metrics_subsystem.snapshot(station.metrics)
+        latency = snapshot['latency']
+        ewd_state = station.ewd_state
+        rows.append({
+            'link': link['name'],
+            'packets': snapshot['counters'].get('packets', 0),
+            'rate_hz': round(snapshot['rates_per_s'].get('packets', 0.0), 1),
+            'signal': station.signal_strength(),
+            'freq': ewd_state['frequencies'][ewd_state['current_frequency']],
+            'alt_m': round(station.flight_data['altitude'], 1),
+            'dist_m': round(station.flight_data['distance'], 1),
+            'batt_%': round(station.flight_data['battery_percent']),
+            'rx_p99_ms': round(latency.get('rx_to_parse', {}).get('p99_ms', 0.0), 3),
+            # Edad de la telemetría al decidir (incluye la espera hasta el tick de control)
+            'age_p99_ms': round(latency.get('rx_to_decision', {}).get('p99_ms', 0.0), 3),
+            'rth': 'ON' if station.rth_state['rth_active'] else 'OFF'
+        })
+    return rows
+
+
+def format_dashboard(fleet):
+    """Tablero combinado de la flota como tabla de texto."""
+    rows = fleet_rows(fleet)
+    widths = {column: max(len(column), *(len(str(row[column])) for row in rows)) if rows else len(column)
+              for column in DASHBOARD_COLUMNS}
+    lines = ['  '.join(column.rjust(widths[column]) for column in DASHBOARD_COLUMNS)]
+    for row in rows:
+        lines.append('  '.join(str(row[column]).rjust(widths[column]) for column in DASHBOARD_COLUMNS))
+    stats = scheduler_subsystem.scheduler_stats(fleet['scheduler'])
+    lines.append(f"control: {stats['ticks']} ticks, {stats['overruns']} retrasos, "
+                 f"máx {stats['max_lateness_ms']:.2f} ms")
+    return '\n'.join(lines)
+
+
+def _watch_link(loop, link):
+    """Conecta el aviso de datos del transporte al bucle: callback, descriptor o sondeo."""
+    link['event'] = asyncio.Event()
+    transport = link['station'].transport
+    if transport is None:
+        return
+    if hasattr(transport, 'set_data_callback'):
+        transport.set_data_callback(lambda: _data_ready(loop, link))
+        return
+    try:
+        fd = transport.fileno()
+        loop.add_reader(fd, _data_ready, None, link)
+        link['reader_fd'] = fd
+    except (AttributeError, OSError, NotImplementedError):
+        # Sin descriptor vigilable (p. ej. bucle Proactor en Windows): sondeo periódico
+        link['poll'] = True
+
+
+def _unwatch_link(loop, link):
+    """Deshace _watch_link."""
+    transport = link['station'].transport
+    if transport is not None and hasattr(transport, 'set_data_callback'):
+        transport.set_data_callback(None)
+    if link['reader_fd'] is not None:
+        loop.remove_reader(link['reader_fd'])
+        link['reader_fd'] = None
+
+
+def _data_ready(loop, link):
+    """Hay bytes para el enlace: anota el instante de llegada y despierta su tarea (desde cualquier hilo)."""
+    if link['ready_ns'] is None:
+        link['ready_ns'] = time.monotonic_ns()
+    if loop is None:
+        link['event'].set()
+    else:
+        loop.call_soon_threadsafe(link['event'].set)
+
+
+async def _receive_loop(link, stop):
+    """Tarea de recepción de un enlace: espera datos, los decodifica y procesa EWD."""
+    station = link['station']
+    event = link['event']
+    while not stop.is_set():
+        if link['poll'] or station.transport is None:
+            await asyncio.sleep(POLL_INTERVAL_S if link['poll'] else EWD_CHECK_S)
+        else:
+            try:
+                await asyncio.wait_for(event.wait(), EWD_CHECK_S)
+            except asyncio.TimeoutError:
+                pass
+            event.clear()
+        received = 0
+        if station.transport is not None:
+            arrival_ns = link['ready_ns'] or time.monotonic_ns()
+            link['ready_ns'] = None
+            try:
+                data, _ = transport_subsystem.read_chunk(station.reader, timeout=0)
+                if data:
+                    received = station.receive_bytes(data, arrival_ns)
+            except Exception as e:
+                link['rx_errors'] += 1
+                metrics_subsystem.increment(station.metrics, 'rx_errors')
+                if link['rx_errors'] == 1:
+                    print(f"Error de recepción en {link['name']}: {e}")
+                await asyncio.sleep(EWD_CHECK_S)
+        station.process_ewd(received > 0)
+
+
+async def _control_loop(fleet, stop):
+    """Un único temporizador para toda la flota: en cada tick aplica los controladores de cada enlace."""
+    scheduler = fleet['scheduler']
+    metrics = fleet['metrics']
+    while not stop.is_set():
+        dt = await scheduler_subsystem.wait_next_tick_async(scheduler)
+        start_ns = time.monotonic_ns()
+        metrics_subsystem.record_latency(metrics, 'control_lateness', scheduler['last_lateness_ns'])
+        for link in fleet['links']:
+            station = link['station']
+            try:
+                commands, arrival_ns, decision_ns = station.control(dt)
+                station.offer_command(commands, arrival_ns, decision_ns)
+            except Exception as e:
+                metrics_subsystem.increment(station.metrics, 'control_errors')
+                print(f"Error de control en {link['name']}: {e}")
+        metrics_subsystem.record_latency(metrics, 'control_sweep', time.monotonic_ns() - start_ns)
+
+
+async def _dashboard_loop(fleet, stop, interval):
+    """Imprime el tablero combinado cada interval segundos."""
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            print(format_dashboard(fleet))
@@ -0,0 +1,240 @@
+"""
+Navegación en un plano tangente local (ENU: este, norte) centrado en el punto de partida.
+
+Al fijar el origen se calculan una sola vez los metros por grado de latitud y de longitud
+(radios de curvatura WGS84 y cos(lat) del origen); a partir de ahí cada fijo GPS se proyecta con
+dos multiplicaciones y la distancia, el rumbo a casa y el vector velocidad cuestan O(1) sin
+trigonometría esférica. El error de la proyección es despreciable a las distancias de vuelo de
+un dron (decenas de kilómetros).
+
+Las geocercas (zonas prohibidas 'no_fly' y zonas permitidas 'keep_in') se proyectan al mismo
+plano y se indexan en una rejilla uniforme: cada muestra solo evalúa las zonas cuya caja
+envolvente toca su celda, así que el coste por muestra no crece con cientos de zonas cargadas.
+"""
+import json
+import math
+
+# Elipsoide WGS84
+WGS84_A = 6378137.0
+WGS84_E2 = 6.69437999014e-3
+# Por debajo de esta velocidad el rumbo sobre el suelo no es fiable y se conserva el anterior
+MIN_COURSE_SPEED = 1.0
+GEOFENCE_KINDS = ('no_fly', 'keep_in')
+# Límites del lado de celda automático de la rejilla de geocercas (metros)
+MIN_CELL_M = 25.0
+MAX_CELL_M = 2000.0
+
+
+def initialize_navigation(zones=None, cell_m=None):
+    """
+    Inicializa el estado de navegación con las geocercas opcionales (ver build_geofence).
+    El origen se fija con el primer fijo (set_home) y entonces se indexan las zonas.
+    """
+    navigation = {
+        'home': None,
+        'm_per_deg_lat': 0.0,
+        'm_per_deg_lon': 0.0,
+        'east': 0.0,
+        'north': 0.0,
+        'distance': 0.0,
+        'bearing_to_home': 0.0,
+        'velocity_east': 0.0,
+        'velocity_north': 0.0,
+        'speed': 0.0,
+        'course': None,
+        'last_fix': None,
+        'geofence': None,
+        'no_fly': (),
+        'outside_keep_in': False,
+        'geofence_breach': False
+    }
+    if zones:
+        navigation['geofence'] = build_geofence(zones, navigation, cell_m)
+    return navigation
+
+
+def set_home(navigation, lat, lon):
+    """Fija el origen del plano local y precalcula sus constantes de proyección."""
+    lat_rad = math.radians(lat)
+    sin_lat = math.sin(lat_rad)
+    w = math.sqrt(1 - WGS84_E2 * sin_lat * sin_lat)
+    # Radios de curvatura meridiano y del primer vertical en el origen
+    meridian = WGS84_A * (1 - WGS84_E2) / (w * w * w)
+    normal = WGS84_A / w
+    navigation['home'] = (lat, lon)
+    navigation['m_per_deg_lat'] = math.radians(meridian)
+    navigation['m_per_deg_lon'] = math.radians(normal * math.cos(lat_rad))
+    navigation['last_fix'] = None
+    if navigation['geofence'] is not None:
+        # Las zonas se guardan en geográficas y se reproyectan al nuevo origen
+        navigation['geofence'] = build_geofence(navigation['geofence']['zones'], navigation,
+                                                navigation['geofence']['requested_cell_m'])
+
+
+def to_local(navigation, lat, lon):
+    """Proyecta (lat, lon) al plano local: (este, norte) en metros desde el origen."""
+    home_lat, home_lon = navigation['home']
+    return (lon - home_lon) * navigation['m_per_deg_lon'], (lat - home_lat) * navigation['m_per_deg_lat']
+
+
+def update_navigation(navigation, lat, lon, t_s):
+    """
+    Procesa un fijo GPS válido en el instante t_s (segundos): posición local, distancia y rumbo a
+    casa, velocidad respecto al fijo anterior y estado de las geocercas. El primer fijo es el origen.
+    """
+    if navigation['home'] is None:
+        set_home(navigation, lat, lon)
+    east, north = to_local(navigation, lat, lon)
+    navigation['east'] = east
+    navigation['north'] = north
+    navigation['distance'] = math.hypot(east, north)
+    navigation['bearing_to_home'] = math.degrees(math.atan2(-east, -north)) % 360.0
+
+    last_fix = navigation['last_fix']
+    if last_fix is not None and t_s > last_fix[2]:
+        dt = t_s - last_fix[2]
+        velocity_east = (east - last_fix[0]) / dt
+        velocity_north = (north - last_fix[1]) / dt
+        speed = math.hypot(velocity_east, velocity_north)
+        navigation['velocity_east'] = velocity_east
+        navigation['velocity_north'] = velocity_north
+        navigation['speed'] = speed
+        if speed >= MIN_COURSE_SPEED:
+            navigation['course'] = math.degrees(math.atan2(velocity_east, velocity_north)) % 360.0
+    navigation['last_fix'] = (east, north, t_s)
+
+    if navigation['geofence'] is not None:
+        no_fly, outside_keep_in = check_geofence(navigation['geofence'], east, north)
+        navigation['no_fly'] = no_fly
+        navigation['outside_keep_in'] = outside_keep_in
+        navigation['geofence_breach'] = bool(no_fly) or outside_keep_in
+    return navigation
+
+
+def home_guidance(navigation, heading=None):
+    """
+    Guiado hacia casa: (distancia, rumbo a casa, error de rumbo) con el error en grados (-180, 180],
+    positivo = girar a la derecha. heading es el rumbo actual; por defecto el rumbo sobre el suelo.
+    El error es None si todavía no se conoce ningún rumbo.
+    """
+    return waypoint_guidance(navigation, 0.0, 0.0, heading)
+
+
+def waypoint_guidance(navigation, east, north, heading=None):
+    """Como home_guidance, pero hacia el punto (east, north) del plano local."""
+    if heading is None:
+        heading = navigation['course']
+    dx = east - navigation['east']
+    dy = north - navigation['north']
+    bearing = math.degrees(math.atan2(dx, dy)) % 360.0
+    distance = math.hypot(dx, dy)
+    if heading is None:
+        return distance, bearing, None
+    error = (bearing - heading + 180.0) % 360.0 - 180.0
+    return distance, bearing, 180.0 if error == -180.0 else error
+
+
+def build_geofence(zones, navigation, cell_m=None):
+    """
+    Proyecta las zonas al plano local y construye su índice de rejilla. Cada zona es un
+    diccionario {'name', 'kind' ('no_fly' o 'keep_in'), 'rings'} con anillos de (lat, lon); el
+    primero es el contorno y los siguientes, huecos. Sin origen fijado, las zonas se guardan y se
+    indexan al llamar a set_home. cell_m es el lado de celda (por defecto, según el tamaño de las zonas).
+    """
+    fence = {'zones': list(zones), 'requested_cell_m': cell_m, 'compiled': [], 'cells': {}, 'cell_m': None,
+             'keep_in': False}
+    for zone in fence['zones']:
+        if zone['kind'] not in GEOFENCE_KINDS:
+            raise ValueError(f"Tipo de geocerca desconocido: {zone['kind']}")
+    if navigation['home'] is None or not fence['zones']:
+        return fence
+
+    for zone in fence['zones']:
+        edges = []
+        xs, ys = [], []
+        for ring in zone['rings']:
+            points = [to_local(navigation, lat, lon) for lat, lon in ring]
+            if points[0] == points[-1]:
+                points.pop()
+            for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+                if y1 != y2:
+                    # Arista no horizontal: y1, y2 y la pendiente inversa para el cruce del rayo
+                    edges.append((x1, y1, y2, (x2 - x1) / (y2 - y1)))
+            xs.extend(x for x, _ in points)
+            ys.extend(y for _, y in points)
+        fence['compiled'].append((zone['name'], zone['kind'] == 'keep_in', (min(xs), min(ys), max(xs), max(ys)),
+                                  tuple(edges)))
+    fence['keep_in'] = any(keep_in for _, keep_in, _, _ in fence['compiled'])
+
+    if cell_m is None:
+        spans = sorted(max(box[2] - box[0], box[3] - box[1]) for _, _, box, _ in fence['compiled'])
+        cell_m = min(MAX_CELL_M, max(MIN_CELL_M, spans[len(spans) // 2]))
+    fence['cell_m'] = cell_m
+    cells = {}
+    for index, (_, _, box, _) in enumerate(fence['compiled']):
+        for ix in range(math.floor(box[0] / cell_m), math.floor(box[2] / cell_m) + 1):
+            for iy in range(math.floor(box[1] / cell_m), math.floor(box[3] / cell_m) + 1):
+                cells.setdefault((ix, iy), []).append(index)
+    fence['cells'] = {cell: tuple(indices) for cell, indices in cells.items()}
+    return fence
+
+
+def check_geofence(fence, east, north):
+    """
+    Comprueba un punto del plano local: (nombres de las zonas prohibidas que lo contienen, fuera
+    de todas las zonas permitidas). Solo se evalúan las zonas de la celda del punto.
+    """
+    if not fence['cells']:
+        return (), False
+    cell_m = fence['cell_m']
+    candidates = fence['cells'].get((math.floor(east / cell_m), math.floor(north / cell_m)), ())
+    no_fly = []
+    inside_keep_in = False
+    for index in candidates:
+        name, keep_in, box, edges = fence['compiled'][index]
+        if keep_in and inside_keep_in:
+            continue
+        if not (box[0] <= east <= box[2] and box[1] <= north <= box[3]):
+            continue
+        if _point_in_edges(edges, east, north):
+            if keep_in:
+                inside_keep_in = True
+            else:
+                no_fly.append(name)
+    return tuple(no_fly), fence['keep_in'] and not inside_keep_in
+
+
+def load_geofence(path):
+    """
+    Lee zonas de un GeoJSON (FeatureCollection de Polygon/MultiPolygon con properties.kind
+    'no_fly' o 'keep_in' y properties.name opcional). Devuelve la lista de zonas de build_geofence.
+    """
+    with open(path, encoding='utf-8') as geojson_file:
+        collection = json.load(geojson_file)
+    zones = []
+    for number, feature in enumerate(collection.get('features', []), start=1):
+        properties = feature.get('properties') or {}
+        geometry = feature['geometry']
+        if geometry['type'] == 'Polygon':
+            polygons = [geometry['coordinates']]
+        elif geometry['type'] == 'MultiPolygon':
+            polygons = geometry['coordinates']
+        else:
+            continue
+        for polygon in polygons:
+            zones.append({
+                'name': properties.get('name', f"zona{number}"),
+                'kind': properties.get('kind', 'no_fly'),
+                # GeoJSON guarda (lon, lat)
+                'rings': [[(point[1], point[0]) for point in ring] for ring in polygon]
+            })
+    return zones
+
+
+def _point_in_edges(edges, x, y):
+    """Regla par-impar con un rayo hacia +x (los huecos quedan fuera)."""
+    inside = False
+    for x1, y1, y2, inverse_slope in edges:
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * inverse_slope:
+            inside = not inside
+    return inside
@@ -0,0 +1,120 @@
+import queue
+import time
+from threading import Condition, Event, Thread
+
+
+def initialize_pipeline():
+    """Inicializa el pipeline de etapas independientes con su evento de parada común."""
+    return {
+        'stop_event': Event(),
+        'stages': {}
+    }
+
+
+def create_slot(initial=None):
+    """Crea una ranura de último valor: los lectores siempre ven el dato más reciente."""
+    return {
+        'condition': Condition(),
+        'value': initial,
+        'seq': 0
+    }
+
+
+def publish(slot, value):
+    """Publica un nuevo valor en la ranura y despierta a quien espere uno más reciente."""
+    with slot['condition']:
+        slot['value'] = value
+        slot['seq'] += 1
+        slot['condition'].notify_all()
+
+
+def read_latest(slot):
+    """Devuelve el valor más reciente de la ranura junto con su número de secuencia."""
+    with slot['condition']:
+        return slot['value'], slot['seq']
+
+
+def wait_newer(slot, seq, timeout=None):
+    """Espera hasta que la ranura tenga un valor posterior a seq; devuelve (valor, seq) o None."""
+    with slot['condition']:
+        if slot['seq'] == seq:
+            slot['condition'].wait(timeout)
+        if slot['seq'] == seq:
+            return None
+        return slot['value'], slot['seq']
+
+
+def create_queue(maxsize=100):
+    """Crea una cola acotada entre etapas con contador de elementos descartados."""
+    return {
+        'queue': queue.Queue(maxsize=maxsize),
+        'dropped': 0
+    }
+
+
+def put_drop_oldest(stage_queue, item):
+    """Encola sin bloquear; si la cola está llena descarta el elemento más antiguo."""
+    while True:
+        try:
+            stage_queue['queue'].put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                stage_queue['queue'].get_nowait()
+                stage_queue['dropped'] += 1
+            except queue.Empty:
+                pass
+
+
+def get_item(stage_queue, timeout=0.1):
+    """Extrae un elemento de la cola o devuelve None si no llega nada en timeout."""
+    try:
+        return stage_queue['queue'].get(timeout=timeout)
+    except queue.Empty:
+        return None
+
+
+def start_stage(pipeline, name, step, rate_hz=None):
+    """
+    Lanza una etapa en su propio hilo.
+    Con rate_hz la función step se invoca a ese ritmo; sin él, step debe esperar por sí misma
+    (por ejemplo en una cola con timeout) para que la parada sea rápida.
+    """
+    stage = {
+        'name': name,
+        'rate_hz': rate_hz,
+        'iterations': 0,
+        'errors': 0,
+        'thread': None
+    }
+    stage['thread'] = Thread(target=_run_stage, args=(pipeline, stage, step), name=name, daemon=True)
+    pipeline['stages'][name] = stage
+    stage['thread'].start()
+    return stage
+
+
+def stop_pipeline(pipeline, timeout=2.0):
+    """Señala la parada a todas las etapas y espera a que terminen."""
+    pipeline['stop_event'].set()
+    deadline = time.monotonic() + timeout
+    for stage in pipeline['stages'].values():
+        remaining = max(0.0, deadline - time.monotonic())
+        stage['thread'].join(remaining)
+        if stage['thread'].is_alive():
+            print(f"La etapa {stage['name']} no terminó a tiempo")
+
+
+def _run_stage(pipeline, stage, step):
+    """Bucle de una etapa: ejecuta step hasta la parada, respetando su frecuencia si la tiene."""
+    stop_event = pipeline['stop_event']
+    period = 1.0 / stage['rate_hz'] if stage['rate_hz'] else None
+    while not stop_event.is_set():
+        start = time.monotonic()
+        try:
+            step()
+        except Exception as e:
+            stage['errors'] += 1
+            print(f"Error en etapa {stage['name']}: {e}")
+        stage['iterations'] += 1
+        if period is not None:
+            stop_event.wait(max(0.0, period - (time.monotonic() - start)))
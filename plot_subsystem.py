@@ -0,0 +1,92 @@
+import math
+
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+
+def _last_value(values):
+    """Último valor de una serie, o None si no existe o no es válido (None o NaN)."""
+    if not len(values):
+        return None
+    value = values[-1]
+    if value is None or math.isnan(value):
+        return None
+    return value
+
+
+def build_telemetry_figure(series, flight_data, signal_strength):
+    """Construye la figura de Plotly (mapa, altitud y voltaje) a partir de las series de telemetría."""
+    fig = make_subplots(
+        rows=3, cols=1,
+        subplot_titles=("Mapa de Ubicación", "Altitud", "Voltaje de Batería"),
+        specs=[[{"type": "scattergeo"}], [{"type": "scatter"}], [{"type": "scatter"}]]
+    )
+
+    # Mapa
+    fig.add_trace(
+        go.Scattergeo(
+            lat=series['latitudes'],
+            lon=series['longitudes'],
+            mode="markers+lines",
+            marker=dict(size=8, color="red"),
+            line=dict(width=2, color="blue")
+        ),
+        row=1, col=1
+    )
+    fig.update_geos(projection_type="mercator", showcountries=True, showland=True)
+
+    # Altitud
+    fig.add_trace(
+        go.Scatter(x=series['times'], y=series['gps_altitudes'], name="Altitud GPS", line=dict(color="blue")),
+        row=2, col=1
+    )
+    fig.add_trace(
+        go.Scatter(x=series['times'], y=series['baro_altitudes'], name="Altitud Baro", line=dict(color="green")),
+        row=2, col=1
+    )
+
+    # Voltaje
+    fig.add_trace(
+        go.Scatter(x=series['times'], y=series['voltages'], name="Voltaje", line=dict(color="orange")),
+        row=3, col=1
+    )
+
+    # Añadir datos de vuelo como anotaciones
+    annotations = []
+    if len(series['times']):
+        altitude = _last_value(series['baro_altitudes'])
+        latitude = _last_value(series['latitudes'])
+        longitude = _last_value(series['longitudes'])
+        latest_data = {
+            'Altitude': f"{altitude:.1f} m" if altitude is not None else "0.0 m",
+            'Distance': f"{flight_data.get('distance', 0):.1f} m",
+            'GPS': f"{latitude:.6f}, {longitude:.6f}" if latitude is not None and longitude is not None else "0.000000, 0.000000",
+            'Battery': f"{flight_data.get('battery_percent', 0):.0f}%",
+            'Speed': f"{flight_data.get('speed', 0):.1f} m/s",
+            'Signal': f"{signal_strength} bars"
+        }
+        y_pos = 0.95
+        for key, value in latest_data.items():
+            annotations.append(
+                dict(
+                    x=0.05, y=y_pos, xref="paper", yref="paper",
+                    text=f"{key}: {value}",
+                    showarrow=False, font=dict(size=12, color="white"),
+                    bgcolor="rgba(0, 0, 0, 0.5)", xanchor="left", yanchor="top"
+                )
+            )
+            y_pos -= 0.05
+
+    fig.update_layout(
+        height=800, showlegend=True,
+        title_text="Telemetría del Dron en Tiempo Real",
+        template="plotly_dark", annotations=annotations
+    )
+    return fig
+
+
+def write_telemetry_plot(series, flight_data, signal_strength, path="telemetry_plot.html"):
+    """Genera la figura y la escribe como HTML interactivo."""
+    fig = build_telemetry_figure(series, flight_data, signal_strength)
+    fig.write_html(path)
+    return fig
@@ -0,0 +1,208 @@
+import binascii
+import struct
+
+# Formato de trama binaria (little-endian):
+#   sync (2) | tipo (1) | secuencia (2) | timestamp ms (4) | payload | CRC16 (2)
+# El CRC16-CCITT (poly 0x1021, init 0xFFFF) cubre desde el tipo hasta el final del payload.
+# Los bytes de sincronía nunca aparecen en las líneas ASCII, por lo que ambos formatos
+# pueden convivir en el mismo flujo.
+SYNC = b'\xa5\x5a'
+HEADER = struct.Struct('<BHI')
+CRC = struct.Struct('<H')
+
+FRAME_TELEMETRY = 0x01
+FRAME_COMMAND = 0x02
+
+# Telemetría: lat/lon en grados * 1e7, alt GPS, alt baro, voltaje, IR, pitch, roll, yaw, validez
+TELEMETRY_PAYLOAD = struct.Struct('<iifffBfffB')
+# Comando: pitch, roll, yaw, throttle
+COMMAND_PAYLOAD = struct.Struct('<HHHH')
+
+PAYLOADS = {
+    FRAME_TELEMETRY: TELEMETRY_PAYLOAD,
+    FRAME_COMMAND: COMMAND_PAYLOAD
+}
+
+# Bits de validez de la telemetría
+VALID_GPS = 0x01
+VALID_BARO = 0x02
+VALID_BATTERY = 0x04
+VALID_IR = 0x08
+VALID_MPU = 0x10
+
+# Tamaño de una trama CMD completa (sincronía, cabecera, payload y CRC)
+COMMAND_FRAME_SIZE = len(SYNC) + HEADER.size + COMMAND_PAYLOAD.size + CRC.size
+
+MAX_LINE_LENGTH = 512
+# Respuestas de texto del módem local a los comandos AT; llegan también con el enlace en binario
+MODEM_REPLIES = (b'OK', b'ERROR')
+# Bytes admitidos en una línea ASCII; el resto (p. ej. el payload de una trama con CRC erróneo
+# que contiene un salto de línea) delata basura binaria y la línea se descarta
+LINE_BYTES = bytes(range(0x20, 0x7f)) + b'\t\r'
+PROTOCOL_MODES = ('ascii', 'binary', 'auto')
+
+
+def crc16(data):
+    """Calcula el CRC16-CCITT (init 0xFFFF) de los datos."""
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def encode_frame(frame_type, seq, timestamp_ms, values):
+    """Empaqueta una trama binaria completa con sincronía, cabecera y CRC."""
+    body = HEADER.pack(frame_type, seq & 0xFFFF, timestamp_ms & 0xFFFFFFFF) + PAYLOADS[frame_type].pack(*values)
+    return SYNC + body + CRC.pack(crc16(body))
+
+
+def encode_telemetry(seq, timestamp_ms, latitude, longitude, gps_altitude, baro_altitude, voltage,
+                     ir_status, pitch, roll, yaw, flags):
+    """Empaqueta una trama de telemetría (lado dron o simulador)."""
+    return encode_frame(FRAME_TELEMETRY, seq, timestamp_ms, (
+        int(round(latitude * 1e7)), int(round(longitude * 1e7)), gps_altitude, baro_altitude,
+        voltage, ir_status, pitch, roll, yaw, flags
+    ))
+
+
+def encode_command(seq, timestamp_ms, commands):
+    """Empaqueta una trama de comando CMD para el enlace de subida."""
+    return encode_frame(FRAME_COMMAND, seq, timestamp_ms, (
+        commands['pitch'], commands['roll'], commands['yaw'], commands['throttle']
+    ))
+
+
+def pack_command_into(buffer, seq, timestamp_ms, commands):
+    """
+    Escribe una trama CMD en un búfer preasignado (al menos COMMAND_FRAME_SIZE bytes) sin crear
+    objetos intermedios. Devuelve el tamaño de la trama.
+    """
+    buffer[0:2] = SYNC
+    HEADER.pack_into(buffer, 2, FRAME_COMMAND, seq & 0xFFFF, timestamp_ms & 0xFFFFFFFF)
+    COMMAND_PAYLOAD.pack_into(buffer, 2 + HEADER.size, commands['pitch'], commands['roll'], commands['yaw'],
+                              commands['throttle'])
+    crc_pos = COMMAND_FRAME_SIZE - CRC.size
+    with memoryview(buffer) as view:
+        CRC.pack_into(buffer, crc_pos, crc16(view[2:crc_pos]))
+    return COMMAND_FRAME_SIZE
+
+
+def encode_command_ascii(commands):
+    """Construye la línea CMD en formato ASCII (formato de respaldo) con una sola asignación."""
+    return b'CMD,%d,%d,%d,%d\n' % (commands['pitch'], commands['roll'], commands['yaw'], commands['throttle'])
+
+
+def initialize_decoder(mode='auto'):
+    """Inicializa el decodificador incremental de tramas binarias y líneas ASCII."""
+    if mode not in PROTOCOL_MODES:
+        raise ValueError(f"Modo de protocolo desconocido: {mode}")
+    return {
+        'mode': mode,
+        'buffer': bytearray(),
+        'binary_seen': False,
+        'frames': 0,
+        'lines': 0,
+        'crc_errors': 0,
+        'discarded_bytes': 0,
+        'last_seq': None,
+        'lost_frames': 0
+    }
+
+
+def feed_decoder(decoder, data, trailing=None):
+    """
+    Añade bytes recibidos al búfer y extrae todo lo que esté completo.
+    Devuelve una lista de ('frame', tipo, seq, timestamp_ms, valores) y ('line', bytes); en modo
+    binario las únicas líneas son las respuestas del módem (MODEM_REPLIES).
+    Los bytes incompletos quedan en el búfer hasta la siguiente llamada.
+    Con trailing (lista), añade por cada mensaje cuántos bytes llegaron tras su último byte,
+    para estimar el instante de llegada de cada mensaje de un bloque.
+    """
+    buffer = decoder['buffer']
+    buffer += data
+    results = []
+    accept_frames = decoder['mode'] != 'ascii'
+    modem_only = decoder['mode'] == 'binary'
+    pos = 0
+    length = len(buffer)
+    # El búfer no crece durante la llamada: el siguiente salto de línea solo se busca de nuevo
+    # cuando pos lo sobrepasa (sin ninguno, no vuelve a buscarse)
+    newline_pos = buffer.find(b'\n')
+
+    while pos < length:
+        sync_pos = buffer.find(SYNC, pos) if accept_frames else -1
+        if 0 <= newline_pos < pos:
+            newline_pos = buffer.find(b'\n', pos)
+
+        if sync_pos == pos:
+            frame_type = buffer[pos + 2] if pos + 2 < length else None
+            if frame_type is None:
+                break
+            payload = PAYLOADS.get(frame_type)
+            if payload is None:
+                # Tipo desconocido: falsa sincronía, avanzar un byte
+                pos += 1
+                decoder['discarded_bytes'] += 1
+                continue
+            frame_end = pos + 2 + HEADER.size + payload.size + CRC.size
+            if frame_end > length:
+                break
+            body = bytes(buffer[pos + 2:frame_end - CRC.size])
+            (received_crc,) = CRC.unpack_from(buffer, frame_end - CRC.size)
+            if crc16(body) != received_crc:
+                # Trama dañada: se salta entera (su payload puede contener saltos de línea) salvo
+                # que antes empiece otra trama, como cuando se perdieron bytes de esta
+                decoder['crc_errors'] += 1
+                next_sync = buffer.find(SYNC, pos + 2, frame_end)
+                skip_to = next_sync if next_sync >= 0 else frame_end
+                decoder['discarded_bytes'] += skip_to - pos
+                pos = skip_to
+                continue
+            _, seq, timestamp_ms = HEADER.unpack_from(body, 0)
+            values = payload.unpack_from(body, HEADER.size)
+            if frame_type == FRAME_TELEMETRY:
+                if decoder['last_seq'] is not None:
+                    gap = (seq - decoder['last_seq'] - 1) & 0xFFFF
+                    if gap < 0x8000:
+                        decoder['lost_frames'] += gap
+                decoder['last_seq'] = seq
+            decoder['frames'] += 1
+            decoder['binary_seen'] = True
+            results.append(('frame', frame_type, seq, timestamp_ms, values))
+            if trailing is not None:
+                trailing.append(length - frame_end)
+            pos = frame_end
+            continue
+
+        if newline_pos >= 0 and (sync_pos < 0 or newline_pos < sync_pos):
+            line = bytes(buffer[pos:newline_pos]).strip()
+            if line and (line.translate(None, LINE_BYTES) or modem_only and line not in MODEM_REPLIES):
+                decoder['discarded_bytes'] += newline_pos + 1 - pos
+            elif line:
+                decoder['lines'] += 1
+                results.append(('line', line))
+                if trailing is not None:
+                    trailing.append(length - newline_pos - 1)
+            pos = newline_pos + 1
+            continue
+
+        if sync_pos > pos:
+            # Bytes sueltos antes de una sincronía: descartarlos
+            decoder['discarded_bytes'] += sync_pos - pos
+            pos = sync_pos
+            continue
+
+        # Sin delimitador completo: conservar el resto salvo que sea basura
+        if length - pos > MAX_LINE_LENGTH:
+            decoder['discarded_bytes'] += length - pos
+            pos = length
+        break
+
+    del buffer[:pos]
+    return results
+
+
+def uplink_binary(mode, decoder):
+    """Indica si los comandos deben enviarse en binario según la configuración y lo negociado."""
+    if mode == 'binary':
+        return True
+    if mode == 'auto':
+        return decoder['binary_seen']
+    return False
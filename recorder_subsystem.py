@@ -0,0 +1,138 @@
+import csv
+import datetime
+import time
+from threading import Thread
+
+try:
+    import cv2
+    CV2_AVAILABLE = True
+except ModuleNotFoundError:
+    CV2_AVAILABLE = False
+
+import pipeline_subsystem
+
+# Columnas del índice lateral: fotograma del video y telemetría superpuesta en él
+INDEX_COLUMNS = ["Frame", "Frame_Time", "Telemetry_Time", "Telemetry_Seq"]
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+# Ritmo del video si no se pudo medir el de la capturadora
+DEFAULT_FPS = 30
+
+
+def initialize_recorder(path="flight_video.mp4", fps=None, max_queue=30, codec='mp4v'):
+    """
+    Inicializa el grabador de video en segundo plano: un hilo codificador con cv2.VideoWriter
+    alimentado por una cola acotada que descarta los fotogramas más antiguos, y un índice CSV
+    (path + '.index.csv') que relaciona cada fotograma con la telemetría mostrada.
+    fps es el ritmo medido de la capturadora (DEFAULT_FPS si no se conoce), para que el video
+    se reproduzca a velocidad real.
+    """
+    if not CV2_AVAILABLE:
+        print("No se puede grabar video: cv2 no disponible")
+        return None
+    state = {
+        'path': path,
+        'index_path': f"{path}.index.csv",
+        'fps': fps or DEFAULT_FPS,
+        'codec': codec,
+        'queue': pipeline_subsystem.create_queue(maxsize=max_queue),
+        # Diferencia entre el reloj de pared y el monotónico para fechar fotogramas y telemetría
+        'clock_offset_ns': time.time_ns() - time.monotonic_ns(),
+        'writer': None,
+        'frame_size': None,
+        'written': 0,
+        'errors': 0,
+        'running': True,
+        'thread': None
+    }
+    state['thread'] = Thread(target=_encoder_loop, args=(state,), name='video_recorder', daemon=True)
+    state['thread'].start()
+    print(f"Grabando video en {path} a {state['fps']:.1f} fps")
+    return state
+
+
+def record_frame(state, frame, capture_ns, sample=None, copy=False):
+    """
+    Encola un fotograma (BGR o RGBA) sin bloquear nunca; si el codificador va atrasado se
+    descarta el más antiguo. Con copy=True se copia el fotograma (búferes reutilizados).
+    """
+    if state is None or not state['running']:
+        return False
+    if sample is not None:
+        telemetry = (sample.arrival_ns, sample.seq)
+    else:
+        telemetry = (None, None)
+    pipeline_subsystem.put_drop_oldest(state['queue'], (frame.copy() if copy else frame, capture_ns, telemetry))
+    return True
+
+
+def close_recorder(state, timeout=5.0):
+    """Codifica los fotogramas pendientes y cierra el video y su índice."""
+    if state is None or not state['running']:
+        return
+    state['running'] = False
+    pipeline_subsystem.put_drop_oldest(state['queue'], None)
+    if state['thread'] is not None:
+        state['thread'].join(timeout)
+
+
+def recorder_stats(state):
+    """Fotogramas escritos, descartados por la cola y pendientes."""
+    return {
+        'written': state['written'],
+        'dropped': state['queue']['dropped'],
+        'pending': state['queue']['queue'].qsize(),
+        'errors': state['errors']
+    }
+
+
+def _format_time(state, monotonic_ns):
+    """Convierte un instante monotónico al formato de fecha de drone_data.csv."""
+    if monotonic_ns is None:
+        return ""
+    wall = datetime.datetime.fromtimestamp((monotonic_ns + state['clock_offset_ns']) / 1e9)
+    return wall.strftime(TIME_FORMAT)
+
+
+def _open_writer(state, frame):
+    """Abre el VideoWriter con el tamaño del primer fotograma recibido."""
+    height, width = frame.shape[:2]
+    writer = cv2.VideoWriter(state['path'], cv2.VideoWriter_fourcc(*state['codec']), state['fps'], (width, height))
+    if not writer.isOpened():
+        raise OSError(f"No se pudo abrir {state['path']} para escritura")
+    state['writer'] = writer
+    state['frame_size'] = (width, height)
+
+
+def _encoder_loop(state):
+    """Hilo codificador: convierte a BGR, escribe el fotograma y su fila del índice."""
+    index_file = open(state['index_path'], 'w', newline='', encoding='utf-8')
+    index_writer = csv.writer(index_file)
+    index_writer.writerow(INDEX_COLUMNS)
+    while True:
+        # La marca de parada llega detrás de los fotogramas pendientes, que se codifican antes
+        item = state['queue']['queue'].get()
+        if item is None:
+            break
+        frame, capture_ns, (arrival_ns, seq) = item
+        try:
+            if state['writer'] is None:
+                _open_writer(state, frame)
+            if frame.shape[2] == 4:
+                frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR)
+            if (frame.shape[1], frame.shape[0]) != state['frame_size']:
+                frame = cv2.resize(frame, state['frame_size'])
+            state['writer'].write(frame)
+            index_writer.writerow([state['written'], _format_time(state, capture_ns),
+                                   _format_time(state, arrival_ns), "" if seq is None else seq])
+            state['written'] += 1
+        except Exception as e:
+            state['errors'] += 1
+            print(f"Error al grabar video: {e}")
+
+    try:
+        if state['writer'] is not None:
+            state['writer'].release()
+        index_file.close()
+        print(f"Video guardado en {state['path']} ({state['written']} fotogramas)")
+    except Exception as e:
+        print(f"Error al cerrar grabación: {e}")
@@ -1,3 +1,19 @@
+import math
+
+import breadcrumb_subsystem
+import navigation_subsystem
+
+# Radio alrededor de casa en el que se considera alcanzada (metros)
+HOME_RADIUS_M = 3.0
+# Radio en el que se da por alcanzado un punto del rastro al desandarlo (metros)
+WAYPOINT_RADIUS_M = 5.0
+# Ganancias proporcionales del guiado a casa: guiñada por grado de error y cabeceo por metro
+YAW_GAIN = 2.0
+PITCH_GAIN = 5.0
+# Cabeceo de avance (>500 = adelante) sin rumbo conocido, para establecer el rumbo sobre el suelo
+SEARCH_PITCH = 20
+
+
 def initialize_rth():
     """Inicializa el subsistema Return-to-Home (RTH)."""
     print("RTH ON")
@@ -5,18 +21,34 @@ def initialize_rth():
         'rth_active': False,
         'home_lat': None,
         'home_lon': None,
-        'target_altitude': 10.0  # Altitud objetivo en metros
+        'target_altitude': 10.0,  # Altitud objetivo en metros
+        'home_reached': False,
+        # Desandar el camino volado (rastro de migas) en lugar de volver en línea recta
+        'retrace': True,
+        'waypoints': []
     }
 
-def process_rth(rth_state, gps_data, baro_data, battery_data):
-    """Procesa la lógica de Return-to-Home."""
+def process_rth(rth_state, gps_data, baro_data, battery_data, navigation=None, breadcrumbs=None):
+    """
+    Procesa la lógica de Return-to-Home. Con el estado de navegación (navigation_subsystem) se
+    activa también al salir de una geocerca y guía el dron hacia el punto de partida; con el
+    rastro de migas (breadcrumb_subsystem) vuelve desandando el camino volado.
+    """
     try:
-        # Activar RTH si el voltaje es bajo
-        if battery_data['valid'] and battery_data['voltage'] < 10.5 and not rth_state['rth_active']:
+        # Activar RTH si el voltaje es bajo o se viola una geocerca
+        low_battery = battery_data['valid'] and battery_data['voltage'] < 10.5
+        breach = navigation is not None and navigation['geofence_breach']
+        if (low_battery or breach) and not rth_state['rth_active']:
             rth_state['rth_active'] = True
-            rth_state['home_lat'] = gps_data['latitude'] if gps_data['valid'] else 0
-            rth_state['home_lon'] = gps_data['longitude'] if gps_data['valid'] else 0
-            print("RTH ON")
+            rth_state['home_reached'] = False
+            if navigation is not None and navigation['home'] is not None:
+                rth_state['home_lat'], rth_state['home_lon'] = navigation['home']
+            else:
+                rth_state['home_lat'] = gps_data['latitude'] if gps_data['valid'] else 0
+                rth_state['home_lon'] = gps_data['longitude'] if gps_data['valid'] else 0
+            if breadcrumbs is not None and rth_state['retrace']:
+                rth_state['waypoints'] = breadcrumb_subsystem.retrace_path(breadcrumbs)
+            print("RTH ON (geocerca)" if breach and not low_battery else "RTH ON")
 
         # Comandos RTH
         commands = {'pitch': 500, 'roll': 500, 'yaw': 500, 'throttle': 500}
@@ -26,10 +58,36 @@ def process_rth(rth_state, gps_data, baro_data, battery_data):
                 error_alt = rth_state['target_altitude'] - baro_data['baro_altitude']
                 throttle_adjust = int(error_alt * 50)  # Ganancia proporcional
                 commands['throttle'] = max(400, min(600, 500 + throttle_adjust))
+                if navigation is not None and navigation['home'] is not None:
+                    commands['pitch'], commands['yaw'] = home_commands(rth_state, navigation)
             else:
                 commands['throttle'] = 500  # Neutral si no hay datos válidos
 
         return commands, rth_state
     except Exception as e:
         print(f"Error en RTH: {e}")
-        return {'pitch': 500, 'roll': 500, 'yaw': 500, 'throttle': 500}, rth_state
\ No newline at end of file
+        return {'pitch': 500, 'roll': 500, 'yaw': 500, 'throttle': 500}, rth_state
+
+def home_commands(rth_state, navigation):
+    """
+    Cabeceo y guiñada hacia el siguiente punto del rastro (o hacia casa si no quedan): girar
+    hacia su rumbo y avanzar según la distancia y el error de rumbo.
+    """
+    waypoints = rth_state['waypoints']
+    while waypoints:
+        distance, _, heading_error = navigation_subsystem.waypoint_guidance(navigation, *waypoints[0])
+        if distance > WAYPOINT_RADIUS_M:
+            break
+        waypoints.pop(0)
+    else:
+        distance, _, heading_error = navigation_subsystem.home_guidance(navigation)
+        if distance <= HOME_RADIUS_M:
+            rth_state['home_reached'] = True
+            return 500, 500
+    rth_state['home_reached'] = False
+    if heading_error is None:
+        return 500 + SEARCH_PITCH, 500
+    yaw = max(-100, min(100, int(heading_error * YAW_GAIN)))
+    # Solo se avanza con la proa hacia el objetivo (cos del error), más despacio al acercarse
+    forward = distance * PITCH_GAIN * max(0.0, math.cos(math.radians(heading_error)))
+    return 500 + min(100, int(forward)), 500 + yaw
@@ -0,0 +1,97 @@
+import time
+
+# Frecuencia por defecto del bucle de control (Hz); la estación, la flota y --control-rate la comparten
+CONTROL_RATE_HZ = 50
+
+
+def initialize_scheduler(rate_hz=CONTROL_RATE_HZ, spin_ns=500_000):
+    """Inicializa el planificador de control a frecuencia fija basado en time.monotonic_ns."""
+    period_ns = int(1_000_000_000 / rate_hz)
+    print(f"Planificador de control a {rate_hz} Hz")
+    return {
+        'rate_hz': rate_hz,
+        'period_ns': period_ns,
+        'period_s': period_ns / 1_000_000_000,
+        'spin_ns': spin_ns,
+        'start_ns': None,
+        'next_deadline_ns': None,
+        'tick': 0,
+        'overruns': 0,
+        'skipped_ticks': 0,
+        'last_lateness_ns': 0,
+        'max_lateness_ns': 0
+    }
+
+
+def wait_next_tick(scheduler_state, stop_event=None):
+    """
+    Espera hasta el siguiente instante del planificador y devuelve el dt fijo del tick.
+    Los instantes se calculan desde el inicio (start + n * periodo) para no acumular deriva;
+    si un tick llega tarde más de un periodo, se cuentan el retraso y los ticks saltados.
+    Devuelve None si stop_event se activa durante la espera.
+    """
+    if scheduler_state['next_deadline_ns'] is None:
+        scheduler_state['start_ns'] = time.monotonic_ns()
+        scheduler_state['next_deadline_ns'] = scheduler_state['start_ns']
+
+    deadline = scheduler_state['next_deadline_ns']
+    remaining = deadline - time.monotonic_ns()
+    # Dormir hasta casi el instante objetivo y completar con espera activa corta
+    if remaining > scheduler_state['spin_ns']:
+        sleep_s = (remaining - scheduler_state['spin_ns']) / 1_000_000_000
+        if stop_event is not None:
+            if stop_event.wait(sleep_s):
+                return None
+        else:
+            time.sleep(sleep_s)
+    while time.monotonic_ns() < deadline:
+        pass
+
+    return _complete_tick(scheduler_state, deadline)
+
+
+async def wait_next_tick_async(scheduler_state):
+    """
+    Variante para asyncio de wait_next_tick: cede el bucle de eventos hasta el instante objetivo
+    (sin espera activa, para que un solo hilo atienda muchos enlaces). Devuelve el dt del tick.
+    """
+    import asyncio
+    if scheduler_state['next_deadline_ns'] is None:
+        scheduler_state['start_ns'] = time.monotonic_ns()
+        scheduler_state['next_deadline_ns'] = scheduler_state['start_ns']
+    deadline = scheduler_state['next_deadline_ns']
+    remaining = deadline - time.monotonic_ns()
+    if remaining > 0:
+        await asyncio.sleep(remaining / 1_000_000_000)
+    return _complete_tick(scheduler_state, deadline)
+
+
+def _complete_tick(scheduler_state, deadline):
+    """Registra el retraso del tick, cuenta los ticks saltados y fija el siguiente instante."""
+    period_ns = scheduler_state['period_ns']
+    now = time.monotonic_ns()
+    lateness = now - deadline
+    scheduler_state['last_lateness_ns'] = lateness
+    if lateness > scheduler_state['max_lateness_ns']:
+        scheduler_state['max_lateness_ns'] = lateness
+
+    # Ticks perdidos: se saltan en lugar de ejecutarse en ráfaga
+    missed = lateness // period_ns
+    if missed > 0:
+        scheduler_state['overruns'] += 1
+        scheduler_state['skipped_ticks'] += missed
+    scheduler_state['tick'] += 1 + missed
+    scheduler_state['next_deadline_ns'] = scheduler_state['start_ns'] + scheduler_state['tick'] * period_ns
+    return (1 + missed) * scheduler_state['period_s']
+
+
+def scheduler_stats(scheduler_state):
+    """Devuelve las estadísticas del planificador para depuración."""
+    return {
+        'rate_hz': scheduler_state['rate_hz'],
+        'ticks': scheduler_state['tick'] - scheduler_state['skipped_ticks'],
+        'overruns': scheduler_state['overruns'],
+        'skipped_ticks': scheduler_state['skipped_ticks'],
+        'last_lateness_ms': scheduler_state['last_lateness_ns'] / 1_000_000,
+        'max_lateness_ms': scheduler_state['max_lateness_ns'] / 1_000_000
+    }
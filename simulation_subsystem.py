@@ -0,0 +1,96 @@
+import math
+import random
+
+import protocol_subsystem
+
+
+def initialize_drone_model(home_lat=40.4168, home_lon=-3.7038, rate_hz=10, protocol='ascii',
+                           frequency=915, seed=0):
+    """Inicializa un dron sintético que vuela en círculo sobre el punto de inicio."""
+    return {
+        'home_lat': home_lat,
+        'home_lon': home_lon,
+        'rate_hz': rate_hz,
+        'protocol': protocol,
+        'frequency': frequency,
+        'jammed': set(),
+        'random': random.Random(seed),
+        'seq': 0,
+        'radius_m': 50.0,
+        'angular_speed': 0.1,
+        'cruise_altitude': 20.0,
+        'voltage': 12.6,
+        'discharge_per_s': 0.002,
+        'ir_status': 0,
+        'rssi': 180,
+        'commands_received': 0,
+        'last_command': None,
+        'rx_decoder': protocol_subsystem.initialize_decoder('auto')
+    }
+
+
+def drone_position(model, t):
+    """Devuelve latitud, longitud y altitud del dron sintético en el instante t (s)."""
+    angle = model['angular_speed'] * t
+    north = model['radius_m'] * math.sin(angle)
+    east = model['radius_m'] * (1 - math.cos(angle))
+    lat = model['home_lat'] + north / 111320.0
+    lon = model['home_lon'] + east / (111320.0 * math.cos(math.radians(model['home_lat'])))
+    altitude = min(model['cruise_altitude'], 2.0 * t) + 0.5 * math.sin(0.7 * t)
+    return lat, lon, altitude
+
+
+def drone_telemetry(model, t):
+    """Genera la telemetría del instante t como línea ASCII o trama binaria según el protocolo."""
+    rnd = model['random']
+    lat, lon, altitude = drone_position(model, t)
+    voltage = max(9.0, model['voltage'] - model['discharge_per_s'] * t)
+    pitch = rnd.gauss(0, 2.0)
+    roll = rnd.gauss(0, 2.0)
+    yaw = rnd.gauss(0, 1.0)
+    model['seq'] = (model['seq'] + 1) & 0xFFFF
+    if model['protocol'] == 'binary':
+        flags = (protocol_subsystem.VALID_GPS | protocol_subsystem.VALID_BARO | protocol_subsystem.VALID_BATTERY
+                 | protocol_subsystem.VALID_IR | protocol_subsystem.VALID_MPU)
+        return protocol_subsystem.encode_telemetry(
+            model['seq'], int(t * 1000), lat, lon, altitude + 600.0, altitude, voltage,
+            model['ir_status'], pitch, roll, yaw, flags
+        )
+    return (f"{lat:.6f},{lon:.6f},{altitude + 600.0:.1f},{altitude:.2f},{voltage:.2f},"
+            f"{model['ir_status']},{pitch:.2f},{roll:.2f},{yaw:.2f}\n").encode('utf-8')
+
+
+def drone_receive(model, data):
+    """Procesa bytes del enlace de subida (CMD en ASCII o binario) recibidos por el dron."""
+    for message in protocol_subsystem.feed_decoder(model['rx_decoder'], data):
+        if message[0] == 'frame' and message[1] == protocol_subsystem.FRAME_COMMAND:
+            model['commands_received'] += 1
+            model['last_command'] = message[4]
+        elif message[0] == 'line' and message[1].startswith(b'CMD,'):
+            try:
+                model['last_command'] = tuple(int(v) for v in message[1].split(b',')[1:5])
+                model['commands_received'] += 1
+            except ValueError:
+                pass
+
+
+def jam_frequency(model, frequency, frequencies):
+    """Interfiere una frecuencia; si es la del dron, este salta a otra libre al azar."""
+    model['jammed'].add(frequency)
+    if model['frequency'] == frequency:
+        free = [f for f in frequencies if f not in model['jammed']]
+        if free:
+            model['frequency'] = model['random'].choice(free)
+
+
+def rssi_report(model):
+    """Informe de RSSI como el del RFD900x (L/R RSSI local/remoto y ruido) del enlace actual."""
+    rnd = model['random']
+    local = model['rssi'] - rnd.randint(0, 10)
+    remote = model['rssi'] - rnd.randint(0, 10)
+    return f"L/R RSSI: {local}/{remote}  L/R noise: 40/41 pkts: {model['seq']}\n".encode('utf-8')
+
+
+def link_up(model, ground_frequency):
+    """Indica si hay enlace: misma frecuencia en tierra y en el dron, y sin interferencia."""
+    return ground_frequency == model['frequency'] and ground_frequency not in model['jammed']
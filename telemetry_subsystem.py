@@ -0,0 +1,133 @@
+import gps_subsystem
+import barometer_subsystem
+import battery_subsystem
+import ir_subsystem
+from protocol_subsystem import VALID_GPS, VALID_BARO, VALID_BATTERY, VALID_IR, VALID_MPU
+
+TELEMETRY_FIELDS = 9
+
+
+class TelemetrySample:
+    """Muestra de telemetría decodificada en una sola pasada, con bits de validez por grupo."""
+    __slots__ = ('latitude', 'longitude', 'gps_altitude', 'baro_altitude', 'voltage',
+                 'ir_status', 'pitch', 'roll', 'yaw', 'valid', 'seq', 'timestamp_ms', 'arrival_ns')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Deja la muestra sin datos válidos para reutilizarla."""
+        self.latitude = 0.0
+        self.longitude = 0.0
+        self.gps_altitude = 0.0
+        self.baro_altitude = 0.0
+        self.voltage = 0.0
+        self.ir_status = 0
+        self.pitch = 0.0
+        self.roll = 0.0
+        self.yaw = 0.0
+        self.valid = 0
+        self.seq = None
+        self.timestamp_ms = None
+        self.arrival_ns = None
+
+    def has(self, flags):
+        """Indica si son válidos todos los grupos de datos indicados (VALID_GPS, VALID_BARO, ... o su unión)."""
+        return self.valid & flags == flags
+
+
+def parse_line(line, sample=None):
+    """
+    Decodifica una línea ASCII de 9 campos (bytes o str) en una TelemetrySample.
+    Cada grupo (GPS, barómetro, batería, IR, MPU) se valida por separado con las mismas reglas
+    que los process_*_data; si la línea no tiene 9 campos la muestra queda sin datos válidos.
+    """
+    if sample is None:
+        sample = TelemetrySample()
+    else:
+        sample.reset()
+    data = line.split(b',' if isinstance(line, bytes) else ',')
+    if len(data) != TELEMETRY_FIELDS:
+        return sample
+
+    valid = 0
+    try:
+        lat = float(data[0]) if data[0] else 0.0
+        lon = float(data[1]) if data[1] else 0.0
+        gps_alt = float(data[2]) if data[2] else 0.0
+        sample.latitude = lat
+        sample.longitude = lon
+        sample.gps_altitude = gps_alt
+        if lat != 0 or lon != 0 or gps_alt != 0:
+            valid |= VALID_GPS
+    except ValueError:
+        pass
+    try:
+        baro_alt = float(data[3]) if data[3] else 0.0
+        sample.baro_altitude = baro_alt
+        if baro_alt != 0:
+            valid |= VALID_BARO
+    except ValueError:
+        pass
+    try:
+        voltage = float(data[4]) if data[4] else 0.0
+        sample.voltage = voltage
+        if voltage != 0:
+            valid |= VALID_BATTERY
+    except ValueError:
+        pass
+    try:
+        sample.ir_status = int(data[5]) if data[5] else 0
+        valid |= VALID_IR
+    except ValueError:
+        pass
+    try:
+        pitch = float(data[6])
+        roll = float(data[7])
+        yaw = float(data[8])
+        sample.pitch = pitch
+        sample.roll = roll
+        sample.yaw = yaw
+        valid |= VALID_MPU
+    except ValueError:
+        pass
+    sample.valid = valid
+    return sample
+
+
+def parse_frame(values, seq=None, timestamp_ms=None, sample=None):
+    """Carga los campos de una trama binaria de telemetría en una TelemetrySample."""
+    if sample is None:
+        sample = TelemetrySample()
+    lat_e7, lon_e7, gps_alt, baro_alt, voltage, ir_status, pitch, roll, yaw, flags = values
+    sample.latitude = lat_e7 / 1e7
+    sample.longitude = lon_e7 / 1e7
+    sample.gps_altitude = gps_alt
+    sample.baro_altitude = baro_alt
+    sample.voltage = voltage
+    sample.ir_status = ir_status
+    sample.pitch = pitch
+    sample.roll = roll
+    sample.yaw = yaw
+    sample.valid = flags
+    sample.seq = seq
+    sample.timestamp_ms = timestamp_ms
+    return sample
+
+
+def mpu_view(sample):
+    """Devuelve los datos del MPU-6050 de la muestra en el formato de diccionario de DrivingAid."""
+    if sample.has(VALID_MPU):
+        return {'pitch': sample.pitch, 'roll': sample.roll, 'yaw': sample.yaw, 'valid': True}
+    return {'pitch': 0, 'roll': 0, 'yaw': 0, 'valid': False}
+
+
+def telemetry_views(sample):
+    """Construye los diccionarios por subsistema que esperan los controladores y el video."""
+    return {
+        'gps_data': gps_subsystem.process_gps_data(sample),
+        'baro_data': barometer_subsystem.process_barometer_data(sample),
+        'battery_data': battery_subsystem.process_battery_data(sample),
+        'ir_data': ir_subsystem.process_ir_data(sample),
+        'mpu_data': mpu_view(sample)
+    }
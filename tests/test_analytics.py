@@ -0,0 +1,103 @@
+import csv
+import datetime
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import analytics_subsystem
+import gps_subsystem
+import log_subsystem
+
+
+def straight_track(speed_ms, samples=50, lat0=40.0, lon0=-3.0):
+    """Vuelo hacia el norte a velocidad constante, una muestra por segundo."""
+    step_deg = np.degrees(speed_ms / analytics_subsystem.EARTH_RADIUS_M)
+    t = np.arange(samples, dtype=float)
+    lat = lat0 + step_deg * t
+    lon = np.full(samples, lon0)
+    nan = np.full(samples, np.nan)
+    return t, lat, lon, nan, nan, nan
+
+
+def test_p95_speed_never_exceeds_max_speed():
+    # 1.01 m/s cae en la cubeta [1.0, 1.5): su límite superior quedaría por encima del máximo
+    summary = analytics_subsystem.initialize_flight_summary()
+    analytics_subsystem.update_flight_summary(summary, *straight_track(1.01))
+    result = analytics_subsystem.finish_flight_summary(summary, 'vuelo')
+    assert result['p95_speed_ms'] <= result['max_speed_ms']
+    assert result['p95_speed_ms'] == pytest.approx(1.01, abs=0.01)
+
+
+def test_p95_speed_interpolates_within_the_bin():
+    histogram = np.zeros(10, dtype=np.int64)
+    histogram[2] = 100  # todas las muestras entre 1.0 y 1.5 m/s
+    assert analytics_subsystem._histogram_percentile(histogram, 0.5, 10.0) == pytest.approx(1.25)
+    assert analytics_subsystem._histogram_percentile(histogram, 0.95, 10.0) == pytest.approx(1.475, abs=0.01)
+    assert analytics_subsystem._histogram_percentile(np.zeros(10, dtype=np.int64), 0.95, 0.0) == 0.0
+
+
+def write_log(path, fixes, start=datetime.datetime(2024, 7, 1, 12, 0)):
+    """Registro con el esquema de drone_data.csv, una muestra por segundo."""
+    with open(path, 'w', newline='', encoding='utf-8') as log_file:
+        writer = csv.writer(log_file)
+        writer.writerow(log_subsystem.LOG_COLUMNS)
+        for offset, (lat, lon) in enumerate(fixes):
+            when = start + datetime.timedelta(seconds=offset)
+            writer.writerow(log_subsystem.format_log_row(
+                {"Timestamp": when, "Latitude": lat, "Longitude": lon, "GPS_Altitude": 10.0,
+                 "Baro_Altitude": 9.5, "Battery_Voltage": 11.8, "IR_Status": "OFF"}))
+
+
+def wandering_track(samples, seed):
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.0, 0.00005, size=(samples, 2))
+    return (np.array([40.4168, -3.7038]) + np.cumsum(steps, axis=0)).tolist()
+
+
+def test_cli_distance_and_speed_match_scalar_haversine(tmp_path, capsys):
+    pytest.importorskip("pandas")
+    fixes = wandering_track(200, seed=3)
+    path = str(tmp_path / "drone_data.csv")
+    write_log(path, fixes)
+    steps = [gps_subsystem.haversine_distance(*a, *b) for a, b in zip(fixes, fixes[1:])]
+    home = fixes[0]
+
+    out = str(tmp_path / "resumen.json")
+    analytics_subsystem.main([path, '--json', out, '--chunk-rows', '37', '--workers', '1'])
+    with open(out, encoding='utf-8') as summary_file:
+        summary, = json.load(summary_file)['flights']
+    assert summary['files'] == 1 and summary['samples'] == 200 and summary['gps_fixes'] == 200
+    assert summary['total_distance_m'] == pytest.approx(sum(steps), abs=0.1)
+    assert summary['max_speed_ms'] == pytest.approx(max(steps), abs=0.01)
+    assert summary['mean_speed_ms'] == pytest.approx(sum(steps) / 199, abs=0.01)
+    assert summary['max_range_m'] == pytest.approx(
+        max(gps_subsystem.haversine_distance(*home, *fix) for fix in fixes), abs=0.1)
+    assert summary['p95_speed_ms'] <= summary['max_speed_ms']
+    assert "drone_data.csv" in capsys.readouterr().out
+
+
+def test_rotated_segments_are_grouped_into_one_flight(tmp_path):
+    pytest.importorskip("pandas")
+    fixes = wandering_track(90, seed=5)
+    start = datetime.datetime(2024, 7, 1, 12, 0)
+    # drone_data.1.csv es el segmento más antiguo y drone_data.csv el activo
+    write_log(str(tmp_path / "drone_data.1.csv"), fixes[:30], start)
+    write_log(str(tmp_path / "drone_data.2.csv"), fixes[30:60], start + datetime.timedelta(seconds=30))
+    write_log(str(tmp_path / "drone_data.csv"), fixes[60:], start + datetime.timedelta(seconds=60))
+    write_log(str(tmp_path / "other.csv"), fixes[:10])
+
+    flights = analytics_subsystem.group_flights([str(tmp_path / "drone_data.csv"), str(tmp_path / "other.csv")])
+    assert [os.path.basename(key) for key in flights] == ["drone_data.csv", "other.csv"]
+    assert [os.path.basename(p) for p in flights[str(tmp_path / "drone_data.csv")]] == \
+        ["drone_data.1.csv", "drone_data.2.csv", "drone_data.csv"]
+
+    summaries = analytics_subsystem.analyze_flights([str(tmp_path / "*.csv")], workers=2, chunk_rows=16)
+    flight = next(s for s in summaries if s['flight'].endswith("drone_data.csv"))
+    assert len(summaries) == 2 and flight['files'] == 3
+    assert flight['samples'] == 90 and flight['duration_s'] == 89.0
+    # Las uniones entre segmentos cuentan como tramos normales
+    steps = [gps_subsystem.haversine_distance(*a, *b) for a, b in zip(fixes, fixes[1:])]
+    assert flight['total_distance_m'] == pytest.approx(sum(steps), abs=0.1)
@@ -0,0 +1,93 @@
+import math
+import random
+
+import breadcrumb_subsystem
+
+
+def segment_distance(point, start, end):
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    length = dx * dx + dy * dy
+    t = 0.0 if length == 0 else max(0.0, min(1.0, ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / length))
+    return math.hypot(point[0] - start[0] - t * dx, point[1] - start[1] - t * dy)
+
+
+def wander(count, seed=3):
+    rnd = random.Random(seed)
+    east = north = heading = 0.0
+    path = []
+    for _ in range(count):
+        heading += rnd.gauss(0, 0.05)
+        east += 0.2 * math.cos(heading)
+        north += 0.2 * math.sin(heading)
+        path.append((east, north))
+    return path
+
+
+def test_deviation_stays_within_tolerance_after_compaction():
+    flown = wander(100000)
+    trail = breadcrumb_subsystem.initialize_breadcrumbs(tolerance_m=2.0, max_points=600)
+    for east, north in flown:
+        breadcrumb_subsystem.append_point(trail, east, north)
+    stats = breadcrumb_subsystem.breadcrumb_stats(trail)
+    assert stats['compactions'] > 0
+    assert stats['points'] < 600
+
+    path = list(reversed(breadcrumb_subsystem.retrace_path(trail)))
+    # Los puntos descartados por antigüedad quedan fuera del rastro; el resto respeta la tolerancia
+    oldest = flown.index(path[0])
+    worst = max(min(segment_distance(point, path[i], path[i + 1]) for i in range(len(path) - 1))
+                for point in flown[oldest::25])
+    assert worst <= 2.0 + 1e-9
+
+
+def test_retrace_runs_from_the_last_point_back_to_the_first():
+    trail = breadcrumb_subsystem.initialize_breadcrumbs(tolerance_m=1.0)
+    for step in range(100):
+        breadcrumb_subsystem.append_point(trail, float(step), 0.0)
+    for step in range(100):
+        breadcrumb_subsystem.append_point(trail, 99.0, float(step))
+    path = breadcrumb_subsystem.retrace_path(trail)
+    assert path[0] == (99.0, 99.0)
+    assert (99.0, 0.0) in path
+    assert path[-1] == (0.0, 0.0)
+
+
+def worst_deviation(flown, path):
+    return max(min(segment_distance(point, path[i], path[i + 1]) for i in range(len(path) - 1))
+               for point in flown)
+
+
+def test_hairpin_overshoot_stays_within_the_online_share():
+    # El punto más lejano (10, 0.95) queda por delante del vértice al que se vuelve
+    flown = [(0.0, 0.0), (10.0, 0.95), (9.06, 0.0), (9.06, -5.0), (9.06, -10.0)]
+    trail = breadcrumb_subsystem.initialize_breadcrumbs(tolerance_m=2.0)
+    for east, north in flown:
+        breadcrumb_subsystem.append_point(trail, east, north)
+    assert worst_deviation(flown, breadcrumb_subsystem.retrace_path(trail)) <= 1.0 + 1e-9
+
+
+def test_repeated_hairpins_respect_the_tolerance():
+    rnd = random.Random(7)
+    flown = []
+    east = north = 0.0
+    heading = 0.0
+    for _ in range(120):
+        # Tramos de ida y vuelta casi sobre sí mismos, con vuelta a veces hasta el punto de partida
+        heading += math.pi + rnd.gauss(0, 0.1)
+        length = rnd.randint(3, 60)
+        for _ in range(length):
+            east += 0.5 * math.cos(heading) + rnd.gauss(0, 0.05)
+            north += 0.5 * math.sin(heading) + rnd.gauss(0, 0.05)
+            flown.append((east, north))
+
+    online = breadcrumb_subsystem.initialize_breadcrumbs(tolerance_m=2.0, max_points=len(flown))
+    compacted = breadcrumb_subsystem.initialize_breadcrumbs(tolerance_m=2.0, max_points=64)
+    for east, north in flown:
+        breadcrumb_subsystem.append_point(online, east, north)
+        breadcrumb_subsystem.append_point(compacted, east, north)
+    assert worst_deviation(flown, breadcrumb_subsystem.retrace_path(online)) <= 1.0 + 1e-9
+
+    assert breadcrumb_subsystem.breadcrumb_stats(compacted)['compactions'] > 0
+    path = list(reversed(breadcrumb_subsystem.retrace_path(compacted)))
+    kept = flown[flown.index(path[0]):]
+    assert worst_deviation(kept, path) <= 2.0 + 1e-9
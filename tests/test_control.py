@@ -0,0 +1,51 @@
+import time
+
+import groundstation_subsystem
+import main
+import pipeline_subsystem
+import scheduler_subsystem
+import telemetry_subsystem
+
+LINE = b'40.416805,-3.703800,600.3,12.26,11.60,1,4.74,-2.03,-0.07'
+
+
+def publish(station, line, arrival_ns):
+    sample = telemetry_subsystem.parse_line(line)
+    sample.arrival_ns = arrival_ns
+    pipeline_subsystem.publish(station.telemetry_slot, sample)
+
+
+def pid_terms(station):
+    drivingaid = station.drivingaid_state
+    flystandard = station.flystandard_state
+    return (drivingaid['error_sum_pitch'], drivingaid['last_error_pitch'],
+            flystandard['error_sum'], flystandard['last_error'])
+
+
+def test_pid_terms_hold_until_a_new_sample_arrives():
+    neutral = (dict(groundstation_subsystem.NEUTRAL_COMMANDS), False, False)
+    station = groundstation_subsystem.GroundStation(read_input=lambda: neutral)
+    station.flystandard_state['flystandard_active'] = True
+    station.flystandard_state['target_altitude'] = 20.0
+    arrival_ns = time.monotonic_ns()
+    publish(station, LINE, arrival_ns)
+
+    first, _, _ = station.control(0.02)
+    terms = pid_terms(station)
+    for _ in range(4):
+        commands, _, _ = station.control(0.02)
+        assert pid_terms(station) == terms
+        assert commands == first
+
+    publish(station, LINE, arrival_ns + 100_000_000)
+    station.control(0.02)
+    # Segunda muestra: se integra una sola vez, con el tiempo entre muestras (0.1 s) como paso
+    error_pitch = terms[1]
+    assert abs(station.drivingaid_state['error_sum_pitch'] - (error_pitch * 0.02 + error_pitch * 0.1)) < 1e-9
+
+
+def test_control_rate_has_one_default_and_a_cli_option():
+    assert main.parse_args([]).control_rate == scheduler_subsystem.CONTROL_RATE_HZ
+    assert scheduler_subsystem.initialize_scheduler()['rate_hz'] == scheduler_subsystem.CONTROL_RATE_HZ
+    station = groundstation_subsystem.GroundStation(control_rate_hz=main.parse_args(['--control-rate', '100']).control_rate)
+    assert station.control_scheduler['rate_hz'] == 100
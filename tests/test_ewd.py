@@ -0,0 +1,33 @@
+import electronicwardefense_subsystem as ewd
+import groundstation_subsystem
+
+
+def test_rssi_changes_the_hop_order():
+    state = ewd.initialize_electronicwardefense()
+    assert ewd.rank_channels(state)[:2] == [918, 921]
+    ewd.record_rssi(state, 924, 190)
+    ewd.record_rssi(state, 918, 120)
+    assert ewd.rank_channels(state)[:3] == [924, 918, 921]
+
+
+def test_parse_rssi_report():
+    assert ewd.parse_rssi_report(b'L/R RSSI: 206/197  L/R noise: 73/72 pkts: 0') == 206
+    assert ewd.parse_rssi_report(b'40.416805,-3.703800,600.3') is None
+
+
+def test_station_records_rssi_reports_on_the_current_channel():
+    station = groundstation_subsystem.GroundStation()
+    station.receive_bytes(b'L/R RSSI: 185/170  L/R noise: 40/41 pkts: 12\n')
+    assert station.ewd_state['channels'][915]['rssi'] == 185
+    assert station.metrics['counters'].get('parse_errors', 0) == 0
+
+
+def test_binary_link_confirms_hops_with_the_modem_reply():
+    station = groundstation_subsystem.GroundStation(protocol_mode='binary')
+    station.ewd_state['last_signal_time'] -= 10
+    station.process_ewd(False)
+    assert station.ewd_state['phase'] == ewd.AWAITING_OK
+    station.receive_bytes(b'OK\r\n')
+    assert station.ewd_state['phase'] == ewd.DWELL
+    assert station.ewd_state['at_confirmed'] == 1
+    assert station.ewd_state['at_timeouts'] == 0
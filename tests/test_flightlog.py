@@ -0,0 +1,48 @@
+import datetime
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import flightlog_subsystem
+import log_subsystem
+
+
+@pytest.fixture
+def madrid(monkeypatch):
+    if not hasattr(time, 'tzset'):
+        pytest.skip("time.tzset no disponible")
+    monkeypatch.setenv('TZ', 'Europe/Madrid')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def row(when):
+    return {"Timestamp": when, "Latitude": 40.0, "Longitude": -3.0, "GPS_Altitude": 10.0,
+            "Baro_Altitude": 9.5, "Battery_Voltage": 11.8, "IR_Status": "OFF"}
+
+
+def test_timestamps_stay_monotonic_across_dst_fall_back(madrid, tmp_path):
+    # 27/10/2024: en Madrid las 03:00 vuelven a ser las 02:00; se registra de 02:30 a 02:30 (repetida)
+    start = datetime.datetime(2024, 10, 27, 0, 0, tzinfo=datetime.timezone.utc)
+    instants = [start + datetime.timedelta(minutes=15 * i) for i in range(8)]
+    path = str(tmp_path / "flight.flog")
+    writer = flightlog_subsystem.open_writer(path, index_stride=2)
+    for when in instants:
+        flightlog_subsystem.write_row(writer, row(when))
+    flightlog_subsystem.close_writer(writer)
+
+    reader = flightlog_subsystem.open_flightlog(path)
+    stamps = reader['records']['timestamp_us']
+    assert np.all(np.diff(stamps) == 15 * 60 * 1_000_000)
+    for position, when in enumerate(instants):
+        assert flightlog_subsystem.seek_time(reader, when) == position
+    assert flightlog_subsystem.to_datetime(stamps[5]) == instants[5]
+    local = [log_subsystem.format_log_row(flightlog_subsystem.record_row(record))[0] for record in reader['records']]
+    flightlog_subsystem.close_flightlog(reader)
+    # En el CSV la hora local se repite, como en el reloj de pared
+    assert local[2] == "2024-10-27 02:30:00.000000"
+    assert local[6] == "2024-10-27 02:30:00.000000"
@@ -0,0 +1,77 @@
+import csv
+import datetime
+import os
+import time
+
+import pytest
+
+import log_subsystem
+
+
+@pytest.fixture
+def madrid(monkeypatch):
+    if not hasattr(time, 'tzset'):
+        pytest.skip("time.tzset no disponible")
+    monkeypatch.setenv('TZ', 'Europe/Madrid')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def row(when, latitude=40.0):
+    return {"Timestamp": when, "Latitude": latitude, "Longitude": -3.0, "GPS_Altitude": 10.0,
+            "Baro_Altitude": 9.5, "Battery_Voltage": 11.8, "IR_Status": "OFF"}
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as log_file:
+        return list(csv.reader(log_file))
+
+
+def test_csv_schema_and_local_timestamps(madrid, tmp_path):
+    path = str(tmp_path / "drone_data.csv")
+    state = log_subsystem.initialize_log(path, flush_interval=0.05)
+    # 12:00 UTC en julio son las 14:00 en Madrid (CEST); el CSV guarda hora local sin zona
+    when = datetime.datetime(2024, 7, 1, 12, 0, 0, 250000, tzinfo=datetime.timezone.utc)
+    assert log_subsystem.log_sample(state, row(when))
+    assert log_subsystem.log_sample(state, {"Timestamp": when.replace(tzinfo=None), "IR_Status": "ON"})
+    log_subsystem.close_log(state)
+
+    header, aware, naive = read_csv(path)
+    assert header == log_subsystem.LOG_COLUMNS
+    assert aware == ["2024-07-01 14:00:00.250000", "40.0", "-3.0", "10.0", "9.5", "11.8", "OFF"]
+    # Los instantes sin zona se escriben tal cual y los campos ausentes quedan vacíos
+    assert naive == ["2024-07-01 12:00:00.250000", "", "", "", "", "", "ON"]
+    assert state['written'] == 2 and state['dropped'] == 0
+
+
+def test_rotation_creates_numbered_segments_with_headers(tmp_path):
+    path = str(tmp_path / "drone_data.csv")
+    start = datetime.datetime(2024, 7, 1, 12, 0)
+    state = log_subsystem.initialize_log(path, max_bytes=200, flush_interval=0.05)
+    for i in range(12):
+        assert log_subsystem.log_sample(state, row(start + datetime.timedelta(seconds=i), 40.0 + i))
+    log_subsystem.close_log(state)
+
+    segments = sorted(name for name in os.listdir(tmp_path) if name != "drone_data.csv")
+    assert segments and segments[0] == "drone_data.1.csv"
+    assert segments == [f"drone_data.{i}.csv" for i in range(1, len(segments) + 1)]
+    rows = []
+    for name in segments + ["drone_data.csv"]:
+        content = read_csv(str(tmp_path / name))
+        assert content[0] == log_subsystem.LOG_COLUMNS
+        rows.extend(content[1:])
+    # Ninguna fila se pierde ni se duplica al rotar, y el orden se conserva
+    assert [float(r[1]) for r in rows] == [40.0 + i for i in range(12)]
+
+
+def test_rotation_does_not_overwrite_existing_segments(tmp_path):
+    path = str(tmp_path / "drone_data.csv")
+    (tmp_path / "drone_data.1.csv").write_text("previo\n", encoding='utf-8')
+    state = log_subsystem.initialize_log(path, max_bytes=1, flush_interval=0.05)
+    log_subsystem.log_sample(state, row(datetime.datetime(2024, 7, 1, 12, 0)))
+    log_subsystem.close_log(state)
+
+    assert (tmp_path / "drone_data.1.csv").read_text(encoding='utf-8') == "previo\n"
+    assert read_csv(str(tmp_path / "drone_data.2.csv"))[1][1] == "40.0"
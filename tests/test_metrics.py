@@ -0,0 +1,25 @@
+import threading
+
+import metrics_subsystem
+
+
+def test_concurrent_snapshots_share_one_rate_window():
+    metrics = metrics_subsystem.initialize_metrics()
+    metrics['last_rates']['time_ns'] -= 2_000_000_000
+    metrics_subsystem.increment(metrics, 'rx_bytes', 4000)
+    barrier = threading.Barrier(8)
+    rates = []
+
+    def take():
+        barrier.wait()
+        rates.append(metrics_subsystem.snapshot(metrics)['rates_per_s'])
+
+    threads = [threading.Thread(target=take) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Solo la primera instantánea renueva la ventana; las demás reutilizan sus tasas
+    assert all(rate == rates[0] for rate in rates)
+    assert 1900 < rates[0]['rx_bytes'] <= 2000
+    assert metrics['last_rates']['rates'] == rates[0]
@@ -0,0 +1,129 @@
+import json
+import math
+import random
+
+import pytest
+
+import gps_subsystem
+import navigation_subsystem
+
+HOME = (40.4168, -3.7038)
+
+
+def offset(lat, lon, east, north):
+    """Punto a (east, north) metros de (lat, lon) sobre la esfera de Haversine."""
+    lat2 = lat + math.degrees(north / 6371000)
+    lon2 = lon + math.degrees(east / (6371000 * math.cos(math.radians(lat))))
+    return lat2, lon2
+
+
+def square(center, half_m):
+    lat, lon = center
+    return [offset(lat, lon, east, north)
+            for east, north in ((-half_m, -half_m), (half_m, -half_m), (half_m, half_m), (-half_m, half_m))]
+
+
+def navigation_at_home(zones=None, cell_m=None):
+    navigation = navigation_subsystem.initialize_navigation(zones, cell_m)
+    navigation_subsystem.update_navigation(navigation, *HOME, 0.0)
+    return navigation
+
+
+def status_at(navigation, east, north):
+    lat = HOME[0] + north / navigation['m_per_deg_lat']
+    lon = HOME[1] + east / navigation['m_per_deg_lon']
+    navigation_subsystem.update_navigation(navigation, lat, lon, 1.0)
+    return navigation['no_fly'], navigation['outside_keep_in']
+
+
+def test_local_distance_and_bearing_match_haversine():
+    rng = random.Random(7)
+    navigation = navigation_at_home()
+    for _ in range(500):
+        distance = rng.uniform(1.0, 20_000.0)
+        angle = rng.uniform(0.0, 2 * math.pi)
+        lat, lon = offset(*HOME, distance * math.sin(angle), distance * math.cos(angle))
+        navigation_subsystem.update_navigation(navigation, lat, lon, 1.0)
+        reference = gps_subsystem.haversine_distance(*HOME, lat, lon)
+        # WGS84 frente a la esfera de 6371 km: menos de un 0,5 % a cualquier distancia de vuelo
+        assert navigation['distance'] == pytest.approx(reference, rel=5e-3)
+        outbound = math.degrees(math.atan2(navigation['east'], navigation['north'])) % 360.0
+        assert (navigation['bearing_to_home'] - outbound) % 360.0 == pytest.approx(180.0, abs=1e-6)
+
+
+def test_polygon_holes_are_outside_the_zone(tmp_path):
+    north_center = offset(*HOME, 0.0, 2000.0)
+    outer = square(north_center, 500.0)
+    hole = square(north_center, 200.0)
+    park = square(HOME, 3000.0)
+    courtyard = square(HOME, 100.0)
+    collection = {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'name': 'cuartel', 'kind': 'no_fly'},
+         'geometry': {'type': 'Polygon', 'coordinates': [[[lon, lat] for lat, lon in ring + ring[:1]]
+                                                         for ring in (outer, hole)]}},
+        {'type': 'Feature', 'properties': {'name': 'parque', 'kind': 'keep_in'},
+         'geometry': {'type': 'Polygon', 'coordinates': [[[lon, lat] for lat, lon in ring]
+                                                         for ring in (park, courtyard)]}}
+    ]}
+    path = tmp_path / "zonas.geojson"
+    path.write_text(json.dumps(collection), encoding='utf-8')
+    navigation = navigation_at_home(navigation_subsystem.load_geofence(str(path)), cell_m=250.0)
+
+    assert status_at(navigation, 0.0, 2400.0) == (('cuartel',), False)  # anillo de la zona prohibida
+    assert status_at(navigation, 0.0, 2000.0) == ((), False)  # hueco: se puede volar
+    assert status_at(navigation, 350.0, 1650.0) == (('cuartel',), False)
+    assert status_at(navigation, 0.0, 2600.0) == ((), False)
+    assert status_at(navigation, 0.0, 0.0) == ((), True)  # hueco de la zona permitida
+    assert status_at(navigation, 500.0, 0.0) == ((), False)
+    assert status_at(navigation, 3500.0, 0.0) == ((), True)
+    assert navigation['geofence_breach']
+
+
+def brute_force(zones, east, north):
+    """Referencia sin índice: par-impar sobre todos los anillos proyectados de todas las zonas."""
+    no_fly, inside_keep_in, any_keep_in = [], False, False
+    for name, kind, rings in zones:
+        inside = False
+        for points in rings:
+            for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+                if (y1 > north) != (y2 > north) and east < x1 + (north - y1) * (x2 - x1) / (y2 - y1):
+                    inside = not inside
+        if kind == 'keep_in':
+            any_keep_in = True
+            inside_keep_in = inside_keep_in or inside
+        elif inside:
+            no_fly.append(name)
+    return sorted(no_fly), any_keep_in and not inside_keep_in
+
+
+def random_zone(rng, number):
+    """Polígono estrellado (no convexo) con hueco opcional alrededor de un centro aleatorio."""
+    center = offset(*HOME, rng.uniform(-15_000, 15_000), rng.uniform(-15_000, 15_000))
+    radius = rng.uniform(50.0, 3000.0)
+    angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(rng.randint(3, 12)))
+    outer = [offset(*center, radius * r * math.sin(a), radius * r * math.cos(a))
+             for a, r in ((a, rng.uniform(0.4, 1.0)) for a in angles)]
+    rings = [outer]
+    if rng.random() < 0.3:
+        rings.append(square(center, radius * 0.2))
+    kind = 'keep_in' if rng.random() < 0.05 else 'no_fly'
+    return {'name': f"zona{number}", 'kind': kind, 'rings': rings}
+
+
+@pytest.mark.parametrize('cell_m', [None, 100.0, 700.0, 5000.0])
+def test_grid_index_matches_brute_force(cell_m):
+    rng = random.Random(11)
+    zones = [random_zone(rng, number) for number in range(300)]
+    navigation = navigation_at_home(zones, cell_m)
+    fence = navigation['geofence']
+    projected = [(zone['name'], zone['kind'],
+                  [[navigation_subsystem.to_local(navigation, lat, lon) for lat, lon in ring] for ring in zone['rings']])
+                 for zone in zones]
+    hits = 0
+    for _ in range(2000):
+        east, north = rng.uniform(-18_000, 18_000), rng.uniform(-18_000, 18_000)
+        no_fly, outside_keep_in = navigation_subsystem.check_geofence(fence, east, north)
+        expected = brute_force(projected, east, north)
+        assert (sorted(no_fly), outside_keep_in) == expected
+        hits += bool(expected[0])
+    assert hits > 100
@@ -0,0 +1,73 @@
+import protocol_subsystem as protocol
+
+LINE = b'40.416805,-3.703800,600.3,12.26,11.60,1,0.74,-2.03,-0.07\n'
+
+
+def frame(seq):
+    return protocol.encode_telemetry(seq, 1000 + seq, 40.4168, -3.7038, 600.0, 12.5, 11.6, 1, 0.5, -0.5, 0.0, 0x1F)
+
+
+def corrupted(seq):
+    # Un salto de línea en mitad del payload: el CRC falla y el payload contiene '\n'
+    data = bytearray(frame(seq))
+    data[12] = 0x0A
+    return bytes(data)
+
+
+def kinds(results):
+    return [(item[0], item[2]) if item[0] == 'frame' else (item[0], item[1]) for item in results]
+
+
+def test_crc_failure_drops_the_frame_and_keeps_the_next():
+    decoder = protocol.initialize_decoder('binary')
+    results = protocol.feed_decoder(decoder, corrupted(1) + frame(2))
+    assert kinds(results) == [('frame', 2)]
+    assert decoder['crc_errors'] == 1
+    assert decoder['lost_frames'] == 0
+
+
+def test_resync_after_garbage_and_split_frames():
+    decoder = protocol.initialize_decoder('binary')
+    data = b'\x00\xa5\x13garbage' + frame(1) + frame(2)
+    results = []
+    for start in range(0, len(data), 7):
+        results += protocol.feed_decoder(decoder, data[start:start + 7])
+    assert kinds(results) == [('frame', 1), ('frame', 2)]
+    assert decoder['discarded_bytes'] >= len(b'\x00\xa5\x13garbage')
+
+
+def test_truncated_frame_resyncs_on_the_next_one():
+    decoder = protocol.initialize_decoder('auto')
+    results = protocol.feed_decoder(decoder, frame(1)[:-5] + frame(2) + LINE)
+    assert kinds(results) == [('frame', 2), ('line', LINE.strip())]
+    assert decoder['crc_errors'] == 1
+
+
+def test_mixed_stream_never_turns_a_corrupted_payload_into_a_line():
+    decoder = protocol.initialize_decoder('auto')
+    stream = LINE + frame(1) + LINE + corrupted(2) + b'OK\r\n' + frame(3) + LINE
+    results = protocol.feed_decoder(decoder, stream)
+    assert kinds(results) == [('line', LINE.strip()), ('frame', 1), ('line', LINE.strip()), ('line', b'OK'),
+                              ('frame', 3), ('line', LINE.strip())]
+    assert decoder['crc_errors'] == 1
+    assert decoder['lines'] == 4
+    assert decoder['binary_seen']
+
+
+def test_binary_garbage_between_newlines_is_not_a_line():
+    decoder = protocol.initialize_decoder('auto')
+    results = protocol.feed_decoder(decoder, b'\x01\x02\x5a\x10\xff\n' + LINE)
+    assert kinds(results) == [('line', LINE.strip())]
+    assert decoder['lines'] == 1
+
+
+def test_ascii_mode_decodes_plain_lines():
+    decoder = protocol.initialize_decoder('ascii')
+    results = protocol.feed_decoder(decoder, LINE + b'ATI\r\n')
+    assert kinds(results) == [('line', LINE.strip()), ('line', b'ATI')]
+
+
+def test_binary_mode_keeps_modem_replies_only():
+    decoder = protocol.initialize_decoder('binary')
+    results = protocol.feed_decoder(decoder, frame(1) + b'OK\r\n' + frame(2) + b'40.41,-3.70\n' + b'ERROR\r\n')
+    assert kinds(results) == [('frame', 1), ('line', b'OK'), ('frame', 2), ('line', b'ERROR')]
@@ -0,0 +1,28 @@
+import groundstation_subsystem
+import telemetry_subsystem
+from protocol_subsystem import VALID_BARO, VALID_BATTERY, VALID_GPS
+
+# Fijo GPS inválido (0, 0): barómetro y batería siguen siendo válidos
+NO_GPS = b'0.0,0.0,0.0,120.5,11.80,1,1.0,2.0,3.0\n'
+FULL = b'40.416800,-3.703800,600.0,120.5,11.80,1,1.0,2.0,3.0\n'
+
+
+def test_has_requires_every_group_requested():
+    sample = telemetry_subsystem.parse_line(NO_GPS)
+    assert sample.has(VALID_BARO)
+    assert sample.has(VALID_BARO | VALID_BATTERY)
+    assert not sample.has(VALID_GPS)
+    assert not sample.has(VALID_GPS | VALID_BARO)
+
+
+def test_views_and_flight_data_follow_the_validity_bits():
+    sample = telemetry_subsystem.parse_line(NO_GPS)
+    views = telemetry_subsystem.telemetry_views(sample)
+    assert not views['gps_data']['valid']
+    assert views['baro_data'] == {'baro_altitude': 120.5, 'valid': True}
+
+    station = groundstation_subsystem.GroundStation()
+    station.receive_bytes(NO_GPS)
+    assert station.flight_data['altitude'] != 120.5
+    station.receive_bytes(FULL)
+    assert station.flight_data['altitude'] == 120.5
@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+
+import pytest
+
+import protocol_subsystem
+import simulation_subsystem
+import transport_subsystem
+
+serial = pytest.importorskip("serial")
+termios = pytest.importorskip("termios")
+tty = pytest.importorskip("tty")
+
+LINE = simulation_subsystem.drone_telemetry(simulation_subsystem.initialize_drone_model(), 0.0)
+
+
+@pytest.fixture
+def pty_pair():
+    """Pseudo-terminal en modo crudo: (descriptor del extremo del dron, nombre del puerto)."""
+    opened = []
+
+    def open_pair():
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        opened.extend((master, slave))
+        return master, os.ttyname(slave)
+
+    yield open_pair
+    for fd in opened:
+        os.close(fd)
+
+
+class NoFilenoPort:
+    """Puerto sin descriptor (como en Windows): solo in_waiting, readinto y timeout."""
+
+    def __init__(self, port):
+        self.port = port
+
+    @property
+    def in_waiting(self):
+        return self.port.in_waiting
+
+    @property
+    def timeout(self):
+        return self.port.timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self.port.timeout = value
+
+    def readinto(self, b):
+        return self.port.readinto(b)
+
+    def close(self):
+        self.port.close()
+
+
+def read_until(port, marker, timeout=2.0):
+    """Lee del puerto hasta ver marker o agotar el tiempo."""
+    data = b''
+    deadline = time.monotonic() + timeout
+    while marker not in data and time.monotonic() < deadline:
+        data += port.read(port.in_waiting or 1)
+    return data
+
+
+def test_pty_link_handles_cmd_and_atf_in_one_write():
+    link = transport_subsystem.PtyDroneLink(simulation_subsystem.initialize_drone_model())
+    port = serial.Serial(link.port, 57600, timeout=0.05)
+    try:
+        port.write(b'CMD,500,500,500,0\nATF=868\n')
+        assert b'OK' in read_until(port, b'OK')
+        assert link.radio.ground_frequency == 868
+        assert link.radio.model['last_command'] == (500, 500, 500, 0)
+    finally:
+        port.close()
+
+
+def test_pty_link_waits_for_the_rest_of_a_split_atf():
+    link = transport_subsystem.PtyDroneLink(simulation_subsystem.initialize_drone_model())
+    port = serial.Serial(link.port, 57600, timeout=0.05)
+    try:
+        port.write(b'CMD,500,500,500,0\nAT')
+        port.flush()
+        time.sleep(0.1)
+        port.write(b'F=868\n')
+        assert b'OK' in read_until(port, b'OK')
+        assert link.radio.ground_frequency == 868
+    finally:
+        port.close()
+
+
+def test_reader_without_fileno_waits_only_the_read_timeout(pty_pair):
+    _, name = pty_pair()
+    port = serial.Serial(name, 57600, timeout=0.5)
+    try:
+        reader = transport_subsystem.initialize_reader(NoFilenoPort(port), timeout=0.1)
+        start = time.monotonic()
+        chunk, arrival_ns = transport_subsystem.read_chunk(reader, timeout=0.1)
+        assert len(chunk) == 0 and arrival_ns is None
+        assert time.monotonic() - start < 0.3
+    finally:
+        port.close()
+
+
+@pytest.mark.parametrize('wrap', [lambda port: port, NoFilenoPort], ids=['select', 'no_fileno'])
+def test_line_split_across_chunks_is_decoded_once(pty_pair, wrap):
+    master, name = pty_pair()
+    port = serial.Serial(name, 57600, timeout=0.5)
+    try:
+        reader = transport_subsystem.initialize_reader(wrap(port))
+        decoder = protocol_subsystem.initialize_decoder('auto')
+        half = len(LINE) // 2
+        os.write(master, LINE[:half])
+        chunk, _ = transport_subsystem.read_chunk(reader, timeout=1.0)
+        assert bytes(chunk) == LINE[:half]
+        assert protocol_subsystem.feed_decoder(decoder, chunk) == []
+        os.write(master, LINE[half:] + LINE[:3])
+        chunk, _ = transport_subsystem.read_chunk(reader, timeout=1.0)
+        messages = protocol_subsystem.feed_decoder(decoder, chunk)
+        assert [kind for kind, _ in messages] == ['line']
+        assert bytes(messages[0][1]).strip() == LINE.strip()
+    finally:
+        port.close()
+
+
+def test_discovery_picks_the_port_and_baud_with_telemetry(pty_pair):
+    silent = [pty_pair()[1] for _ in range(2)]
+    drone_master, drone_name = pty_pair()
+    stop = threading.Event()
+
+    def drone():
+        # A otros baudios el dron solo produce basura, como un enlace mal configurado
+        while not stop.is_set():
+            speed = termios.tcgetattr(drone_master)[4]
+            os.write(drone_master, LINE if speed == termios.B115200 else b'?\x7f?#\n')
+            stop.wait(0.05)
+
+    thread = threading.Thread(target=drone, daemon=True)
+    thread.start()
+    try:
+        ser = transport_subsystem.discover_serial(ports=[silent[0], drone_name, silent[1]],
+                                                  baudrates=(57600, 115200), probe_timeout=0.3)
+        try:
+            assert ser.port == drone_name
+            assert ser.baudrate == 115200
+        finally:
+            ser.close()
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_serial_spec_without_baud_opens_at_57600(pty_pair):
+    _, name = pty_pair()
+    port = transport_subsystem.open_transport(f'serial:{name}')
+    try:
+        assert port.port == name
+        assert port.baudrate == 57600
+    finally:
+        port.close()
+
+
+def test_reader_sets_the_timeout_of_a_recorded_port(pty_pair, tmp_path):
+    _, name = pty_pair()
+    port = serial.Serial(name, 57600, timeout=0.5)
+    recording = transport_subsystem.RecordingTransport(NoFilenoPort(port), str(tmp_path / "capture.bin"))
+    try:
+        transport_subsystem.initialize_reader(recording, timeout=0.1)
+        assert port.timeout == 0.1
+        assert recording.timeout == 0.1
+    finally:
+        recording.close()
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import groundstation_subsystem
+import transport_subsystem
+
+LINE = b'40.416805,-3.703800,600.3,12.26,11.60,1,0.74,-2.03,-0.07\n'
+
+
+def test_step_goes_through_the_uplink_coalescing():
+    transport = transport_subsystem.open_transport('sim', timeout=0)
+    station = groundstation_subsystem.GroundStation(transport=transport)
+    station.drivingaid_state['drivingaid_active'] = False
+    try:
+        for _ in range(200):
+            station.step(LINE)
+        # Mismo comando en cada paso: sale el primero y, como mucho, algún latido
+        sent = station.uplink['sent']
+        assert 1 <= sent <= 3
+        assert station.uplink['coalesced'] == 200 - sent
+        assert len([data for _, data in transport.radio.uplink_log if data.startswith(b'CMD')]) == sent
+    finally:
+        station.stop()
+
+
+class SlowTransport:
+    """Transporte que escribe por partes, como un puerto que acepta escrituras parciales."""
+
+    def __init__(self):
+        self.events = []
+
+    def write(self, data):
+        self.events.append(('begin', bytes(data)))
+        time.sleep(0.0005)
+        self.events.append(('end', bytes(data)))
+        return len(data)
+
+    def close(self):
+        pass
+
+
+def test_commands_and_frequency_hops_never_interleave():
+    transport = SlowTransport()
+    station = groundstation_subsystem.GroundStation(transport=transport)
+    commands = dict(groundstation_subsystem.NEUTRAL_COMMANDS)
+
+    def send_commands():
+        for _ in range(50):
+            station.send_command(commands, None, time.monotonic_ns())
+
+    def hop():
+        for _ in range(50):
+            station.set_frequency(918)
+
+    threads = [threading.Thread(target=send_commands), threading.Thread(target=hop)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    kinds = [kind for kind, _ in transport.events]
+    assert kinds == ['begin', 'end'] * 100
+
+
+def test_heartbeats_do_not_record_latency_again():
+    transport = SlowTransport()
+    station = groundstation_subsystem.GroundStation(transport=transport)
+    commands = dict(groundstation_subsystem.NEUTRAL_COMMANDS)
+    arrival_ns = time.monotonic_ns()
+    decision_ns = time.monotonic_ns()
+    for _ in range(3):
+        station.send_command(commands, arrival_ns, decision_ns, reason='heartbeat')
+    histograms = station.metrics['histograms']
+    assert station.metrics['counters']['commands_sent'] == 3
+    assert histograms['decision_to_cmd_write']['count'] == 1
+    assert histograms['radio_to_cmd']['count'] == 1
+    station.send_command(commands, arrival_ns, time.monotonic_ns(), reason='change')
+    assert histograms['decision_to_cmd_write']['count'] == 2
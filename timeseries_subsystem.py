@@ -0,0 +1,87 @@
+import numpy as np
+
+# Columnas del almacén; los datos no válidos se guardan como NaN
+COLUMNS = ('timestamp', 'latitude', 'longitude', 'gps_altitude', 'baro_altitude', 'voltage',
+           'pitch', 'roll', 'yaw')
+COLUMN_INDEX = {name: i for i, name in enumerate(COLUMNS)}
+
+
+def initialize_timeseries(capacity=200_000):
+    """
+    Inicializa un búfer circular preasignado (por defecto ~5.5 h a 10 Hz).
+    Cada fila se escribe dos veces (posición p y p + capacity) para que cualquier ventana de
+    las últimas n filas sea un segmento contiguo y se pueda devolver como vista sin copias.
+    """
+    return {
+        'capacity': capacity,
+        'data': np.full((len(COLUMNS), 2 * capacity), np.nan),
+        'count': 0
+    }
+
+
+def append_row(state, row):
+    """Añade una fila (tupla en el orden de COLUMNS) en O(1)."""
+    capacity = state['capacity']
+    pos = state['count'] % capacity
+    data = state['data']
+    data[:, pos] = row
+    data[:, pos + capacity] = row
+    state['count'] += 1
+
+
+def size(state):
+    """Número de filas disponibles (como máximo la capacidad)."""
+    return min(state['count'], state['capacity'])
+
+
+def latest_window(state, n=None):
+    """Vista sin copia (columnas x n) de las últimas n filas, en orden cronológico."""
+    available = size(state)
+    n = available if n is None else min(n, available)
+    if n == 0:
+        return state['data'][:, 0:0]
+    end = (state['count'] - 1) % state['capacity'] + state['capacity'] + 1
+    return state['data'][:, end - n:end]
+
+
+def column(window, name):
+    """Vista de una columna de una ventana."""
+    return window[COLUMN_INDEX[name]]
+
+
+def minmax_indices(values, buckets):
+    """
+    Índices que conservan el mínimo y el máximo de cada cubeta (2 * buckets puntos como máximo).
+    Ignora los NaN; las cubetas sin datos no aportan puntos.
+    """
+    n = len(values)
+    if n <= 2 * buckets:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    bucket_size = int(np.max(np.diff(edges)))
+    # Rellenar cada cubeta hasta el mismo tamaño para reducir de forma vectorizada
+    offsets = edges[:-1, None] + np.arange(bucket_size)[None, :]
+    in_range = offsets < edges[1:, None]
+    offsets = np.where(in_range, offsets, edges[1:, None] - 1)
+    block = values[offsets]
+    valid = in_range & ~np.isnan(block)
+    has_data = valid.any(axis=1)
+    low = np.where(valid, block, np.inf).argmin(axis=1)
+    high = np.where(valid, block, -np.inf).argmax(axis=1)
+    rows = np.nonzero(has_data)[0]
+    picked = np.concatenate([offsets[rows, low[rows]], offsets[rows, high[rows]]])
+    return np.unique(picked)
+
+
+def downsample(window, names, max_points=1000):
+    """
+    Reduce una ventana a como máximo max_points columnas comunes a todas las series indicadas,
+    conservando los extremos de cada una (cubetas min/max). El coste de dibujo queda fijo
+    aunque el vuelo dure horas.
+    """
+    n = window.shape[1]
+    if n <= max_points:
+        return window
+    buckets = max(1, max_points // (2 * len(names)))
+    picked = np.unique(np.concatenate([minmax_indices(column(window, name), buckets) for name in names]))
+    return window[:, picked]
@@ -0,0 +1,540 @@
+import collections
+import os
+import select
+import struct
+import time
+from threading import Condition, Event, Lock, Thread
+
+import protocol_subsystem
+import simulation_subsystem
+import telemetry_subsystem
+
+# Formato de captura: cabecera mágica y registros (segundos desde el inicio, longitud, bytes)
+CAPTURE_MAGIC = b'IASCAP1\n'
+CAPTURE_RECORD = struct.Struct('<dI')
+
+# Tamaño máximo del búfer de recepción de los transportes simulados
+MAX_BUFFERED_BYTES = 64 * 1024
+# Periodo de los informes de RSSI de la radio simulada (s)
+RSSI_REPORT_S = 1.0
+
+# Búfer reutilizable del lector por bloques
+READ_CHUNK_BYTES = 4096
+# Autodescubrimiento: baudios probados en cada puerto (primero el de fábrica del RFD900x) y
+# tiempo de escucha por baudio; a 10 Hz llegan varias líneas de telemetría en ese tiempo
+PROBE_BAUDRATES = (57600, 115200, 38400, 19200, 9600)
+PROBE_TIMEOUT_S = 0.6
+
+
+def open_transport(spec, timeout=0.5):
+    """
+    Abre un transporte con la interfaz de serial.Serial a partir de una especificación:
+      serial:COM4[@57600]     puerto serial real (57600 baudios por defecto)
+      serial[:auto[@auto]]    autodescubrimiento del puerto y/o los baudios (p. ej. serial:auto@57600)
+      sim[:binary]            dron sintético en memoria (bucle local)
+      pty[:binary]            dron sintético detrás de un pseudo-terminal (solo POSIX)
+      replay:archivo[@4x|@max] reproducción de una captura a 1x, Nx o máxima velocidad
+    """
+    kind, _, arg = spec.partition(':')
+    if kind == 'serial':
+        import serial
+        port, _, baud = arg.partition('@')
+        if port in ('', 'auto') or baud == 'auto':
+            return discover_serial(ports=None if port in ('', 'auto') else [port],
+                                   baudrates=PROBE_BAUDRATES if baud in ('', 'auto') else (int(baud),),
+                                   timeout=timeout)
+        return serial.Serial(port, int(baud or PROBE_BAUDRATES[0]), timeout=timeout)
+    if kind == 'sim':
+        model = simulation_subsystem.initialize_drone_model(protocol=arg or 'ascii')
+        return LoopbackDroneTransport(model, timeout=timeout)
+    if kind == 'pty':
+        import serial
+        model = simulation_subsystem.initialize_drone_model(protocol=arg or 'ascii')
+        link = PtyDroneLink(model)
+        return serial.Serial(link.port, 57600, timeout=timeout)
+    if kind == 'replay':
+        path, _, speed = arg.partition('@')
+        if speed in ('', '1x'):
+            speed_factor = 1.0
+        elif speed == 'max':
+            speed_factor = None
+        else:
+            speed_factor = float(speed.rstrip('x'))
+        return ReplayTransport(path, speed=speed_factor, timeout=timeout)
+    raise ValueError(f"Transporte desconocido: {spec}")
+
+
+def initialize_reader(transport, size=READ_CHUNK_BYTES, timeout=0.1):
+    """
+    Lector por bloques de un transporte: un bytearray preasignado que se reutiliza en cada
+    lectura y, si el transporte tiene descriptor (puerto POSIX o pty), espera con select().
+    Sin descriptor ni wait_readable (p. ej. Windows) la espera es una lectura bloqueante del
+    puerto, así que su timeout se ajusta aquí a timeout (la espera de read_chunk).
+    """
+    try:
+        fd = transport.fileno()
+    except (AttributeError, OSError, ValueError):
+        fd = None
+    if fd is None and not hasattr(transport, 'wait_readable'):
+        transport.timeout = timeout
+    buffer = bytearray(size)
+    return {
+        'transport': transport,
+        'buffer': buffer,
+        'view': memoryview(buffer),
+        'fd': fd,
+        'reads': 0,
+        'bytes': 0
+    }
+
+
+def read_chunk(reader, timeout=0.1):
+    """
+    Vacía de una vez los bytes pendientes en el búfer del lector, esperando como máximo timeout
+    segundos si no hay ninguno. Devuelve (vista de los bytes leídos, instante de llegada en ns);
+    la vista es válida hasta la siguiente lectura.
+    """
+    transport = reader['transport']
+    view = reader['view']
+    size = len(view)
+    waiting = transport.in_waiting
+    if not waiting and timeout:
+        if reader['fd'] is not None:
+            readable, _, _ = select.select([reader['fd']], [], [], timeout)
+            # Listo sin bytes en cola: read() informará del cierre del puerto
+            waiting = (transport.in_waiting or 1) if readable else 0
+        elif hasattr(transport, 'wait_readable'):
+            waiting = transport.wait_readable(timeout)
+        else:
+            # Sin descriptor (p. ej. Windows): lectura bloqueante de un byte con el timeout del
+            # puerto, fijado en initialize_reader
+            count = transport.readinto(view[:1])
+            if count:
+                count += transport.readinto(view[1:1 + min(transport.in_waiting, size - 1)])
+            return _chunk_read(reader, count)
+    if not waiting:
+        return view[:0], None
+    return _chunk_read(reader, transport.readinto(view[:min(waiting, size)]))
+
+
+def _chunk_read(reader, count):
+    """Anota una lectura del lector y devuelve su vista con el instante de llegada."""
+    if not count:
+        return reader['view'][:0], None
+    reader['reads'] += 1
+    reader['bytes'] += count
+    return reader['view'][:count], time.monotonic_ns()
+
+
+def candidate_ports():
+    """Puertos serie del sistema; los adaptadores USB (radios RFD900x, FTDI) primero."""
+    from serial.tools import list_ports
+    ports = sorted(list_ports.comports(), key=lambda port: port.vid is None)
+    return [port.device for port in ports]
+
+
+def discover_serial(ports=None, baudrates=PROBE_BAUDRATES, probe_timeout=PROBE_TIMEOUT_S, timeout=0.5):
+    """
+    Busca el enlace del dron probando todos los puertos a la vez (un hilo por puerto; en cada
+    uno, los baudios en orden) y devuelve abierto el primero que entrega telemetría válida.
+    Con el enlace en los baudios de fábrica la conexión tarda un solo probe_timeout.
+    """
+    import serial
+    ports = candidate_ports() if ports is None else list(ports)
+    if not ports:
+        raise serial.SerialException("No se encontraron puertos serie")
+    found = []
+    found_lock = Lock()
+    done = Event()
+
+    def probe(port):
+        try:
+            ser = serial.Serial(port, baudrates[0], timeout=0)
+        except (serial.SerialException, OSError, ValueError):
+            return
+        try:
+            for baud in baudrates:
+                if done.is_set():
+                    break
+                ser.baudrate = baud
+                ser.reset_input_buffer()
+                if _probe_link(ser, probe_timeout, done):
+                    with found_lock:
+                        if not done.is_set():
+                            done.set()
+                            ser.timeout = timeout
+                            found.append(ser)
+                            return
+        except (serial.SerialException, OSError):
+            pass
+        ser.close()
+
+    start = time.monotonic()
+    threads = [Thread(target=probe, args=(port,), name=f"probe {port}", daemon=True) for port in ports]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if not found:
+        raise serial.SerialException(f"Sin telemetría en {', '.join(ports)} a {baudrates} baudios")
+    ser = found[0]
+    print(f"Enlace encontrado en {ser.port} a {ser.baudrate} baudios ({time.monotonic() - start:.2f} s, "
+          f"{len(ports)} puertos probados)")
+    return ser
+
+
+def _probe_link(ser, probe_timeout, done):
+    """Escucha un puerto hasta probe_timeout: True al recibir una trama o línea de telemetría válida."""
+    decoder = protocol_subsystem.initialize_decoder('auto')
+    deadline = time.monotonic() + probe_timeout
+    while time.monotonic() < deadline and not done.is_set():
+        data = ser.read(ser.in_waiting or 1)
+        if not data:
+            done.wait(0.01)
+            continue
+        for message in protocol_subsystem.feed_decoder(decoder, data):
+            if message[0] == 'frame' and message[1] == protocol_subsystem.FRAME_TELEMETRY:
+                return True
+            if message[0] == 'line' and telemetry_subsystem.parse_line(message[1]).valid:
+                return True
+    return False
+
+
+def write_capture_record(capture_file, elapsed, data):
+    """Escribe un bloque de bytes recibido con su tiempo relativo al inicio de la captura."""
+    capture_file.write(CAPTURE_RECORD.pack(elapsed, len(data)))
+    capture_file.write(data)
+
+
+def read_capture(path):
+    """Itera los registros (tiempo relativo, bytes) de un archivo de captura."""
+    with open(path, 'rb') as capture_file:
+        if capture_file.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError(f"{path} no es una captura válida")
+        while True:
+            header = capture_file.read(CAPTURE_RECORD.size)
+            if len(header) < CAPTURE_RECORD.size:
+                return
+            elapsed, length = CAPTURE_RECORD.unpack(header)
+            data = capture_file.read(length)
+            if len(data) < length:
+                return
+            yield elapsed, data
+
+
+class BufferedTransport:
+    """Base de los transportes simulados con el subconjunto de serial.Serial que usa la estación."""
+
+    def __init__(self, port, timeout=0.5):
+        self.port = port
+        self.baudrate = 57600
+        self.timeout = timeout
+        self.is_open = True
+        self._buffer = bytearray()
+        self._condition = Condition()
+        self._data_callback = None
+
+    def set_data_callback(self, callback):
+        """Registra una función llamada (desde el hilo productor) cada vez que llegan bytes."""
+        self._data_callback = callback
+
+    @property
+    def in_waiting(self):
+        return len(self._buffer)
+
+    def _feed(self, data, block=False):
+        """Añade bytes recibidos; con block=True espera mientras el búfer esté lleno."""
+        with self._condition:
+            while block and self.is_open and len(self._buffer) >= MAX_BUFFERED_BYTES:
+                self._condition.wait(0.1)
+            if len(self._buffer) + len(data) > MAX_BUFFERED_BYTES:
+                # Igual que un UART desbordado: se pierden los bytes más antiguos
+                del self._buffer[:len(self._buffer) + len(data) - MAX_BUFFERED_BYTES]
+            self._buffer += data
+            self._condition.notify_all()
+        if self._data_callback is not None:
+            self._data_callback()
+
+    def read(self, size=1):
+        """Lee hasta size bytes esperando como máximo timeout segundos."""
+        with self._condition:
+            if len(self._buffer) < size and self.is_open:
+                deadline = None if self.timeout is None else time.monotonic() + self.timeout
+                while len(self._buffer) < size and self.is_open:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            self._condition.notify_all()
+            return data
+
+    def readinto(self, b):
+        """Como read(len(b)), pero copia los bytes en b sin crear objetos nuevos; devuelve cuántos."""
+        size = len(b)
+        with self._condition:
+            if len(self._buffer) < size and self.is_open:
+                deadline = None if self.timeout is None else time.monotonic() + self.timeout
+                while len(self._buffer) < size and self.is_open:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+            count = min(size, len(self._buffer))
+            with memoryview(self._buffer) as view:
+                b[:count] = view[:count]
+            del self._buffer[:count]
+            self._condition.notify_all()
+            return count
+
+    def wait_readable(self, timeout):
+        """Espera hasta timeout segundos a que haya bytes; devuelve cuántos hay pendientes."""
+        with self._condition:
+            if not self._buffer and self.is_open:
+                self._condition.wait(timeout)
+            return len(self._buffer)
+
+    def readline(self):
+        """Lee hasta un salto de línea (incluido) o hasta agotar el timeout."""
+        with self._condition:
+            deadline = None if self.timeout is None else time.monotonic() + self.timeout
+            while b'\n' not in self._buffer and self.is_open:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            end = self._buffer.find(b'\n') + 1 or len(self._buffer)
+            data = bytes(self._buffer[:end])
+            del self._buffer[:end]
+            self._condition.notify_all()
+            return data
+
+    def write(self, data):
+        return len(data)
+
+    def reset_input_buffer(self):
+        with self._condition:
+            self._buffer.clear()
+            self._condition.notify_all()
+
+    def close(self):
+        with self._condition:
+            self.is_open = False
+            self._condition.notify_all()
+
+
+class DroneRadio:
+    """Radio de tierra simulada: atiende comandos ATF= y reenvía el resto al dron sintético."""
+
+    def __init__(self, model, echo=False, history=1000):
+        self.model = model
+        self.ground_frequency = model['frequency']
+        self.echo = echo
+        self.uplink_log = collections.deque(maxlen=history)
+        self.frequency_changes = 0
+        self.next_rssi_report = 0.0
+
+    def handle_write(self, data):
+        """Procesa bytes escritos por la estación y devuelve la respuesta del módem (o b'')."""
+        data = bytes(data)
+        if data.startswith(b'ATF='):
+            try:
+                self.ground_frequency = int(data[4:].strip())
+                self.frequency_changes += 1
+                response = b'OK\r\n'
+            except ValueError:
+                response = b'ERROR\r\n'
+            self._log(data)
+            return response
+        self._log(data)
+        if simulation_subsystem.link_up(self.model, self.ground_frequency):
+            simulation_subsystem.drone_receive(self.model, data)
+        return b''
+
+    def telemetry(self, t):
+        """Telemetría del instante t si hay enlace (con un informe de RSSI cada segundo); b'' si no se escucha."""
+        if not simulation_subsystem.link_up(self.model, self.ground_frequency):
+            return b''
+        data = simulation_subsystem.drone_telemetry(self.model, t)
+        if t >= self.next_rssi_report:
+            self.next_rssi_report = t + RSSI_REPORT_S
+            data += simulation_subsystem.rssi_report(self.model)
+        return data
+
+    def _log(self, data):
+        self.uplink_log.append((time.monotonic(), bytes(data)))
+        if self.echo:
+            print(f"TX> {bytes(data).strip()!r}")
+
+
+class LoopbackDroneTransport(BufferedTransport):
+    """Transporte en memoria conectado a un dron sintético que emite telemetría a su frecuencia."""
+
+    def __init__(self, model, timeout=0.5, echo=False):
+        super().__init__('sim', timeout)
+        self.radio = DroneRadio(model, echo=echo)
+        self._start = time.monotonic()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, data):
+        response = self.radio.handle_write(data)
+        if response:
+            self._feed(response)
+        return len(data)
+
+    def _run(self):
+        period = 1.0 / self.radio.model['rate_hz']
+        next_time = time.monotonic()
+        while self.is_open:
+            data = self.radio.telemetry(time.monotonic() - self._start)
+            if data:
+                self._feed(data)
+            next_time += period
+            time.sleep(max(0.0, next_time - time.monotonic()))
+
+
+class PtyDroneLink:
+    """Dron sintético detrás de un pseudo-terminal: la estación abre self.port como un puerto serial real."""
+
+    def __init__(self, model, echo=False):
+        import tty
+        self.radio = DroneRadio(model, echo=echo)
+        self._master, slave = os.openpty()
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+        self._slave = slave
+        self._start = time.monotonic()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        period = 1.0 / self.radio.model['rate_hz']
+        next_time = time.monotonic()
+        pending = bytearray()
+        try:
+            while True:
+                timeout = max(0.0, next_time - time.monotonic())
+                readable, _, _ = select.select([self._master], [], [], timeout)
+                if readable:
+                    pending += os.read(self._master, 4096)
+                    # Cada línea completa se atiende por separado (un CMD y un ATF= pueden llegar
+                    # en la misma lectura); una línea incompleta que pueda ser un ATF= espera a la
+                    # siguiente lectura y el resto va al decodificador del dron, que acumula tramas
+                    while pending:
+                        end = pending.find(b'\n') + 1
+                        if end == 0:
+                            partial = bytes(pending)
+                            if partial.startswith(b'ATF=') or b'ATF='.startswith(partial):
+                                break
+                            end = len(pending)
+                        response = self.radio.handle_write(bytes(pending[:end]))
+                        del pending[:end]
+                        if response:
+                            os.write(self._master, response)
+                if time.monotonic() >= next_time:
+                    data = self.radio.telemetry(time.monotonic() - self._start)
+                    if data:
+                        os.write(self._master, data)
+                    next_time += period
+                    if self._slave is not None and time.monotonic() - self._start > 1.0:
+                        # La estación ya tuvo tiempo de abrir el puerto: al cerrarlo, read() dará EIO
+                        os.close(self._slave)
+                        self._slave = None
+        except OSError:
+            pass
+        finally:
+            os.close(self._master)
+
+
+class ReplayTransport(BufferedTransport):
+    """Reproduce una captura de bytes crudos respetando los tiempos entre llegadas (escalados)."""
+
+    def __init__(self, path, speed=1.0, timeout=0.5, echo=False, history=1000):
+        super().__init__(f'replay:{path}', timeout)
+        self.path = path
+        self.speed = speed
+        self.echo = echo
+        self.uplink_log = collections.deque(maxlen=history)
+        self.frequency = None
+        self.finished = False
+        self.replayed_bytes = 0
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, data):
+        """Acepta CMD y ATF= como lo haría la radio; ATF= se responde con OK."""
+        data = bytes(data)
+        self.uplink_log.append((time.monotonic(), bytes(data)))
+        if self.echo:
+            print(f"TX> {bytes(data).strip()!r}")
+        if data.startswith(b'ATF='):
+            try:
+                self.frequency = int(data[4:].strip())
+                self._feed(b'OK\r\n')
+            except ValueError:
+                self._feed(b'ERROR\r\n')
+        return len(data)
+
+    def _run(self):
+        start = time.monotonic()
+        try:
+            for elapsed, data in read_capture(self.path):
+                if not self.is_open:
+                    break
+                if self.speed:
+                    delay = start + elapsed / self.speed - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                self._feed(data, block=self.speed is None)
+                self.replayed_bytes += len(data)
+        except (OSError, ValueError) as e:
+            print(f"Error al reproducir captura: {e}")
+        self.finished = True
+        print(f"Reproducción de {self.path} terminada ({self.replayed_bytes} bytes)")
+
+
+class RecordingTransport:
+    """Envuelve otro transporte y guarda cada bloque recibido en un archivo de captura."""
+
+    def __init__(self, inner, path):
+        self.inner = inner
+        self._file = open(path, 'wb')
+        self._file.write(CAPTURE_MAGIC)
+        self._start = time.monotonic()
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    @property
+    def timeout(self):
+        return self.inner.timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        # El lector sin descriptor ajusta el timeout del puerto, no el de la envoltura
+        self.inner.timeout = value
+
+    def _record(self, data):
+        if data:
+            write_capture_record(self._file, time.monotonic() - self._start, data)
+        return data
+
+    def read(self, size=1):
+        return self._record(self.inner.read(size))
+
+    def readline(self):
+        return self._record(self.inner.readline())
+
+    def readinto(self, b):
+        count = self.inner.readinto(b)
+        self._record(bytes(b[:count]))
+        return count
+
+    def write(self, data):
+        return self.inner.write(data)
+
+    def close(self):
+        self.inner.close()
+        self._file.close()
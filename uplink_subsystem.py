@@ -0,0 +1,116 @@
+"""
+Enlace de subida de comandos CMD: coalescencia, latido y límite de caudal.
+
+El control decide a 50 Hz, pero un comando solo se envía si cambió respecto al último enviado
+o si pasó heartbeat_s desde el último envío (latido para que el dron no active su failsafe).
+Un cubo de testigos en bytes limita los CMD a una fracción del caudal del puerto, de modo que la
+subida no llena el búfer de la radio (lo que retrasaría todos los comandos siguientes). Las
+tramas binarias se componen en un búfer preasignado y cada comando sale en una sola escritura.
+"""
+import protocol_subsystem
+
+# Fracción del caudal del puerto serie (baudios / 10 bytes/s, 8N1) reservada a los CMD
+UPLINK_BUDGET_FRACTION = 0.25
+# Sin cambios, se repite el último comando cada HEARTBEAT_S segundos
+HEARTBEAT_S = 0.2
+# Línea CMD ASCII más larga posible
+MAX_ASCII_COMMAND_BYTES = len(b'CMD,1000,1000,1000,1000\n')
+
+
+def initialize_uplink(baudrate=57600, budget_fraction=UPLINK_BUDGET_FRACTION, heartbeat_s=HEARTBEAT_S):
+    """Inicializa el estado de la subida: búfer de trama, último comando enviado y cubo de testigos."""
+    budget_bps = baudrate / 10 * budget_fraction
+    return {
+        'buffer': bytearray(protocol_subsystem.COMMAND_FRAME_SIZE),
+        'budget_bps': budget_bps,
+        # Ráfaga máxima: dos comandos ASCII largos
+        'burst_bytes': 2 * MAX_ASCII_COMMAND_BYTES,
+        'tokens': 2 * MAX_ASCII_COMMAND_BYTES,
+        'refill_ns': None,
+        'heartbeat_ns': int(heartbeat_s * 1e9),
+        'last_commands': None,
+        'last_sent_ns': None,
+        'last_frame_bytes': protocol_subsystem.COMMAND_FRAME_SIZE,
+        'sent': 0,
+        'changes': 0,
+        'heartbeats': 0,
+        'coalesced': 0,
+        'rate_limited': 0,
+        'bytes': 0
+    }
+
+
+def encode_command(state, commands, binary, seq, timestamp_ms):
+    """Trama CMD lista para una sola escritura: vista del búfer preasignado (binario) o línea ASCII."""
+    if binary:
+        size = protocol_subsystem.pack_command_into(state['buffer'], seq, timestamp_ms, commands)
+        return memoryview(state['buffer'])[:size]
+    return protocol_subsystem.encode_command_ascii(commands)
+
+
+def send_reason(state, commands, now_ns):
+    """
+    Decide si hay que enviar commands ahora: 'change' si difiere del último enviado, 'heartbeat'
+    si venció el latido, None si se omite (igual al anterior o sin caudal disponible).
+    """
+    _refill(state, now_ns)
+    if commands != state['last_commands']:
+        if state['tokens'] < state['last_frame_bytes']:
+            state['rate_limited'] += 1
+            return None
+        return 'change'
+    if state['last_sent_ns'] is None or now_ns - state['last_sent_ns'] >= state['heartbeat_ns']:
+        return 'heartbeat'
+    state['coalesced'] += 1
+    return None
+
+
+def wait_time(state, pending, now_ns):
+    """Segundos hasta que pending (comando aún no enviado o None) pueda salir o venza el latido."""
+    if state['last_sent_ns'] is None:
+        return 0.0
+    wait_ns = state['last_sent_ns'] + state['heartbeat_ns'] - now_ns
+    if pending is not None and pending != state['last_commands']:
+        _refill(state, now_ns)
+        missing = state['last_frame_bytes'] - state['tokens']
+        wait_ns = min(wait_ns, int(missing / state['budget_bps'] * 1e9) if missing > 0 else 0)
+    return max(0.0, wait_ns / 1e9)
+
+
+def record_sent(state, commands, size, now_ns, reason=None):
+    """
+    Anota un comando enviado: consume testigos y actualiza el último comando y los contadores.
+    El latido sale aunque el cubo esté vacío; el saldo negativo retrasa el siguiente cambio.
+    """
+    _refill(state, now_ns)
+    state['tokens'] -= size
+    state['last_frame_bytes'] = size
+    state['last_commands'] = dict(commands)
+    state['last_sent_ns'] = now_ns
+    state['sent'] += 1
+    state['bytes'] += size
+    if reason == 'change':
+        state['changes'] += 1
+    elif reason == 'heartbeat':
+        state['heartbeats'] += 1
+
+
+def uplink_stats(state):
+    """Contadores de la subida para las métricas."""
+    return {
+        'sent': state['sent'],
+        'changes': state['changes'],
+        'heartbeats': state['heartbeats'],
+        'coalesced': state['coalesced'],
+        'rate_limited': state['rate_limited'],
+        'bytes': state['bytes'],
+        'budget_bytes_per_s': state['budget_bps']
+    }
+
+
+def _refill(state, now_ns):
+    """Repone testigos según el tiempo transcurrido, hasta la ráfaga máxima."""
+    if state['refill_ns'] is not None:
+        state['tokens'] = min(state['burst_bytes'],
+                              state['tokens'] + (now_ns - state['refill_ns']) * state['budget_bps'] / 1e9)
+    state['refill_ns'] = now_ns
@@ -10,10 +10,25 @@ from PIL import Image, ImageTk, UnidentifiedImageError  # Añadido UnidentifiedI
 import numpy as np
 import os
 import sys
+import threading
+import time
 
 # Diccionario para controlar mensajes de error (solo se imprimen una vez)
 error_messages = {'frame': False, 'image': False}
 
+# Imagen de "sin señal" ya decodificada y redimensionada, por tamaño (width, height)
+default_images = {}
+
+# Capas de superposición pre-renderizadas, por tamaño de fotograma (width, height)
+overlay_layers = {}
+
+# Etiquetas de las líneas de la superposición; cada línea se redibuja solo si cambia su valor
+OVERLAY_LABELS = ("Latitud: ", "Longitud: ", "Altitud GPS: ", "Altitud Baro: ", "Voltaje: ", "LEDs IR: ",
+                  "Altura: ", "Distancia: ", "Batería: ", "Velocidad: ")
+OVERLAY_FONT = cv2.FONT_HERSHEY_SIMPLEX if CV2_AVAILABLE else None
+OVERLAY_LINE_HEIGHT = 35
+OVERLAY_TEXT_WIDTH = 420
+
 def initialize_video_stream(device_index=0):
     """Inicializa la captura de video desde una capturadora HDMI-USB en 720p."""
     global error_messages
@@ -29,6 +44,8 @@ def initialize_video_stream(device_index=0):
             raise Exception("No se pudo abrir el dispositivo de video")
         cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+        # Búfer mínimo en el driver: el hilo de captura ya descarta los fotogramas atrasados
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
         print("Capturadora inicializada correctamente")
         return cap
     except Exception as e:
@@ -38,99 +55,257 @@ def initialize_video_stream(device_index=0):
             error_messages['frame'] = True
         return None
 
-def update_video_frame(cap, label, flight_data, telemetry_data, signal_strength):
+def measure_capture_fps(cap, frames=15):
     """
-    Actualiza el fotograma de video con datos superpuestos en 720p.
-    Usa no_signal_image.jpg si no hay video; no muestra nada si la imagen no está disponible.
+    Mide los fotogramas por segundo que entrega realmente la capturadora leyendo unos cuantos
+    (el primero no cuenta: arranca el flujo). Devuelve None si no se pudo leer.
+    """
+    if read_frame(cap) is None:
+        return None
+    start = time.monotonic()
+    for _ in range(frames):
+        if read_frame(cap) is None:
+            return None
+    elapsed = time.monotonic() - start
+    return frames / elapsed if elapsed > 0 else None
+
+def read_frame(cap):
+    """Lee un fotograma BGR de la capturadora (bloquea hasta que llega) o devuelve None si falla."""
+    if not CV2_AVAILABLE or cap is None or not cap.isOpened():
+        return None
+    ret, frame = cap.read()
+    return frame if ret else None
+
+def initialize_display(root, label, width=1280, height=720, rgba=None):
+    """
+    Inicializa la ruta de visualización: búferes preasignados para redimensionar y convertir,
+    una imagen PIL que comparte memoria con el búfer RGBA y un único PhotoImage reutilizado.
+    rgba permite componer sobre un búfer externo (por ejemplo, memoria compartida).
+    """
+    if rgba is None:
+        rgba = np.empty((height, width, 4), dtype=np.uint8)
+    rgba[:, :, 3] = 255
+    return {
+        'root': root,
+        'label': label,
+        'width': width,
+        'height': height,
+        'resized': np.empty((height, width, 3), dtype=np.uint8),
+        'rgba': rgba,
+        'image': Image.frombuffer('RGBA', (width, height), rgba, 'raw', 'RGBA', 0, 1),
+        'photo': None,
+        # Despejado mientras hay un fotograma pendiente de pasar a Tk (el búfer está en uso)
+        'idle': threading.Event(),
+        'presented': 0
+    }
+
+def update_video_frame(cap, display, flight_data, telemetry_data, signal_strength):
+    """Lee un fotograma de la capturadora y lo muestra con los datos superpuestos."""
+    return show_frame(display, read_frame(cap), flight_data, telemetry_data, signal_strength)
+
+def show_frame(display, frame, flight_data, telemetry_data, signal_strength, timeout=0.1):
+    """
+    Compone un fotograma BGR con datos superpuestos y lo entrega a Tk en el hilo principal
+    con root.after. Espera como máximo timeout a que Tk haya tomado el fotograma anterior.
+    """
+    if display['presented'] and not display['idle'].wait(timeout):
+        return False
+    if not compose_frame(display, frame, flight_data, telemetry_data, signal_strength):
+        return False
+    display['idle'].clear()
+    display['presented'] += 1
+    display['root'].after(0, present_frame, display)
+    return True
+
+def compose_frame(display, frame, flight_data, telemetry_data, signal_strength):
+    """
+    Compone el fotograma en el búfer RGBA de la pantalla (desde cualquier hilo).
+    Usa no_signal_image.jpg si frame es None; devuelve False si no hay ninguna imagen disponible.
     """
     global error_messages
     try:
-        width, height = 1280, 720
-        frame_rgb = None
-
-        # Intentar leer video
-        if CV2_AVAILABLE and cap is not None and cap.isOpened():
-            ret, frame = cap.read()
-            if ret:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                frame_rgb = cv2.resize(frame_rgb, (width, height))
-                print("Fotograma de video cargado correctamente")  # Depuración
-            else:
-                frame_rgb = load_default_image(width, height)
-        else:
-            frame_rgb = load_default_image(width, height)
+        width, height = display['width'], display['height']
+        rgba = display['rgba']
 
-        # Si no hay imagen válida, no actualizar el label
-        if frame_rgb is None:
-            if not error_messages['frame']:
-                print("No se pudo leer el fotograma: ninguna imagen disponible")
-                error_messages['frame'] = True
-            return False
+        if CV2_AVAILABLE and frame is not None:
+            # Sin redimensionar si la capturadora ya entrega la resolución de destino
+            if frame.shape[:2] != (height, width):
+                frame = cv2.resize(frame, (width, height), dst=display['resized'])
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA, dst=rgba)
+        else:
+            default = _default_image(width, height)
+            # Si no hay imagen válida, no actualizar el label
+            if default is None:
+                if not error_messages['frame']:
+                    print("No se pudo leer el fotograma: ninguna imagen disponible")
+                    error_messages['frame'] = True
+                return False
+            np.copyto(rgba[:, :, :3], default)
 
         # Superponer datos de vuelo y telemetría
-        if CV2_AVAILABLE:
-            # Validar datos de vuelo
-            altitude = flight_data.get('altitude', 0) if isinstance(flight_data.get('altitude'), (int, float)) else 0
-            distance = flight_data.get('distance', 0) if isinstance(flight_data.get('distance'), (int, float)) else 0
-            latitude = flight_data.get('latitude', 0) if isinstance(flight_data.get('latitude'), (int, float)) else 0
-            longitude = flight_data.get('longitude', 0) if isinstance(flight_data.get('longitude'), (int, float)) else 0
-            battery_percent = flight_data.get('battery_percent', 0) if isinstance(flight_data.get('battery_percent'), (int, float)) else 0
-            speed = flight_data.get('speed', 0) if isinstance(flight_data.get('speed'), (int, float)) else 0
-
-            # Validar datos de telemetría
-            gps_data = telemetry_data.get('gps_data', {'latitude': 0, 'longitude': 0, 'gps_altitude': 0, 'valid': False})
-            baro_data = telemetry_data.get('baro_data', {'baro_altitude': 0, 'valid': False})
-            battery_data = telemetry_data.get('battery_data', {'voltage': 0, 'valid': False})
-            ir_data = telemetry_data.get('ir_data', {'ir_status': 0, 'valid': False})
-
-            gps_latitude = gps_data.get('latitude', 0) if isinstance(gps_data.get('latitude'), (int, float)) else 0
-            gps_longitude = gps_data.get('longitude', 0) if isinstance(gps_data.get('longitude'), (int, float)) else 0
-            gps_altitude = gps_data.get('gps_altitude', 0) if isinstance(gps_data.get('gps_altitude'), (int, float)) else 0
-            baro_altitude = baro_data.get('baro_altitude', 0) if isinstance(baro_data.get('baro_altitude'), (int, float)) else 0
-            voltage = battery_data.get('voltage', 0) if isinstance(battery_data.get('voltage'), (int, float)) else 0
-            ir_status = "ON" if ir_data.get('valid', False) and ir_data.get('ir_status', 0) == 1 else "OFF"
-
-            texts = [
-                f"Latitud: {gps_latitude:.6f}",
-                f"Longitud: {gps_longitude:.6f}",
-                f"Altitud GPS: {gps_altitude:.1f} m",
-                f"Altitud Baro: {baro_altitude:.1f} m",
-                f"Voltaje: {voltage:.1f} V",
-                f"LEDs IR: {ir_status}",
-                f"Altura: {altitude:.1f} m",
-                f"Distancia: {distance:.1f} m",
-                f"Batería: {battery_percent:.0f}%",
-                f"Velocidad: {speed:.1f} m/s"
-            ]
-            y_pos = 35
-            for text in texts:
-                cv2.putText(frame_rgb, text, (15, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), 2, cv2.LINE_AA)
-                cv2.putText(frame_rgb, text, (15, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 1, cv2.LINE_AA)
-                y_pos += 35
-
-            # Barras de señal
-            signal_strength = min(max(signal_strength, 0), 4)
-            for i in range(4):
-                color = (255, 255, 255) if i < signal_strength else (100, 100, 100)
-                border_color = (0, 0, 0)
-                x = width - 100 + i * 24
-                y_top = 50 + (3 - i) * 40
-                y_bottom = y_top + 40
-                cv2.rectangle(frame_rgb, (x, y_top), (x + 20, y_bottom), border_color, -1)
-                cv2.rectangle(frame_rgb, (x + 1, y_top + 1), (x + 19, y_bottom - 1), color, -1)
-
-        # Convertir a formato Tkinter
-        img = Image.fromarray(frame_rgb)
-        imgtk = ImageTk.PhotoImage(image=img)
-        print(f"PhotoImage creado: {imgtk.width()}x{imgtk.height()}")  # Depuración
-        label.imgtk = imgtk
-        label.configure(image=imgtk)
+        draw_overlay(rgba, flight_data, telemetry_data, signal_strength)
         return True
     except Exception as e:
         print(f"Error al actualizar video: {e}")
         return False
 
+def present_frame(display):
+    """Copia el búfer compuesto al PhotoImage persistente (solo en el hilo principal de Tk)."""
+    try:
+        if display['photo'] is None:
+            display['photo'] = ImageTk.PhotoImage(image=display['image'])
+            display['label'].configure(image=display['photo'])
+        else:
+            display['photo'].paste(display['image'])
+    except Exception as e:
+        print(f"Error al mostrar video: {e}")
+    finally:
+        display['idle'].set()
+
+def draw_overlay(frame_rgb, flight_data, telemetry_data, signal_strength):
+    """Dibuja los datos de vuelo, la telemetría y las barras de señal sobre un fotograma RGB o RGBA."""
+    height, width, channels = frame_rgb.shape
+    if CV2_AVAILABLE:
+        # Validar datos de vuelo
+        altitude = flight_data.get('altitude', 0) if isinstance(flight_data.get('altitude'), (int, float)) else 0
+        distance = flight_data.get('distance', 0) if isinstance(flight_data.get('distance'), (int, float)) else 0
+        latitude = flight_data.get('latitude', 0) if isinstance(flight_data.get('latitude'), (int, float)) else 0
+        longitude = flight_data.get('longitude', 0) if isinstance(flight_data.get('longitude'), (int, float)) else 0
+        battery_percent = flight_data.get('battery_percent', 0) if isinstance(flight_data.get('battery_percent'), (int, float)) else 0
+        speed = flight_data.get('speed', 0) if isinstance(flight_data.get('speed'), (int, float)) else 0
+
+        # Validar datos de telemetría
+        gps_data = telemetry_data.get('gps_data', {'latitude': 0, 'longitude': 0, 'gps_altitude': 0, 'valid': False})
+        baro_data = telemetry_data.get('baro_data', {'baro_altitude': 0, 'valid': False})
+        battery_data = telemetry_data.get('battery_data', {'voltage': 0, 'valid': False})
+        ir_data = telemetry_data.get('ir_data', {'ir_status': 0, 'valid': False})
+
+        gps_latitude = gps_data.get('latitude', 0) if isinstance(gps_data.get('latitude'), (int, float)) else 0
+        gps_longitude = gps_data.get('longitude', 0) if isinstance(gps_data.get('longitude'), (int, float)) else 0
+        gps_altitude = gps_data.get('gps_altitude', 0) if isinstance(gps_data.get('gps_altitude'), (int, float)) else 0
+        baro_altitude = baro_data.get('baro_altitude', 0) if isinstance(baro_data.get('baro_altitude'), (int, float)) else 0
+        voltage = battery_data.get('voltage', 0) if isinstance(battery_data.get('voltage'), (int, float)) else 0
+        ir_status = "ON" if ir_data.get('valid', False) and ir_data.get('ir_status', 0) == 1 else "OFF"
+
+        values = (
+            f"{gps_latitude:.6f}",
+            f"{gps_longitude:.6f}",
+            f"{gps_altitude:.1f} m",
+            f"{baro_altitude:.1f} m",
+            f"{voltage:.1f} V",
+            ir_status,
+            f"{altitude:.1f} m",
+            f"{distance:.1f} m",
+            f"{battery_percent:.0f}%",
+            f"{speed:.1f} m/s"
+        )
+        layer = _overlay_layer(width, height, channels)
+        _update_overlay_values(layer, values)
+        _update_overlay_signal(layer, min(max(signal_strength, 0), 4))
+
+        # Mezcla por región con operaciones saturadas de OpenCV: fotograma * (1 - alfa) + color
+        for region in layer['regions']:
+            if region['inverse_alpha'] is None:
+                _prepare_region(layer, region)
+            x, y, w, h = region['box']
+            if w == 0:
+                continue
+            target = frame_rgb[y:y + h, x:x + w]
+            cv2.multiply(target, region['inverse_alpha'], dst=target, scale=1.0 / 255)
+            cv2.add(target, layer['color'][y:y + h, x:x + w], dst=target)
+
+def _overlay_layer(width, height, channels=3):
+    """
+    Devuelve (creándola una sola vez) la capa de superposición de un tamaño de fotograma:
+    color premultiplicado (dibujado sobre negro) y máscara alfa, con los contornos de las barras
+    de señal ya dibujados. Las líneas de texto se dibujan al cambiar su valor.
+    Con 4 canales el canal alfa de la capa es la propia cobertura, así el fotograma sigue opaco.
+    """
+    layer = overlay_layers.get((width, height, channels))
+    if layer is not None:
+        return layer
+    color = np.zeros((height, width, channels), dtype=np.uint8)
+    alpha = np.zeros((height, width), dtype=np.uint8)
+    # Contornos de las barras de señal (el relleno depende del nivel)
+    for i in range(4):
+        x = width - 100 + i * 24
+        y_top = 50 + (3 - i) * 40
+        cv2.rectangle(alpha, (x, y_top), (x + 20, y_top + 40), 255, -1)
+
+    text_bottom = min(height, OVERLAY_LINE_HEIGHT * (len(OVERLAY_LABELS) + 1))
+    layer = {
+        'color': color,
+        'alpha': alpha,
+        'values': [None] * len(OVERLAY_LABELS),
+        'signal': None,
+        'regions': [
+            {'bounds': (0, text_bottom, 0, min(width, OVERLAY_TEXT_WIDTH)), 'box': None, 'inverse_alpha': None},
+            {'bounds': (min(height, 50), min(height, 211), max(0, width - 100), min(width, width - 100 + 3 * 24 + 21)),
+             'box': None, 'inverse_alpha': None}
+        ]
+    }
+    overlay_layers[(width, height, channels)] = layer
+    return layer
+
+def _prepare_region(layer, region):
+    """Recalcula el rectángulo ocupado de una región y su alfa complementario por canal."""
+    y0, y1, x0, x1 = region['bounds']
+    x, y, w, h = cv2.boundingRect(layer['alpha'][y0:y1, x0:x1])
+    region['box'] = (x0 + x, y0 + y, w, h)
+    alpha = layer['alpha'][y0 + y:y0 + y + h, x0 + x:x0 + x + w]
+    conversion = cv2.COLOR_GRAY2RGBA if layer['color'].shape[2] == 4 else cv2.COLOR_GRAY2RGB
+    region['inverse_alpha'] = cv2.cvtColor(255 - alpha, conversion) if w else None
+
+def _update_overlay_values(layer, values):
+    """Redibuja solo las líneas cuyo valor formateado ha cambiado."""
+    for i, value in enumerate(values):
+        if layer['values'][i] == value:
+            continue
+        layer['values'][i] = value
+        y_pos = OVERLAY_LINE_HEIGHT * (i + 1)
+        y0 = max(0, y_pos - OVERLAY_LINE_HEIGHT + 8)
+        y1 = min(layer['alpha'].shape[0], y_pos + 8)
+        layer['color'][y0:y1, :OVERLAY_TEXT_WIDTH] = 0
+        layer['alpha'][y0:y1, :OVERLAY_TEXT_WIDTH] = 0
+        _draw_outlined_text(layer['color'], layer['alpha'], OVERLAY_LABELS[i] + value, 15, y_pos)
+        layer['regions'][0]['inverse_alpha'] = None
+
+def _update_overlay_signal(layer, signal_strength):
+    """Rellena las barras de señal según el nivel (solo cuando cambia)."""
+    if layer['signal'] == signal_strength:
+        return
+    layer['signal'] = signal_strength
+    width = layer['color'].shape[1]
+    for i in range(4):
+        color = (255, 255, 255, 255) if i < signal_strength else (100, 100, 100, 255)
+        x = width - 100 + i * 24
+        y_top = 50 + (3 - i) * 40
+        cv2.rectangle(layer['color'], (x, y_top), (x + 20, y_top + 40), (0, 0, 0, 255), -1)
+        cv2.rectangle(layer['color'], (x + 1, y_top + 1), (x + 19, y_top + 39), color, -1)
+
+def _draw_outlined_text(color, alpha, text, x, y):
+    """Dibuja texto blanco con borde negro en la capa de color y su cobertura en la máscara alfa."""
+    cv2.putText(alpha, text, (x, y), OVERLAY_FONT, 0.7, 255, 2, cv2.LINE_AA)
+    cv2.putText(alpha, text, (x, y), OVERLAY_FONT, 0.7, 255, 1, cv2.LINE_AA)
+    cv2.putText(color, text, (x, y), OVERLAY_FONT, 0.7, (0, 0, 0, 255), 2, cv2.LINE_AA)
+    cv2.putText(color, text, (x, y), OVERLAY_FONT, 0.7, (255, 255, 255, 255), 1, cv2.LINE_AA)
+
 def load_default_image(width, height):
+    """
+    Devuelve una copia de no_signal_image.jpg a width x height, o None si no está disponible.
+    La imagen se lee, decodifica y redimensiona una sola vez por tamaño.
+    """
+    image = _default_image(width, height)
+    return image.copy() if image is not None else None
+
+def _default_image(width, height):
+    """Imagen de "sin señal" en caché (no debe modificarse)."""
+    key = (width, height)
+    if key not in default_images:
+        default_images[key] = _read_default_image(width, height)
+    return default_images[key]
+
+def _read_default_image(width, height):
     """Carga no_signal_image.jpg desde el directorio del script o devuelve None si falla."""
     global error_messages
     image_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "no_signal_image.jpg")
@@ -142,7 +317,6 @@ def load_default_image(width, height):
     try:
         img = Image.open(image_path).convert('RGB')
         img = img.resize((width, height), Image.Resampling.LANCZOS)
-        print(f"Imagen {image_path} cargada correctamente")
         return np.array(img)
     except (FileNotFoundError, UnidentifiedImageError, OSError) as e:
         if not error_messages['image']:
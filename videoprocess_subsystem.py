@@ -0,0 +1,297 @@
+"""
+Proceso de video separado: captura, conversión y superposición fuera del GIL de la estación.
+
+El proceso hijo escribe fotogramas RGBA ya compuestos en un triple búfer de memoria compartida;
+la GUI solo los copia al PhotoImage. Los valores de la superposición viajan en la dirección
+contraria por la misma memoria compartida. Ambos sentidos usan contadores de secuencia
+(seqlock): el escritor los deja impares mientras escribe y el lector descarta lo que cambió.
+El hijo se lanza con subprocess (no con multiprocessing) para no volver a ejecutar main.py.
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+from multiprocessing import shared_memory
+
+SLOTS = 3
+
+# Cabecera (int64)
+H_LATEST = 0         # último búfer publicado (-1 = ninguno)
+H_PUBLISHED = 1      # fotogramas publicados
+H_CAPTURED = 2       # fotogramas leídos de la capturadora
+H_FAILED = 3         # lecturas fallidas
+H_OVERLAY_SEQ = 4    # secuencia de los valores de superposición
+H_READER_SLOT = 5    # búfer que la GUI está copiando
+H_SLOT_SEQ = 8       # secuencia de cada búfer (8..10)
+H_SLOT_CAPTURE = 12  # instante de captura de cada búfer, time.monotonic_ns (12..14)
+HEADER_WORDS = 16
+
+# Valores de superposición (float64) en el orden en que se empaquetan
+OVERLAY_FIELDS = ('gps_latitude', 'gps_longitude', 'gps_altitude', 'gps_valid', 'baro_altitude', 'baro_valid',
+                  'voltage', 'battery_valid', 'ir_status', 'ir_valid', 'altitude', 'distance', 'latitude',
+                  'longitude', 'battery_percent', 'speed', 'signal_strength')
+OVERLAY_WORDS = 32
+
+
+def _map_buffers(buffer, width, height):
+    """Vistas numpy de la cabecera, los valores de superposición y los búferes de fotograma."""
+    header = np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=buffer)
+    overlay = np.ndarray((OVERLAY_WORDS,), dtype=np.float64, buffer=buffer, offset=HEADER_WORDS * 8)
+    frames = np.ndarray((SLOTS, height, width, 4), dtype=np.uint8, buffer=buffer,
+                        offset=(HEADER_WORDS + OVERLAY_WORDS) * 8)
+    return header, overlay, frames
+
+
+def start_video_process(device='0', width=1280, height=720):
+    """
+    Crea la memoria compartida y lanza el proceso de video.
+    device es el índice de la capturadora o 'synthetic' para fotogramas de prueba.
+    """
+    from PIL import Image
+    size = (HEADER_WORDS + OVERLAY_WORDS) * 8 + SLOTS * height * width * 4
+    try:
+        shm = shared_memory.SharedMemory(create=True, size=size)
+    except OSError as e:
+        print(f"Error al crear memoria compartida de video: {e}")
+        return None
+    header, overlay, frames = _map_buffers(shm.buf, width, height)
+    header[:] = 0
+    header[H_LATEST] = -1
+    header[H_READER_SLOT] = -1
+    try:
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), shm.name, str(device),
+                                    str(width), str(height)], stdin=subprocess.PIPE)
+    except OSError as e:
+        print(f"Error al lanzar el proceso de video: {e}")
+        header = overlay = frames = None
+        shm.close()
+        shm.unlink()
+        return None
+    print(f"Proceso de video iniciado (pid {process.pid})")
+    return {
+        'shm': shm,
+        'process': process,
+        'header': header,
+        'overlay': overlay,
+        'frames': frames,
+        'images': [Image.frombuffer('RGBA', (width, height), frames[i], 'raw', 'RGBA', 0, 1) for i in range(SLOTS)],
+        'photo': None,
+        'front': None,
+        'last_published': 0,
+        'displayed': 0,
+        'dropped': 0,
+        'torn': 0
+    }
+
+
+def send_overlay(state, flight_data, telemetry_data, signal_strength):
+    """Publica los valores de la superposición para el proceso de video (nunca bloquea)."""
+    gps_data = telemetry_data.get('gps_data', {})
+    baro_data = telemetry_data.get('baro_data', {})
+    battery_data = telemetry_data.get('battery_data', {})
+    ir_data = telemetry_data.get('ir_data', {})
+    values = (gps_data.get('latitude'), gps_data.get('longitude'), gps_data.get('gps_altitude'),
+              gps_data.get('valid'), baro_data.get('baro_altitude'), baro_data.get('valid'),
+              battery_data.get('voltage'), battery_data.get('valid'), ir_data.get('ir_status'),
+              ir_data.get('valid'), flight_data.get('altitude'), flight_data.get('distance'),
+              flight_data.get('latitude'), flight_data.get('longitude'), flight_data.get('battery_percent'),
+              flight_data.get('speed'), signal_strength)
+    header = state['header']
+    header[H_OVERLAY_SEQ] += 1
+    state['overlay'][:len(values)] = [float(value) if isinstance(value, (int, float)) else 0.0 for value in values]
+    header[H_OVERLAY_SEQ] += 1
+
+
+def present_latest(state, label):
+    """
+    Copia el último fotograma publicado al PhotoImage de label (solo en el hilo principal de Tk).
+    Devuelve su instante de captura o None si no hay fotograma nuevo.
+    """
+    from PIL import ImageTk
+    header = state['header']
+    published = int(header[H_PUBLISHED])
+    if published == state['last_published']:
+        return None
+    slot = int(header[H_LATEST])
+    header[H_READER_SLOT] = slot
+    seq = int(header[H_SLOT_SEQ + slot])
+    if seq & 1:
+        return None
+    capture_ns = int(header[H_SLOT_CAPTURE + slot])
+    if state['photo'] is None:
+        state['photo'] = ImageTk.PhotoImage(image=state['images'][slot])
+        label.configure(image=state['photo'])
+    else:
+        state['photo'].paste(state['images'][slot])
+    if int(header[H_SLOT_SEQ + slot]) != seq:
+        # El proceso reescribió el búfer durante la copia; el siguiente fotograma lo corrige
+        state['torn'] += 1
+    state['dropped'] += max(0, published - state['last_published'] - 1)
+    state['last_published'] = published
+    state['displayed'] += 1
+    state['front'] = slot
+    return capture_ns
+
+
+def measure_capture_fps(state, window_s=1.0, timeout=5.0):
+    """
+    Mide los fotogramas por segundo que captura el proceso de video contando su contador de
+    capturas durante window_s. Devuelve None si el proceso no captura nada antes de timeout.
+    """
+    header = state['header']
+    deadline = time.monotonic() + timeout
+    while int(header[H_CAPTURED]) == 0:
+        if time.monotonic() > deadline or state['process'].poll() is not None:
+            return None
+        time.sleep(0.01)
+    start, captured = time.monotonic(), int(header[H_CAPTURED])
+    time.sleep(window_s)
+    frames = int(header[H_CAPTURED]) - captured
+    return frames / (time.monotonic() - start) if frames > 0 else None
+
+
+def video_process_stats(state):
+    """Contadores del proceso de video y de la GUI."""
+    header = state['header']
+    return {
+        'alive': state['process'].poll() is None,
+        'captured': int(header[H_CAPTURED]),
+        'capture_failed': int(header[H_FAILED]),
+        'published': int(header[H_PUBLISHED]),
+        'displayed': state['displayed'],
+        'dropped': state['dropped'],
+        'torn': state['torn']
+    }
+
+
+def stop_video_process(state, timeout=2.0):
+    """Detiene el proceso de video (cerrando su stdin) y libera la memoria compartida."""
+    if state is None:
+        return
+    process = state['process']
+    try:
+        process.stdin.close()
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    except OSError as e:
+        print(f"Error al detener el proceso de video: {e}")
+    # Las vistas deben soltarse antes de cerrar el segmento
+    for key in ('header', 'overlay', 'frames', 'images', 'photo'):
+        state[key] = None
+    try:
+        state['shm'].close()
+        state['shm'].unlink()
+    except (BufferError, OSError) as e:
+        print(f"Error al liberar memoria compartida de video: {e}")
+
+
+class SyntheticCapture:
+    """Capturadora de prueba: un degradado que se desplaza, entregado al ritmo indicado."""
+
+    def __init__(self, width=1280, height=720, fps=30):
+        row = np.linspace(0, 255, width, dtype=np.uint8)
+        self.base = np.repeat(np.repeat(row[None, :, None], height, axis=0), 3, axis=2)
+        self.period = 1.0 / fps
+        self.next_time = time.monotonic()
+        self.index = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        delay = self.next_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_time = max(self.next_time + self.period, time.monotonic() - self.period)
+        self.index += 1
+        return True, np.roll(self.base, self.index * 8, axis=1)
+
+    def release(self):
+        pass
+
+
+def _attach(name):
+    """Se conecta a la memoria compartida sin que el resource_tracker del hijo la elimine al salir."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == 'posix':
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def _read_overlay(header, overlay):
+    """Lee una copia coherente de los valores de superposición (reintenta si cambian durante la lectura)."""
+    for _ in range(3):
+        seq = int(header[H_OVERLAY_SEQ])
+        values = overlay[:len(OVERLAY_FIELDS)].tolist()
+        if not seq & 1 and int(header[H_OVERLAY_SEQ]) == seq:
+            break
+    v = dict(zip(OVERLAY_FIELDS, values))
+    flight_data = {key: v[key] for key in ('altitude', 'distance', 'latitude', 'longitude', 'battery_percent',
+                                           'speed')}
+    telemetry_data = {
+        'gps_data': {'latitude': v['gps_latitude'], 'longitude': v['gps_longitude'],
+                     'gps_altitude': v['gps_altitude'], 'valid': bool(v['gps_valid'])},
+        'baro_data': {'baro_altitude': v['baro_altitude'], 'valid': bool(v['baro_valid'])},
+        'battery_data': {'voltage': v['voltage'], 'valid': bool(v['battery_valid'])},
+        'ir_data': {'ir_status': int(v['ir_status']), 'valid': bool(v['ir_valid'])}
+    }
+    return flight_data, telemetry_data, int(v['signal_strength'])
+
+
+def _worker(shm_name, device, width, height):
+    """Bucle del proceso de video: captura, compone en un búfer libre y lo publica."""
+    import video_subsystem
+    shm = _attach(shm_name)
+    header, overlay, frames = _map_buffers(shm.buf, width, height)
+    displays = [video_subsystem.initialize_display(None, None, width, height, rgba=frames[i]) for i in range(SLOTS)]
+    if device == 'synthetic':
+        cap = SyntheticCapture(width, height)
+    else:
+        cap = video_subsystem.initialize_video_stream(device_index=int(device))
+
+    # El proceso termina cuando la GUI cierra su stdin (o muere)
+    stop_event = threading.Event()
+
+    def watch_parent():
+        sys.stdin.buffer.read()
+        stop_event.set()
+
+    threading.Thread(target=watch_parent, daemon=True).start()
+
+    while not stop_event.is_set():
+        frame = video_subsystem.read_frame(cap)
+        capture_ns = time.monotonic_ns()
+        if frame is None:
+            header[H_FAILED] += 1
+            stop_event.wait(0.1)
+        else:
+            header[H_CAPTURED] += 1
+        latest = int(header[H_LATEST])
+        reader = int(header[H_READER_SLOT])
+        slot = next(i for i in range(SLOTS) if i != latest and i != reader)
+        flight_data, telemetry_data, signal_strength = _read_overlay(header, overlay)
+        header[H_SLOT_SEQ + slot] += 1
+        composed = video_subsystem.compose_frame(displays[slot], frame, flight_data, telemetry_data, signal_strength)
+        header[H_SLOT_SEQ + slot] += 1
+        if composed:
+            header[H_SLOT_CAPTURE + slot] = capture_ns
+            header[H_LATEST] = slot
+            header[H_PUBLISHED] += 1
+
+    if device != 'synthetic':
+        video_subsystem.release_video_stream(cap)
+    del displays, header, overlay, frames
+    shm.close()
+
+
+if __name__ == '__main__':
+    _worker(sys.argv[1], sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))